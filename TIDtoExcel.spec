@@ -1,15 +1,27 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import os
+
 from PyInstaller.utils.hooks import collect_data_files, collect_submodules
 
+# 打包配置：full（默认，与以前相同）或 slim（只打包实际用到的模块和模型，启动更快）
+#   set TIDTOEXCEL_BUILD_PROFILE=slim && pyinstaller TIDtoExcel.spec
+BUILD_PROFILE = os.environ.get('TIDTOEXCEL_BUILD_PROFILE', 'full').lower()
+SLIM = BUILD_PROFILE == 'slim'
+print(f"=== 打包配置: {BUILD_PROFILE} ===")
+
 # 1) 收集 rapidocr_onnxruntime 的数据文件
-rapidocr_datas = collect_data_files(
-    'rapidocr_onnxruntime',
-    includes=[
-        '*.yaml', '*.yml', '*.onnx', '*.txt', '*.json',
-        '**/*.yaml', '**/*.yml', '**/*.onnx', '**/*.txt', '**/*.json'
-    ]
-)
+if SLIM:
+    # 只需要配置文件和config.yaml引用的模型
+    rapidocr_datas = collect_data_files('rapidocr_onnxruntime', includes=['config.yaml', 'models/*.onnx', 'models/*.txt'])
+else:
+    rapidocr_datas = collect_data_files(
+        'rapidocr_onnxruntime',
+        includes=[
+            '*.yaml', '*.yml', '*.onnx', '*.txt', '*.json',
+            '**/*.yaml', '**/*.yml', '**/*.onnx', '**/*.txt', '**/*.json'
+        ]
+    )
 
 # 新增：打印原始路径，看看 dest 本来长什么样
 print("=== 原始 rapidocr_datas 路径 ===")
@@ -21,8 +33,15 @@ for src, dest in rapidocr_datas[:2]:  # 只打印前2个，避免输出太多
 # 2) 不手动加 _internal，直接用原始 dest（关键修改！）
 rapidocr_datas_prefixed = rapidocr_datas  # 直接用收集到的原始路径，不做替换
 
-# 3) 收集子模块
-rapidocr_hiddenimports = collect_submodules('rapidocr_onnxruntime')
+# 3) 收集子模块（slim只依赖静态分析，RapidOCR实际导入的子模块都能分析到）
+rapidocr_hiddenimports = [] if SLIM else collect_submodules('rapidocr_onnxruntime')
+
+# slim排除依赖间接引入、程序用不到的大模块
+slim_excludes = [
+    'matplotlib', 'scipy', 'pandas', 'IPython', 'jupyter', 'notebook', 'pytest',
+    'PyQt5', 'PyQt6', 'PySide2', 'PySide6', 'sympy', 'tkinter.test', 'lib2to3',
+    'pydoc_data', 'xmlrpc',
+]
 
 a = Analysis(
     ['data_recorder.py'],
@@ -32,15 +51,20 @@ a = Analysis(
         ('images/*', 'images'),  # 图片资源
         ('config/config.json', '.'),  # 配置文件到根目录，运行时会复制到 _internal
     ],
-    hiddenimports=rapidocr_hiddenimports,
+    # 延迟导入的模块PyInstaller分析不到，需要显式列出
+    hiddenimports=rapidocr_hiddenimports + ['cv2', 'PIL.Image', 'PIL.ImageTk', 'openpyxl', 'openpyxl.drawing.image'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=slim_excludes if SLIM else [],
     noarchive=False,
     optimize=0,
 )
 
+if SLIM:
+    # 摄像头使用系统自带的MSMF/DirectShow后端，不需要FFmpeg视频后端（约20MB）
+    a.binaries = [b for b in a.binaries if 'opencv_videoio_ffmpeg' not in os.path.basename(b[0]).lower()]
+
 pyz = PYZ(a.pure)
 
 exe = EXE(
@@ -52,7 +76,7 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=not SLIM,  # UPX压缩的DLL每次启动都要解压，slim不压缩
     console=True,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -66,7 +90,7 @@ coll = COLLECT(
     a.binaries,
     a.datas,
     strip=False,
-    upx=True,
+    upx=not SLIM,
     upx_exclude=[],
     name='TIDtoExcel',
 )
\ No newline at end of file
@@ -1,12 +1,29 @@
 """配置管理模块
 
 提供配置的读取和修改功能，支持运行时动态修改配置
+
+保存配置默认是延迟的：短时间内的多次修改合并为一次写入，在后台线程中先写临时文件再替换，
+内容没有变化时不写文件。程序退出时会写入尚未保存的修改。
+
+config_schema中定义的配置项带类型和取值范围检查，不合法的值读取时使用默认值。
+启动热重载后，配置文件被外部修改时自动重新加载，并通知订阅了相应配置项的回调。
 """
+import atexit
 import json
 import os
 import sys
 import shutil
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+from config.config_schema import CONFIG_SCHEMA
+
+# 配置变化回调：(键名, 旧值, 新值)
+ConfigCallback = Callable[[str, Any, Any], None]
+
+# 延迟保存的等待时间(秒)，期间的修改合并为一次写入
+DEFAULT_SAVE_DELAY = 1.0
 
 class ConfigManager:
     """配置管理类
@@ -16,6 +33,15 @@ class ConfigManager:
     _instance = None
     _config_data = {}
     _config_file = None
+    _saved_text = None  # 最近一次保存（或加载）的内容，用于跳过没有变化的写入
+    _save_timer = None
+    _lock = threading.RLock()        # 保护配置数据和延迟保存的定时器
+    _write_lock = threading.Lock()   # 串行写文件，写入期间不阻塞读写配置
+    _file_data = {}        # 配置文件中的内容（最近一次加载或保存时）
+    _file_stat = None      # 配置文件的(修改时间, 大小)，用于发现外部修改
+    _subscribers = []      # [(键名集合或None, 回调)]
+    _watch_thread = None
+    _watch_stop = None
     
     def __new__(cls, *args, **kwargs):
         """单例模式"""
@@ -62,37 +88,179 @@ class ConfigManager:
             file_path: JSON配置文件路径
         """
         with open(file_path, 'r', encoding='utf-8') as f:
-            self._config_data = json.load(f)
+            text = f.read()
+        self._config_data = json.loads(text)
+        self._file_data = dict(self._config_data)
+        self._saved_text = self._serialize()
+        self._file_stat = self._stat_file()
+        self._warn_invalid(self._config_data.keys())
         print(f"已从文件 {file_path} 加载配置")
-        
-        
+
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值
-        
+
         Args:
             key: 配置键名
-            default: 默认值，当键不存在时返回
-            
+            default: 默认值，当键不存在或值不合法时返回；为None时使用配置项定义中的默认值
+
         Returns:
             配置值或默认值
         """
-        return self._config_data.get(key, default)
-    
+        option = CONFIG_SCHEMA.get(key)
+        if default is None and option is not None:
+            default = option.default
+        with self._lock:
+            if key not in self._config_data:
+                return default
+            value = self._config_data[key]
+        if option is not None:
+            valid, value = option.validate(value)
+            if not valid:
+                return default
+        return value
+
     def set(self, key: str, value: Any) -> None:
         """设置配置值
-        
+
         Args:
             key: 配置键名
             value: 配置值
+
+        Raises:
+            ValueError: 值不符合配置项定义
         """
-        self._config_data[key] = value
-    
-    def save_to_file(self) -> bool:
-        """将当前配置保存到文件
-        
+        option = CONFIG_SCHEMA.get(key)
+        if option is not None:
+            valid, checked = option.validate(value)
+            if not valid:
+                raise ValueError(f"配置项 {key} 的值无效: {value!r}")
+            value = checked
+        old_value = self.get(key)
+        with self._lock:
+            self._config_data[key] = value
+        if old_value != value:
+            self._notify({key: (old_value, value)})
+
+    def subscribe(self, callback: ConfigCallback, keys: Optional[Iterable[str]] = None) -> None:
+        """订阅配置变化
+
+        回调在修改配置的线程（热重载时为检查线程）中调用，需要更新界面时由回调转交给Tk线程。
+
         Args:
-            file_path: 保存的文件路径，如果为None则使用初始化时的文件路径
-            
+            callback: 回调，参数为(键名, 旧值, 新值)
+            keys: 关注的配置键名，None表示全部
+        """
+        with self._lock:
+            self._subscribers.append((frozenset(keys) if keys is not None else None, callback))
+
+    def unsubscribe(self, callback: ConfigCallback) -> None:
+        """取消订阅"""
+        with self._lock:
+            self._subscribers = [item for item in self._subscribers if item[1] is not callback]
+
+    def _notify(self, changes: Dict[str, Tuple[Any, Any]]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for key, (old_value, new_value) in changes.items():
+            for keys, callback in subscribers:
+                if keys is not None and key not in keys:
+                    continue
+                try:
+                    callback(key, old_value, new_value)
+                except Exception as e:
+                    print(f"⚠️ 配置变化回调出错 ({key}): {e}")
+
+    def _warn_invalid(self, keys: Iterable[str]) -> None:
+        """提示配置文件中不合法的值（读取时使用默认值）"""
+        for key in keys:
+            option = CONFIG_SCHEMA.get(key)
+            if option is not None and not option.validate(self._config_data.get(key))[0]:
+                print(f"⚠️ 配置项 {key} 的值无效: {self._config_data.get(key)!r}，使用默认值 {option.default!r}")
+
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._config_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except (OSError, TypeError):
+            return None
+
+    def reload(self) -> List[str]:
+        """配置文件被外部修改时重新加载
+
+        只应用文件中发生变化的配置项，界面中尚未保存的其他修改保留。
+
+        Returns:
+            List[str]: 生效值发生变化的配置键名
+        """
+        with self._write_lock:
+            self._file_stat = self._stat_file()
+            try:
+                with open(self._config_file, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                if text == self._saved_text:
+                    return []
+                file_data = json.loads(text)
+                if not isinstance(file_data, dict):
+                    raise ValueError("配置文件内容不是对象")
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 重新加载配置失败，继续使用当前配置: {e}")
+                return []
+
+            changed_keys = [key for key in set(file_data) | set(self._file_data)
+                            if file_data.get(key) != self._file_data.get(key)]
+            old_values = {key: self.get(key) for key in changed_keys}
+            with self._lock:
+                for key in changed_keys:
+                    if key in file_data:
+                        self._config_data[key] = file_data[key]
+                    else:
+                        self._config_data.pop(key, None)
+            self._file_data = file_data
+            self._saved_text = text
+
+        self._warn_invalid(key for key in changed_keys if key in file_data)
+        changes = {}
+        for key in changed_keys:
+            new_value = self.get(key)
+            if new_value != old_values[key]:
+                changes[key] = (old_values[key], new_value)
+        if changes:
+            print(f"🔄 配置已重新加载: {', '.join(f'{key}={value[1]!r}' for key, value in changes.items())}")
+            self._notify(changes)
+        return list(changes)
+
+    def start_watching(self) -> None:
+        """启动后台线程，按config_reload_interval检查配置文件是否被外部修改"""
+        if self._watch_thread is not None:
+            return
+        self._watch_stop = threading.Event()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(self._watch_stop,),
+                                              name="config-watch", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self) -> None:
+        """停止检查配置文件"""
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+        self._watch_thread = None
+
+    def _watch_loop(self, stop_event: threading.Event) -> None:
+        while True:
+            interval = self.get('config_reload_interval')
+            if interval <= 0 or stop_event.wait(interval):
+                break
+            if self._stat_file() != self._file_stat:
+                self.reload()
+
+    def _serialize(self) -> str:
+        with self._lock:
+            return json.dumps(self._config_data, ensure_ascii=False, indent=4)
+
+    def save_to_file(self) -> bool:
+        """立即将当前配置保存到文件（内容没有变化时不写入）
+
+        先写入同目录下的临时文件再替换，写入中途退出不会损坏配置文件。
+
         Returns:
             是否保存成功
         """
@@ -100,15 +268,60 @@ class ConfigManager:
         if not save_path:
             print("未指定保存路径")
             return False
-        
-        try:
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(self._config_data, f, ensure_ascii=False, indent=4)
-            print(f"配置已保存到 {save_path}")
-            return True
-        except Exception as e:
-            print(f"保存配置到 {save_path} 失败: {e}")
-            return False
+
+        with self._write_lock:
+            with self._lock:
+                self._cancel_scheduled_save()
+                text = self._serialize()
+            if text == self._saved_text:
+                return True
+
+            temp_path = None
+            try:
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(save_path), prefix='.config.', suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, save_path)
+                self._saved_text = text
+                self._file_data = json.loads(text)
+                self._file_stat = self._stat_file()
+                print(f"配置已保存到 {save_path}")
+                return True
+            except Exception as e:
+                print(f"保存配置到 {save_path} 失败: {e}")
+                if temp_path and os.path.exists(temp_path):
+                    try:
+                        os.unlink(temp_path)
+                    except OSError:
+                        pass
+                return False
+
+    def schedule_save(self, delay: float = DEFAULT_SAVE_DELAY) -> None:
+        """延迟保存配置，等待期间再次调用会重新计时，多次修改只写入一次
+
+        Args:
+            delay: 等待时间(秒)
+        """
+        with self._lock:
+            self._cancel_scheduled_save()
+            self._save_timer = threading.Timer(delay, self.save_to_file)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self) -> bool:
+        """立即写入尚未保存的修改（程序退出时调用）
+
+        Returns:
+            是否保存成功
+        """
+        return self.save_to_file()
+
+    def _cancel_scheduled_save(self) -> None:
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
     
     def get_all(self) -> Dict[str, Any]:
         """获取所有配置
@@ -130,6 +343,39 @@ def set_config(key: str, value: Any) -> None:
     """设置配置值的便捷函数"""
     config_manager.set(key, value)
 
-def save_config() -> bool:
-    """保存配置的便捷函数"""
-    return config_manager.save_to_file()
\ No newline at end of file
+def subscribe_config(callback: ConfigCallback, keys: Optional[Iterable[str]] = None) -> None:
+    """订阅配置变化的便捷函数"""
+    config_manager.subscribe(callback, keys)
+
+def save_config(immediate: bool = False) -> bool:
+    """保存配置的便捷函数
+
+    Args:
+        immediate: 为True时立即写入，否则延迟到后台合并写入
+
+    Returns:
+        立即写入时返回是否保存成功，延迟写入时总是返回True
+    """
+    if immediate:
+        return config_manager.save_to_file()
+    config_manager.schedule_save()
+    return True
+
+def start_config_watch() -> None:
+    """开始检查配置文件的外部修改（热重载）"""
+    config_manager.start_watching()
+
+def stop_config_watch() -> None:
+    """停止检查配置文件"""
+    config_manager.stop_watching()
+
+def flush_config() -> bool:
+    """立即写入尚未保存的配置修改"""
+    return config_manager.flush()
+
+# 程序退出时写入尚未保存的修改
+atexit.register(flush_config)
+
+def get_config_dir() -> str:
+    """获取配置文件所在目录，程序生成的数据文件也保存在这里"""
+    return os.path.dirname(config_manager._config_file)
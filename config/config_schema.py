@@ -0,0 +1,129 @@
+"""配置项定义
+
+列出程序读取的配置项及其类型、默认值和取值范围。
+配置文件中的值在加载和热重载时按这里的定义检查，不合法的值被忽略并使用默认值；
+新增配置项时应在这里登记，未登记的配置项不做检查。
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+class ConfigOption:
+    """一个配置项的定义"""
+
+    __slots__ = ("key", "type", "default", "min_value", "max_value", "choices", "item_type", "description")
+
+    def __init__(self, key: str, value_type: type, default: Any, description: str,
+                 min_value: Optional[float] = None, max_value: Optional[float] = None,
+                 choices: Optional[Sequence[Any]] = None, item_type: Optional[type] = None):
+        """定义配置项
+
+        Args:
+            key: 配置键名
+            value_type: 值的类型（int、float、bool、str、tuple）
+            default: 默认值
+            description: 说明
+            min_value: 数值的最小值
+            max_value: 数值的最大值
+            choices: 允许的取值
+            item_type: tuple类型配置项中每个元素的类型
+        """
+        self.key = key
+        self.type = value_type
+        self.default = default
+        self.min_value = min_value
+        self.max_value = max_value
+        self.choices = tuple(choices) if choices is not None else None
+        self.item_type = item_type
+        self.description = description
+
+    def validate(self, value: Any) -> Tuple[bool, Any]:
+        """检查并转换配置值
+
+        int可以用于float类型的配置项，bool不能当作数值；tuple类型的配置项在配置文件中写为数组。
+
+        Returns:
+            (是否合法, 转换后的值)
+        """
+        if self.type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if self.type is tuple and isinstance(value, list):
+            value = tuple(value)
+        if self.item_type is not None and isinstance(value, tuple) and \
+                not all(isinstance(item, self.item_type) for item in value):
+            return False, None
+        if not isinstance(value, self.type) or (self.type is not bool and isinstance(value, bool)):
+            return False, None
+        if self.min_value is not None and value < self.min_value:
+            return False, None
+        if self.max_value is not None and value > self.max_value:
+            return False, None
+        if self.choices is not None and value not in self.choices:
+            return False, None
+        return True, value
+
+
+def _options(*options: ConfigOption) -> Dict[str, ConfigOption]:
+    return {option.key: option for option in options}
+
+
+CONFIG_SCHEMA = _options(
+    # RFID读写器
+    ConfigOption("rfid_port", str, "COM4", "RFID串口（在界面中选择后生效）"),
+    ConfigOption("rfid_baudrate", int, 115200, "RFID串口波特率", 1200, 921600),
+    ConfigOption("rfid_timeout", float, 0.5, "RFID串口读取超时(秒)", 0.01, 10),
+    ConfigOption("rfid_read_delay", float, 0.05, "RFID发送命令后等待响应的时间(秒)", 0, 2),
+    ConfigOption("rfid_operation_delay", float, 0.5, "RFID重置各步骤之间的间隔(秒)", 0, 10),
+
+    # 识别次数和时长
+    ConfigOption("camera_index", int, 0, "摄像头索引（在界面中选择后生效）", 0, 63),
+    ConfigOption("tid_required_count", int, 5, "TID需要连续读取的次数", 1, 10),
+    ConfigOption("tid_max_duration", float, 2.0, "TID读取最大持续时间(秒)", 0.1, 60),
+    ConfigOption("ocr_required_count", int, 3, "OCR需要连续识别的次数", 1, 10),
+    ConfigOption("ocr_max_attempts_manual", int, 50, "手动OCR识别最大尝试次数", 1, 1000),
+    ConfigOption("ocr_max_attempts_auto", int, 20, "自动OCR识别最大尝试次数", 1, 1000),
+    ConfigOption("ocr_sleep_interval", float, 0.1, "OCR识别间隔时间(秒)", 0, 5),
+
+    # 自动获取
+    ConfigOption("auto_get_interval", float, 1.0, "自动获取循环间隔时间(秒)", 0, 60),
+    ConfigOption("error_retry_delay", float, 2.0, "自动获取出错后的重试延迟(秒)", 0, 60),
+
+    # 设备检测（启动时生效）
+    ConfigOption("camera_probe_count", int, 5, "检测的摄像头索引数", 1, 64),
+    ConfigOption("camera_cache_ttl", float, 600.0, "摄像头检测结果的有效期(秒)，0表示只在插拔时失效", 0, 86400),
+    ConfigOption("device_watch_interval", float, 2.0, "检查设备插拔的间隔(秒)，0表示不检查", 0, 3600),
+
+    # 预览（启动时生效）
+    ConfigOption("preview_adaptive", bool, True, "按OCR负载自动调整预览帧率和缩放质量"),
+    ConfigOption("preview_cache_size", int, 32, "缓存的预览缩略图数量", 1, 10000),
+
+    # 数据列表（启动时生效）
+    ConfigOption("dedup_policy", str, "pair", "去重规则：pair、tid、label或each",
+                 choices=("pair", "tid", "label", "each")),
+    ConfigOption("data_list_virtual_mode", bool, False, "数据列表只创建可见的行（适合数据量很大的会话）"),
+
+    # 历史索引、数据日志和图片存储（启动时生效）
+    ConfigOption("history_dedup_enabled", bool, True, "按历史导出的数据去重"),
+    ConfigOption("history_index_file", str, "", "历史索引数据库文件，空表示保存在配置目录"),
+    ConfigOption("journal_enabled", bool, True, "把数据写入数据日志，启动时恢复未导出的数据"),
+    ConfigOption("journal_file", str, "", "数据日志数据库文件，空表示保存在配置目录"),
+    ConfigOption("image_store_dir", str, "", "图片存储目录，空表示保存在配置目录"),
+    ConfigOption("image_store_max_mb", float, 2048.0, "图片目录总大小上限(MB)，0表示不限制", 0, 1048576),
+
+    # 导出
+    ConfigOption("excel_append_split_mb", float, 20.0, "追加的工作簿超过此大小时使用分卷(MB)，0表示不使用", 0, 10240),
+
+    # 配置热重载
+    ConfigOption("config_reload_interval", float, 2.0, "检查配置文件变化的间隔(秒)，0表示不检查", 0, 3600),
+
+    # 性能统计接口（修改后自动重启）
+    ConfigOption("metrics_port", int, 0, "性能统计HTTP接口端口，0表示不启用", 0, 65535),
+    ConfigOption("metrics_host", str, "127.0.0.1", "性能统计HTTP接口监听地址，0.0.0.0表示允许其他机器访问"),
+    ConfigOption("metrics_refresh_ms", int, 1000, "性能统计面板刷新间隔(毫秒)", 100, 60000),
+
+    # 采样分析
+    ConfigOption("sampling_profiler", bool, False, "启动时或改为true时开始采样分析"),
+    ConfigOption("sampling_profile_duration", float, 30.0, "采样分析时长(秒)", 1, 3600),
+    ConfigOption("sampling_profile_interval", float, 0.01, "采样间隔(秒)", 0.001, 1),
+    ConfigOption("sampling_profile_threads", tuple, ("auto-get", "ocr-", "camera-", "rfid-"),
+                 "采样的线程名前缀", item_type=str),
+)
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据列表视图模块
+
+提供两种数据列表显示方式，接口一致：
+- TreeDataView: 普通模式，每条记录对应一个Treeview行，增删改只操作受影响的行
+- VirtualDataView: 虚拟列表模式，只创建可见的行，排序和筛选在后台数据上完成，
+  适合数万条以上的长时间连续采集
+"""
+import bisect
+import itertools
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+# 虚拟列表默认行高(像素)，无法从界面测量时使用
+DEFAULT_ROW_HEIGHT = 20
+# 鼠标滚轮每格滚动的行数
+WHEEL_SCROLL_ROWS = 3
+# 筛选输入防抖时间(毫秒)
+FILTER_DEBOUNCE_MS = 200
+
+
+class TreeDataView:
+    """普通数据列表视图
+
+    每条记录对应一个以记录键为iid的Treeview行。
+    """
+
+    def __init__(self, parent, columns: Sequence[str], column_widths: Dict[str, int],
+                 values_func: Callable[[dict], tuple], key_func: Callable[[dict], object], height: int = 8):
+        """初始化视图
+
+        Args:
+            parent: 父容器
+            columns: 列名列表
+            column_widths: 列宽设置，列名 -> 像素宽度
+            values_func: 记录 -> 显示值元组
+            key_func: 记录 -> 唯一键
+            height: 显示行数
+        """
+        self.frame = ttk.Frame(parent)
+        self.values_func = values_func
+        self.key_func = key_func
+
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=height)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=column_widths.get(col, 80))
+
+        scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+    def bind_double_click(self, callback: Callable[[object], None]) -> None:
+        """绑定双击事件，回调参数为被双击记录的键"""
+        def on_double_click(event):
+            keys = self.selected_keys()
+            if keys:
+                callback(keys[0])
+        self.tree.bind("<Double-1>", on_double_click)
+
+    def append(self, record: dict) -> None:
+        """在末尾追加一条记录"""
+        self.tree.insert("", "end", iid=str(self.key_func(record)), values=self.values_func(record))
+
+    def update(self, record: dict) -> None:
+        """刷新一条记录的显示"""
+        iid = str(self.key_func(record))
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self.values_func(record))
+
+    def remove(self, records: Iterable[dict]) -> None:
+        """删除多条记录"""
+        iids = [str(self.key_func(record)) for record in records]
+        if iids:
+            self.tree.delete(*iids)
+
+    def clear(self) -> None:
+        """清空所有记录"""
+        self.tree.delete(*self.tree.get_children())
+
+    def selected_keys(self) -> List[object]:
+        """获取选中记录的键"""
+        return [self._key_from_iid(iid) for iid in self.tree.selection()]
+
+    def _key_from_iid(self, iid: str):
+        return int(iid) if iid.isdigit() else iid
+
+
+class VirtualDataView:
+    """虚拟数据列表视图
+
+    后台数据保存在字典中，界面只保留可见范围内的Treeview行，
+    滚动时按偏移量重新填充可见行；排序和筛选只作用于后台数据的索引列表。
+    """
+
+    def __init__(self, parent, columns: Sequence[str], column_widths: Dict[str, int],
+                 values_func: Callable[[dict], tuple], key_func: Callable[[dict], object], height: int = 8):
+        """初始化视图，参数与TreeDataView相同"""
+        self.frame = ttk.Frame(parent)
+        self.columns = list(columns)
+        self.values_func = values_func
+        self.key_func = key_func
+
+        self._records = {}          # 键 -> 记录，保持插入顺序
+        self._order = {}            # 键 -> 插入序号，用于默认排序
+        self._counter = itertools.count()
+        self._view = []             # 筛选后的有序索引: (排序值, 插入序号, 键)
+        self._selected = set()      # 选中记录的键（不限于可见行）
+        self._offset = 0            # 第一条可见记录在视图中的位置
+        self._visible_rows = height
+        self._sort_column = None    # None 表示按插入顺序
+        self._sort_reverse = False
+        self._filter_text = ""
+        self._filter_timer = None
+        self._render_pending = False
+
+        # 筛选栏
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(filter_frame, text="筛选:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.filter_var, width=25).pack(side=tk.LEFT)
+        self.count_label = ttk.Label(filter_frame, text="", foreground="gray")
+        self.count_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.filter_var.trace_add("write", self._on_filter_changed)
+
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=height,
+                                 selectmode="extended")
+        for index, col in enumerate(columns):
+            self.tree.heading(col, text=col, command=lambda i=index: self.sort_by(i))
+            self.tree.column(col, width=column_widths.get(col, 80))
+
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(1, weight=1)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_rows(-WHEEL_SCROLL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_rows(WHEEL_SCROLL_ROWS))
+        self.tree.bind("<Prior>", lambda e: self._scroll_rows(-self._visible_rows))
+        self.tree.bind("<Next>", lambda e: self._scroll_rows(self._visible_rows))
+
+    # ---------- 数据操作 ----------
+
+    def bind_double_click(self, callback: Callable[[object], None]) -> None:
+        """绑定双击事件，回调参数为被双击记录的键"""
+        def on_double_click(event):
+            iid = self.tree.identify_row(event.y)
+            if iid:
+                callback(self._key_from_iid(iid))
+        self.tree.bind("<Double-1>", on_double_click)
+
+    def append(self, record: dict) -> None:
+        """追加一条记录，只有落在可见范围内时才刷新界面"""
+        key = self.key_func(record)
+        self._records[key] = record
+        self._order[key] = next(self._counter)
+        if self._matches(record):
+            entry = self._view_entry(key, record)
+            position = bisect.bisect(self._view, entry)
+            self._view.insert(position, entry)
+            self._schedule_render()
+
+    def update(self, record: dict) -> None:
+        """刷新一条记录（排序值或筛选结果可能变化）"""
+        key = self.key_func(record)
+        if key not in self._records:
+            return
+        self._records[key] = record
+        self._view = [entry for entry in self._view if entry[2] != key]
+        if self._matches(record):
+            bisect.insort(self._view, self._view_entry(key, record))
+        self._schedule_render()
+
+    def remove(self, records: Iterable[dict]) -> None:
+        """删除多条记录，一次重建索引列表"""
+        keys = {self.key_func(record) for record in records}
+        if not keys:
+            return
+        for key in keys:
+            self._records.pop(key, None)
+            self._order.pop(key, None)
+        self._selected -= keys
+        self._view = [entry for entry in self._view if entry[2] not in keys]
+        self._schedule_render()
+
+    def clear(self) -> None:
+        """清空所有记录"""
+        self._records.clear()
+        self._order.clear()
+        self._selected.clear()
+        self._view = []
+        self._offset = 0
+        self._schedule_render()
+
+    def selected_keys(self) -> List[object]:
+        """获取选中记录的键（包括滚动到可见范围之外的选中记录）"""
+        return [key for key in self._records if key in self._selected]
+
+    def sort_by(self, column_index: Optional[int]) -> None:
+        """按列排序，重复点击同一列切换升降序
+
+        Args:
+            column_index: 列序号，None表示恢复插入顺序
+        """
+        if column_index is not None and column_index == self._sort_column:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_column = column_index
+            self._sort_reverse = False
+
+        for index, col in enumerate(self.columns):
+            arrow = ""
+            if index == self._sort_column:
+                arrow = " ▼" if self._sort_reverse else " ▲"
+            self.tree.heading(col, text=col + arrow)
+
+        self._rebuild_view()
+
+    # ---------- 内部实现 ----------
+
+    def _key_from_iid(self, iid: str):
+        return int(iid) if iid.isdigit() else iid
+
+    def _view_entry(self, key, record):
+        if self._sort_column is None:
+            sort_value = 0
+        else:
+            sort_value = self.values_func(record)[self._sort_column]
+            if not isinstance(sort_value, (int, float)):
+                sort_value = str(sort_value)
+        return (sort_value, self._order[key], key)
+
+    def _matches(self, record: dict) -> bool:
+        if not self._filter_text:
+            return True
+        text = self._filter_text
+        return any(text in str(value).lower() for value in self.values_func(record))
+
+    def _rebuild_view(self) -> None:
+        self._view = sorted(self._view_entry(key, record)
+                            for key, record in self._records.items() if self._matches(record))
+        self._offset = 0
+        self._schedule_render()
+
+    def _on_filter_changed(self, *args):
+        if self._filter_timer:
+            self.tree.after_cancel(self._filter_timer)
+        self._filter_timer = self.tree.after(FILTER_DEBOUNCE_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_timer = None
+        self._filter_text = self.filter_var.get().strip().lower()
+        self._rebuild_view()
+
+    def _view_key_at(self, position: int):
+        """视图中第position条记录的键（考虑降序）"""
+        if self._sort_reverse:
+            return self._view[len(self._view) - 1 - position][2]
+        return self._view[position][2]
+
+    def _schedule_render(self) -> None:
+        """合并同一轮事件循环中的多次刷新"""
+        if not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render)
+
+    def _render(self) -> None:
+        self._render_pending = False
+        total = len(self._view)
+        max_offset = max(0, total - self._visible_rows)
+        self._offset = min(max(self._offset, 0), max_offset)
+
+        visible_keys = [self._view_key_at(position)
+                        for position in range(self._offset, min(total, self._offset + self._visible_rows))]
+
+        self.tree.delete(*self.tree.get_children())
+        for key in visible_keys:
+            self.tree.insert("", "end", iid=str(key), values=self.values_func(self._records[key]))
+
+        selected = [str(key) for key in visible_keys if key in self._selected]
+        self.tree.selection_set(selected)
+
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + self._visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_label.config(text=f"显示 {total}/{len(self._records)} 条")
+
+    def _on_select(self, event):
+        visible = {self._key_from_iid(iid) for iid in self.tree.get_children()}
+        current = {self._key_from_iid(iid) for iid in self.tree.selection()}
+        self._selected = (self._selected - visible) | current
+
+    def _on_configure(self, event):
+        """窗口大小变化时重新计算可见行数"""
+        row_height = DEFAULT_ROW_HEIGHT
+        heading_height = DEFAULT_ROW_HEIGHT
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                heading_height, row_height = bbox[1], bbox[3]
+        rows = max(1, (event.height - heading_height) // max(row_height, 1))
+        if rows != self._visible_rows:
+            self._visible_rows = rows
+            self._schedule_render()
+
+    def _on_scrollbar(self, *args):
+        total = len(self._view)
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * total)
+            self._schedule_render()
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self._visible_rows
+            self._scroll_rows(amount)
+
+    def _on_mousewheel(self, event):
+        self._scroll_rows(-WHEEL_SCROLL_ROWS if event.delta > 0 else WHEEL_SCROLL_ROWS)
+        return "break"
+
+    def _scroll_rows(self, rows: int):
+        self._offset += rows
+        self._schedule_render()
+        return "break"
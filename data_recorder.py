@@ -1,18 +1,40 @@
+import sys
+import startup_profiler
+# 启动分析需要在其他导入之前开始，才能统计到全部模块的导入耗时
+if __name__ == "__main__" and startup_profiler.parse_option(sys.argv) is not None:
+    startup_profiler.start()
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import openpyxl
-from openpyxl.drawing.image import Image as ExcelImage
 import os
 import io
+import importlib
+import importlib.util
 from datetime import datetime
 import threading
 import time
-import cv2
-import numpy as np
-import serial.tools.list_ports
-from config.config_manager import get_config, set_config, save_config
-import sys
+from config.config_manager import (get_config, set_config, save_config, flush_config, get_config_dir,
+                                   subscribe_config, start_config_watch, stop_config_watch)
+from data_list_view import TreeDataView, VirtualDataView
+from record_store import Record, RecordStore, DedupIndex
+from excel_exporter import (ExcelExportJob, write_empty_export_file, validate_workbook_file,
+                            should_append_as_parts, get_parts_dir, DEFAULT_APPEND_SPLIT_SIZE_MB)
+from history_index import HistoryIndex
+from record_journal import RecordJournal, EXPORT_CANCELLED
+from image_store import ImageStore, DEFAULT_IMAGE_STORE_MAX_MB
+from preview_cache import PreviewCache, DEFAULT_PREVIEW_CACHE_SIZE
+from preview_renderer import PreviewRenderer, PreviewLoadController, PREVIEW_SIZE
+from lazy_import import LazyModule
+from metrics import metrics
+from metrics_panel import MetricsPanel, DEFAULT_PANEL_REFRESH_MS
+from metrics_server import MetricsServer
+from sampling_profiler import SamplingProfiler, DEFAULT_PROFILE_THREADS
+from device_discovery import DeviceDiscovery, DEFAULT_CAMERA_PROBE_COUNT, DEFAULT_CAMERA_CACHE_TTL, \
+    DEFAULT_DEVICE_WATCH_INTERVAL
+
+# cv2和PIL导入较慢，第一次使用时才导入（启动后在后台线程中预先导入）
+cv2 = LazyModule("cv2")
+Image = LazyModule("PIL.Image")
 
 
 # 导入RFID和OCR功能
@@ -28,33 +50,49 @@ except ImportError as e:
     class TimeoutDetectedException(Exception):
         pass
 
-try:
-    from rapidocr_onnxruntime import RapidOCR
-    OCR_AVAILABLE = True
-except ImportError as e:
-    print(f"警告: 无法导入OCR工具: {e}")
-    OCR_AVAILABLE = False
+# OCR模块（含onnxruntime）导入很慢，启动时只检查是否已安装，在后台初始化OCR时才导入
+OCR_AVAILABLE = importlib.util.find_spec("rapidocr_onnxruntime") is not None
+if not OCR_AVAILABLE:
+    print("警告: 无法导入OCR工具: 未安装rapidocr_onnxruntime")
 
 # ==================== 配置常量 ====================
-# TID读取配置
-DEFAULT_TID_REQUIRED_COUNT = 5      # TID需要连续读取的次数
-DEFAULT_TID_MAX_DURATION = 2        # TID读取最大持续时间(秒)
-
-# OCR识别配置  
-DEFAULT_OCR_REQUIRED_COUNT = 3      # OCR需要连续识别的次数
-DEFAULT_OCR_MAX_ATTEMPTS_MANUAL = 50    # 手动OCR识别最大尝试次数
-DEFAULT_OCR_MAX_ATTEMPTS_AUTO = 20      # 自动OCR识别最大尝试次数
-
-# 界面更新配置
-DEFAULT_OCR_SLEEP_INTERVAL = 0.1    # OCR识别间隔时间(秒)
-DEFAULT_AUTO_GET_INTERVAL = 1       # 自动获取循环间隔时间(秒)
+# TID/OCR识别次数、识别和自动获取的间隔等可在运行中调整的参数定义在config/config_schema.py，
+# 使用时通过get_config读取，修改配置文件后立即生效
 
 # 其他时间配置
-DEFAULT_RFID_OPERATION_DELAY = 0.5  # RFID操作间隔时间(秒)
 DEFAULT_CAMERA_FPS_DELAY = 0.03     # 摄像头帧率延迟(秒, 约30fps)
-DEFAULT_ERROR_RETRY_DELAY = 2       # 错误重试延迟时间(秒)
 DEFAULT_THREAD_STOP_WAIT = 0.5      # 线程停止等待时间(秒)
 DEFAULT_CAMERA_STOP_WAIT = 0.1      # 摄像头停止等待时间(秒)
+DEFAULT_EXPORT_CANCEL_WAIT = 5      # 退出时等待导出任务取消的时间(秒)
+DEFAULT_DEVICE_INIT_WAIT = 3        # 退出时等待设备初始化/检测结束的时间(秒)
+
+# 后台初始化配置
+BACKGROUND_PRELOAD_MODULES = ("cv2", "PIL.Image", "PIL.ImageTk", "openpyxl", "openpyxl.drawing.image")
+SUBSYSTEM_LOADING = "loading"          # 正在初始化
+SUBSYSTEM_READY = "ready"              # 已就绪
+SUBSYSTEM_FAILED = "failed"            # 初始化失败
+SUBSYSTEM_UNAVAILABLE = "unavailable"  # 模块未安装
+SUBSYSTEM_NAMES = {"ocr": "OCR", "rfid": "RFID", "camera": "摄像头"}
+SUBSYSTEM_STATE_TEXT = {
+    SUBSYSTEM_LOADING: "加载中",
+    SUBSYSTEM_READY: "就绪",
+    SUBSYSTEM_FAILED: "失败",
+    SUBSYSTEM_UNAVAILABLE: "不可用",
+}
+
+# 历史导出索引配置
+DEFAULT_HISTORY_INDEX_FILE = "history_index.db"  # 历史索引数据库文件名(保存在配置目录)
+DEFAULT_HISTORY_IMPORT_STOP_WAIT = 5              # 退出时等待历史导入停止的时间(秒)
+
+# 数据日志配置
+DEFAULT_JOURNAL_FILE = "record_journal.db"  # 未导出数据日志文件名(保存在配置目录)
+DEFAULT_JOURNAL_CLOSE_WAIT = 5              # 退出时等待日志写完的时间(秒)
+
+# 图片存储配置
+DEFAULT_IMAGE_STORE_DIR = "images"          # 捕获图片的保存目录(位于配置目录)
+
+# 采样分析配置
+DEFAULT_SAMPLING_PROFILE_DIR = "profiles"   # 采样分析结果的保存目录(位于配置目录)
 # ==================== 配置常量结束 ====================
 
 # PyInstaller 打包后获取资源路径的工具函数
@@ -85,76 +123,389 @@ class DataRecorderApp:
         self.last_recognized_text = None
         self.ocr_count = 0
 
+        # OCR或自动获取运行时降低预览帧率和缩放质量，把CPU让给OCR
+        self.preview_load = PreviewLoadController(DEFAULT_CAMERA_FPS_DELAY, get_config('preview_adaptive', True))
+
         # RFID相关
         self.rfid_connected = False
 
+        # OCR、RFID和摄像头在后台初始化，各自就绪后更新界面
+        self.subsystem_status = {
+            "ocr": SUBSYSTEM_LOADING if OCR_AVAILABLE else SUBSYSTEM_UNAVAILABLE,
+            "rfid": SUBSYSTEM_LOADING if RFID_AVAILABLE else SUBSYSTEM_UNAVAILABLE,
+            "camera": SUBSYSTEM_LOADING,
+        }
+        self.device_lock = threading.Lock()  # 串行执行设备的连接、切换和检测
+        self.camera_index = None  # 当前打开的摄像头索引
+        self.metrics_panel = None  # 性能统计窗口，第一次打开时创建
+
+        # 设备检测（摄像头并行检测并缓存结果，插拔时自动刷新列表）
+        self.device_discovery = DeviceDiscovery(get_config('camera_probe_count', DEFAULT_CAMERA_PROBE_COUNT),
+                                                get_config('camera_cache_ttl', DEFAULT_CAMERA_CACHE_TTL))
+        self.camera_probe_running = False
+
         # 自动获取相关
         self.auto_running = False
         self.auto_thread = None
 
         # 数据存储列表
-        self.data_list = []  # 存储读取到的数据
-        self.data_set = set()  # 用于去重
+        # 存储读取到的数据，同时按配置的规则维护去重索引
+        self.record_store = RecordStore(get_config('dedup_policy', DedupIndex.POLICY_PAIR))
+
+        # 后台导出任务
+        self.export_job = None
+        self.export_record_ids = []  # 正在导出的数据记录ID（用于导出后移除）
+        self.export_image_paths = []  # 正在导出的数据的图片（导出期间保持引用，删除数据时不会被清理）
+        self.export_journal_id = None  # 正在导出的任务在数据日志中的ID
+
+        # 历史导出索引（跨会话去重）
+        self.history_index = None
+        self.history_import_thread = None
+        self.history_import_cancel = threading.Event()  # 退出时通知历史导入停止
+        with startup_profiler.span("历史索引"):
+            self.init_history_index()
+
+        # 未导出数据的预写日志（崩溃后恢复）
+        self.journal = None
+        with startup_profiler.span("数据日志恢复"):
+            recovered_count = self.init_record_journal()
+
+        # 预览图缓存（捕获时生成缩略图，显示时不再读取和缩放图片）
+        self.preview_cache = PreviewCache(get_config('preview_cache_size', DEFAULT_PREVIEW_CACHE_SIZE))
+
+        # 捕获图片的存储（恢复的记录仍在使用的图片会被保留）
+        self.image_store = None
+        with startup_profiler.span("图片存储"):
+            self.init_image_store()
 
         # 状态提示相关
         self.status_message_timer = None  # 状态消息定时器
 
-        # 初始化硬件
-        self.init_hardware()
+        self.startup_profile_written = False
+        with startup_profiler.span("界面创建"):
+            self.setup_ui()
+
+        # 显示上次未导出的数据
+        if recovered_count:
+            for data in self.record_store:
+                self.data_view.append(data)
+            self.status_label.config(text=f"状态：已恢复 {recovered_count} 条未导出数据", foreground="blue")
+            self.show_status_message(f"已恢复上次未导出的 {recovered_count} 条数据", "info", 6000)
 
-        self.setup_ui()
+        # 检查上次是否有未完成的导出
+        if self.journal:
+            self.root.after(500, self.resume_pending_export)
 
         # 加载配置并初始化设备列表
         self.load_config()
         self.refresh_ports()
-        self.refresh_cameras()
 
-    def init_hardware(self):
-        """初始化硬件设备"""
-        # 初始化OCR
+        # 配置文件被外部修改时自动重新加载（识别参数在下次使用时生效，识别次数同步到界面）
+        subscribe_config(lambda key, old, new: self._post_to_ui(self._apply_config_change, key, new),
+                         ('ocr_required_count', 'tid_required_count'))
+        if get_config('config_reload_interval') > 0:
+            start_config_watch()
+
+        # 性能统计HTTP接口（metrics_port为0时不启用，修改端口或地址后重新启动）
+        self.metrics_server = MetricsServer(metrics)
+        self.metrics_server.start(get_config('metrics_port'), get_config('metrics_host'))
+        subscribe_config(lambda key, old, new: self.metrics_server.start(get_config('metrics_port'),
+                                                                         get_config('metrics_host')),
+                         ('metrics_port', 'metrics_host'))
+
+        # 采样分析（工具菜单或配置项sampling_profiler开启）
+        self.sampling_profiler = SamplingProfiler(get_config('sampling_profile_threads', DEFAULT_PROFILE_THREADS))
+        subscribe_config(lambda key, old, new: new and self.start_sampling_profile(), ('sampling_profiler',))
+        if get_config('sampling_profiler'):
+            self.start_sampling_profile()
+
+        # 窗口显示后再在后台导入依赖、初始化OCR和设备（完成后检测摄像头列表）
+        self.start_background_init()
+
+    def start_background_init(self):
+        """启动后台初始化：OCR、设备（RFID和摄像头）、其他依赖模块各用一个线程"""
         if OCR_AVAILABLE:
+            threading.Thread(target=self.init_ocr, name="ocr-init", daemon=True).start()
+        threading.Thread(target=self.init_devices, name="device-init", daemon=True).start()
+        threading.Thread(target=self.preload_modules, name="module-preload", daemon=True).start()
+
+    def preload_modules(self):
+        """预先导入导出和预览使用的模块（后台线程）"""
+        for name in BACKGROUND_PRELOAD_MODULES:
             try:
-                print("正在初始化OCR...")
-                # self.ocr_reader = RapidOCR()
-                # 修改后（指定模型文件夹路径）
-                config_path = resource_path("rapidocr_onnxruntime/config.yaml")
+                with startup_profiler.span(f"预加载 {name}"):
+                    importlib.import_module(name)
+            except ImportError as e:
+                print(f"⚠️ 预加载模块失败: {name}: {e}")
+
+    def init_ocr(self):
+        """初始化OCR引擎（后台线程）"""
+        try:
+            print("正在初始化OCR...")
+            with startup_profiler.span("OCR导入"):
+                from rapidocr_onnxruntime import RapidOCR
+            # 指定模型文件夹路径
+            config_path = resource_path("rapidocr_onnxruntime/config.yaml")
+            with startup_profiler.span("OCR模型加载"):
                 self.ocr_reader = RapidOCR(config_path=config_path)
-                print("✅ OCR初始化成功")
-                # import rapidocr_onnxruntime
-                # print("OCR模型路径：", rapidocr_onnxruntime.__path__)
-            except Exception as e:
-                print(f"❌ OCR初始化失败: {e}")
-                self.ocr_reader = None
+            print("✅ OCR初始化成功")
+            status = SUBSYSTEM_READY
+        except Exception as e:
+            print(f"❌ OCR初始化失败: {e}")
+            self.ocr_reader = None
+            status = SUBSYSTEM_FAILED
+        self.post_subsystem_status("ocr", status)
+
+    def init_devices(self):
+        """连接RFID、打开摄像头，然后检测可用的摄像头（后台线程）"""
+        with self.device_lock:
+            # 初始化RFID（从配置文件读取端口）
+            if RFID_AVAILABLE:
+                with startup_profiler.span("RFID连接"):
+                    self._connect_rfid(get_config('rfid_port', rfid_util.port))
+
+            # 初始化摄像头（从配置文件读取索引）
+            with startup_profiler.span("摄像头打开"):
+                self._open_camera(get_config('camera_index', 0))
+
+            with startup_profiler.span("摄像头检测"):
+                camera_list = self._probe_cameras()
+        self._post_to_ui(self._apply_camera_list, camera_list)
+
+        # 设备插拔时自动刷新列表
+        watch_interval = get_config('device_watch_interval', DEFAULT_DEVICE_WATCH_INTERVAL)
+        if watch_interval > 0:
+            self.device_discovery.start_watch(
+                lambda ports: self._post_to_ui(self._apply_port_list, ports),
+                lambda: self._post_to_ui(self.refresh_cameras),
+                watch_interval
+            )
 
-        # 初始化RFID（从配置文件读取端口）
-        if RFID_AVAILABLE:
-            try:
-                rfid_port = get_config('rfid_port', 'COM1')
-                print(f"正在连接RFID设备 (端口: {rfid_port})...")
-                self.rfid_connected = rfid_util.connect()
-                if self.rfid_connected:
-                    print(f"✅ RFID设备连接成功 (端口: {rfid_port})")
-                else:
-                    print(f"❌ RFID设备连接失败 (端口: {rfid_port})")
-            except Exception as e:
-                print(f"❌ RFID连接失败: {e}")
-                self.rfid_connected = False
+    def _connect_rfid(self, port):
+        """连接RFID设备并上报状态，已有的连接先关闭（调用方持有device_lock）
 
-        # 初始化摄像头（从配置文件读取索引）
+        Args:
+            port: 串口名称
+        """
         try:
-            camera_index = get_config('camera_index', 0)
+            rfid_util.close()
+            rfid_util.port = port
+            print(f"正在连接RFID设备 (端口: {port})...")
+            self.rfid_connected = rfid_util.connect()
+            if self.rfid_connected:
+                print(f"✅ RFID设备连接成功 (端口: {port})")
+            else:
+                print(f"❌ RFID设备连接失败 (端口: {port})")
+        except Exception as e:
+            print(f"❌ RFID连接失败: {e}")
+            self.rfid_connected = False
+        self.post_subsystem_status("rfid", SUBSYSTEM_READY if self.rfid_connected else SUBSYSTEM_FAILED)
+
+    def _open_camera(self, camera_index):
+        """打开摄像头并上报状态，原来打开的摄像头先释放（调用方持有device_lock）"""
+        try:
+            if self.camera:
+                self.camera.release()
+                self.camera = None
+                self.camera_index = None
             print(f"正在初始化摄像头 (索引: {camera_index})...")
-            self.camera = cv2.VideoCapture(camera_index)
-            if self.camera.isOpened():
+            camera = cv2.VideoCapture(camera_index)
+            if camera.isOpened():
+                self.camera = camera
+                self.camera_index = camera_index
                 print(f"✅ 摄像头初始化成功 (索引: {camera_index})")
             else:
                 print(f"❌ 摄像头初始化失败 (索引: {camera_index})")
-                self.camera = None
         except Exception as e:
             print(f"❌ 摄像头初始化失败: {e}")
             self.camera = None
+        self.post_subsystem_status("camera", SUBSYSTEM_READY if self.camera else SUBSYSTEM_FAILED)
+
+    def _reconnect_rfid(self, port):
+        """切换端口后重新连接RFID（后台线程）"""
+        with self.device_lock:
+            self._connect_rfid(port)
+
+    def _reopen_camera(self, camera_index):
+        """切换摄像头后重新打开（后台线程）"""
+        with self.device_lock:
+            self._open_camera(camera_index)
+
+    def _post_to_ui(self, func, *args):
+        """从后台线程把回调交给Tk线程执行，窗口已关闭时忽略"""
+        try:
+            self.root.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def post_subsystem_status(self, name, status):
+        """从后台线程上报子系统状态"""
+        self._post_to_ui(self.set_subsystem_status, name, status)
+
+    def set_subsystem_status(self, name, status):
+        """更新子系统状态显示和相关按钮（只能在Tk线程调用）
+
+        Args:
+            name: 子系统名称（"ocr"、"rfid"、"camera"）
+            status: SUBSYSTEM_*状态
+        """
+        self.subsystem_status[name] = status
+        parts = [f"{SUBSYSTEM_NAMES[key]} {SUBSYSTEM_STATE_TEXT[value]}" for key, value in self.subsystem_status.items()]
+        statuses = set(self.subsystem_status.values())
+        if SUBSYSTEM_FAILED in statuses:
+            color = "red"
+        elif SUBSYSTEM_LOADING in statuses:
+            color = "gray"
+        else:
+            color = "green"
+        self.subsystem_status_label.config(text="设备状态：" + " | ".join(parts), foreground=color)
+        self.update_hardware_buttons()
+        if SUBSYSTEM_LOADING not in statuses:
+            self.write_startup_profile()
+
+    def write_startup_profile(self):
+        """各子系统初始化完成后写入启动耗时报告（只在使用 --profile-startup 启动时）"""
+        profiler = startup_profiler.get_profiler()
+        if profiler is None or self.startup_profile_written:
+            return
+        self.startup_profile_written = True
+        profiler.mark("设备初始化完成")
+        try:
+            print(f"📊 启动耗时报告已写入: {profiler.write_report()}")
+        except OSError as e:
+            print(f"⚠️ 启动耗时报告写入失败: {e}")
+
+    def update_hardware_buttons(self):
+        """按硬件是否可用启用或禁用相关按钮（只能在Tk线程调用）"""
+        has_rfid = RFID_AVAILABLE and self.rfid_connected
+        has_camera = self.camera is not None
+        self.tid_auto_btn.config(state="normal" if has_rfid else "disabled")
+        self.label_auto_btn.config(state="normal" if OCR_AVAILABLE and has_camera else "disabled")
+        self.camera_capture_btn.config(state="normal" if has_camera else "disabled")
+        if not self.camera_running:
+            self.camera_start_btn.config(state="normal" if has_camera else "disabled")
+        if self.auto_running:
+            return
+
+        hardware_texts = ("状态：硬件不可用", "状态：设备初始化中")
+        if has_rfid or (OCR_AVAILABLE and has_camera):
+            self.auto_btn.config(state="normal")
+            if self.status_label.cget("text") in hardware_texts:
+                self.status_label.config(text="状态：未开始", foreground="gray")
+        else:
+            self.auto_btn.config(state="disabled")
+            if SUBSYSTEM_LOADING in (self.subsystem_status["rfid"], self.subsystem_status["camera"]):
+                self.status_label.config(text="状态：设备初始化中", foreground="gray")
+            else:
+                self.status_label.config(text="状态：硬件不可用", foreground="red")
+
+    def init_history_index(self):
+        """打开历史导出索引，失败时只在当前会话内去重"""
+        if not get_config('history_dedup_enabled', True):
+            print("ℹ️ 历史导出去重已关闭")
+            return
+        db_file = get_config('history_index_file', '') or os.path.join(get_config_dir(), DEFAULT_HISTORY_INDEX_FILE)
+        try:
+            self.history_index = HistoryIndex(db_file)
+            print(f"✅ 历史导出索引已打开: {db_file} ({self.history_index.count()} 条)")
+        except Exception as e:
+            self.history_index = None
+            print(f"⚠️ 无法打开历史导出索引，仅在当前会话内去重: {e}")
+
+    def init_record_journal(self):
+        """打开未导出数据日志，恢复其中的记录
+
+        Returns:
+            int: 恢复的记录数
+        """
+        if not get_config('journal_enabled', True):
+            print("ℹ️ 数据日志已关闭，未导出的数据不会在重启后恢复")
+            return 0
+        db_file = get_config('journal_file', '') or os.path.join(get_config_dir(), DEFAULT_JOURNAL_FILE)
+        try:
+            # 写入失败时每次都在状态栏提示（日志是本次采集数据的唯一存储）
+            self.journal = RecordJournal(
+                db_file, on_error=lambda message: self._post_to_ui(self.show_status_message, message, "error", 8000)
+            )
+            recovered = self.journal.load()
+        except Exception as e:
+            self.journal = None
+            print(f"⚠️ 无法打开数据日志，未导出的数据不会在重启后恢复: {e}")
+            return 0
+
+        # 先恢复记录再关联日志，恢复的记录保留原来的journal_id，不会重复写入
+        for data in recovered:
+            self.record_store.add(Record.from_dict(data))
+        self.record_store.attach_journal(self.journal)
+        if recovered:
+            print(f"✅ 已从数据日志恢复 {len(recovered)} 条未导出数据")
+        return len(recovered)
+
+    def init_image_store(self):
+        """打开图片存储，登记列表中记录使用的图片并清理上次遗留的图片"""
+        store_dir = get_config('image_store_dir', '') or os.path.join(get_config_dir(), DEFAULT_IMAGE_STORE_DIR)
+        try:
+            self.image_store = ImageStore(store_dir, get_config('image_store_max_mb', DEFAULT_IMAGE_STORE_MAX_MB))
+        except Exception as e:
+            self.image_store = None
+            print(f"⚠️ 无法打开图片存储，捕获的图片将保存到临时目录: {e}")
+            return
+
+        for data in self.record_store:
+            self.image_store.acquire(data.image_path)
+        self.image_store.sweep()
+        print(f"✅ 图片存储已打开: {store_dir} ({self.image_store.total_size() / 1024 / 1024:.1f}MB)")
+
+    def save_captured_image(self, data, ext):
+        """保存捕获的图片数据
+
+        Args:
+            data: 编码后的图片数据
+            ext: 文件扩展名
+
+        Returns:
+            str: 图片文件路径
+        """
+        if self.image_store:
+            return self.image_store.put(data, ext)
+
+        # 图片存储不可用时保存到临时目录
+        import tempfile
+        temp_dir = os.path.join(tempfile.gettempdir(), "auto_capture")
+        os.makedirs(temp_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # 精确到毫秒
+        temp_image_path = os.path.join(temp_dir, f"auto_capture_{timestamp}{ext}")
+        with open(temp_image_path, 'wb') as f:
+            f.write(data)
+        return temp_image_path
+
+    def discard_captured_image(self, image_path):
+        """丢弃没有被记录使用的捕获图片"""
+        if not image_path:
+            return
+        if self.image_store and self.image_store.is_managed(image_path):
+            self.image_store.discard(image_path)
+        elif "auto_capture" in image_path and os.path.exists(image_path):
+            try:
+                os.unlink(image_path)
+            except:
+                pass
+
+    def release_record_images(self, records):
+        """登记记录已移出列表，不再使用的图片由图片存储清理"""
+        if self.image_store:
+            self.image_store.release([data.image_path for data in records])
 
     def setup_ui(self):
+        # 菜单栏
+        menubar = tk.Menu(self.root)
+        self.tools_menu = tk.Menu(menubar, tearoff=0)
+        self.tools_menu.add_command(label="性能统计", command=self.show_metrics_panel)
+        self.tools_menu.add_command(label="采样分析", command=self.toggle_sampling_profile)
+        self.sampling_menu_index = self.tools_menu.index(tk.END)
+        menubar.add_cascade(label="工具", menu=self.tools_menu)
+        self.root.config(menu=menubar)
+
         # 主框架
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -183,7 +534,7 @@ class DataRecorderApp:
         self.camera_var = tk.StringVar()
         self.camera_combo = ttk.Combobox(config_frame, textvariable=self.camera_var, width=15, state="readonly")
         self.camera_combo.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 5), pady=(0, 5))
-        ttk.Button(config_frame, text="刷新", command=self.refresh_cameras).grid(row=1, column=2, padx=(0, 5), pady=(0, 5))
+        ttk.Button(config_frame, text="刷新", command=lambda: self.refresh_cameras(force=True)).grid(row=1, column=2, padx=(0, 5), pady=(0, 5))
 
         # 高级设置行
         adv_settings_frame = ttk.Frame(config_frame)
@@ -191,13 +542,13 @@ class DataRecorderApp:
 
         # OCR识别次数
         ttk.Label(adv_settings_frame, text="OCR次数:").pack(side=tk.LEFT, padx=(0, 2))
-        self.ocr_count_var = tk.StringVar(value=str(DEFAULT_OCR_REQUIRED_COUNT))
+        self.ocr_count_var = tk.StringVar(value=str(get_config('ocr_required_count')))
         self.ocr_count_spinbox = ttk.Spinbox(adv_settings_frame, from_=1, to=10, textvariable=self.ocr_count_var, width=5)
         self.ocr_count_spinbox.pack(side=tk.LEFT, padx=(0, 10))
 
         # TID读取次数
         ttk.Label(adv_settings_frame, text="TID次数:").pack(side=tk.LEFT, padx=(0, 2))
-        self.tid_count_var = tk.StringVar(value=str(DEFAULT_TID_REQUIRED_COUNT))
+        self.tid_count_var = tk.StringVar(value=str(get_config('tid_required_count')))
         self.tid_count_spinbox = ttk.Spinbox(adv_settings_frame, from_=1, to=10, textvariable=self.tid_count_var, width=5)
         self.tid_count_spinbox.pack(side=tk.LEFT, padx=(0, 15))
 
@@ -208,6 +559,10 @@ class DataRecorderApp:
         self.config_status_label = ttk.Label(config_frame, text="配置状态：未加载", foreground="gray")
         self.config_status_label.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
 
+        # OCR、RFID和摄像头的初始化状态
+        self.subsystem_status_label = ttk.Label(config_frame, text="", foreground="gray")
+        self.subsystem_status_label.grid(row=4, column=0, columnspan=3, sticky=tk.W, pady=(5, 0))
+
         # 绑定选择事件
         self.rfid_port_combo.bind('<<ComboboxSelected>>', self.on_rfid_port_changed)
         self.camera_combo.bind('<<ComboboxSelected>>', self.on_camera_changed)
@@ -232,8 +587,6 @@ class DataRecorderApp:
         ttk.Entry(tid_frame, textvariable=self.tid_var, width=25).grid(row=0, column=0, sticky=(tk.W, tk.E))
         self.tid_auto_btn = ttk.Button(tid_frame, text="自动获取", command=self.auto_get_tid)
         self.tid_auto_btn.grid(row=0, column=1, padx=(5, 0))
-        if not RFID_AVAILABLE or not self.rfid_connected:
-            self.tid_auto_btn.config(state="disabled")
 
         # 标签号输入
         ttk.Label(input_frame, text="标签号:").grid(row=2, column=0, sticky=tk.W, pady=(0, 5))
@@ -244,8 +597,6 @@ class DataRecorderApp:
         ttk.Entry(label_frame, textvariable=self.label_var, width=25).grid(row=0, column=0, sticky=(tk.W, tk.E))
         self.label_auto_btn = ttk.Button(label_frame, text="自动获取", command=self.auto_get_label)
         self.label_auto_btn.grid(row=0, column=1, padx=(5, 0))
-        if not OCR_AVAILABLE or not self.camera:
-            self.label_auto_btn.config(state="disabled")
 
         # 自动获取控制
         auto_frame = ttk.Frame(input_frame)
@@ -257,11 +608,6 @@ class DataRecorderApp:
         self.status_label = ttk.Label(auto_frame, text="状态：未开始", foreground="gray")
         self.status_label.grid(row=0, column=1, sticky=tk.W)
 
-        # 检查硬件可用性
-        if not ((RFID_AVAILABLE and self.rfid_connected) or (OCR_AVAILABLE and self.camera)):
-            self.auto_btn.config(state="disabled")
-            self.status_label.config(text="状态：硬件不可用", foreground="red")
-        
         # 图片选择
         ttk.Label(input_frame, text="图片:").grid(row=4, column=0, sticky=tk.W, pady=(0, 5))
         image_frame = ttk.Frame(input_frame)
@@ -270,8 +616,6 @@ class DataRecorderApp:
         ttk.Button(image_frame, text="选择图片", command=self.select_image).grid(row=0, column=0)
         self.camera_capture_btn = ttk.Button(image_frame, text="摄像头捕获", command=self.capture_from_camera)
         self.camera_capture_btn.grid(row=0, column=1, padx=(5, 0))
-        if not self.camera:
-            self.camera_capture_btn.config(state="disabled")
 
         self.image_path_label = ttk.Label(image_frame, text="未选择图片（自动获取时将自动捕获）", foreground="gray")
         self.image_path_label.grid(row=0, column=2, padx=(10, 0), sticky=tk.W)
@@ -287,31 +631,19 @@ class DataRecorderApp:
         data_list_frame = ttk.LabelFrame(left_panel, text="读取数据列表", padding="10")
         data_list_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
 
-        # 创建Treeview显示数据
+        # 创建数据列表视图（数据量很大时可在配置中启用虚拟列表模式）
         columns = ("序号", "厂家名称", "TID", "标签号", "图片来源", "时间")
-        self.data_tree = ttk.Treeview(data_list_frame, columns=columns, show="headings", height=8)
-
-        # 设置列标题
-        for col in columns:
-            self.data_tree.heading(col, text=col)
-
-        # 设置列宽
-        self.data_tree.column("序号", width=50)
-        self.data_tree.column("厂家名称", width=100)
-        self.data_tree.column("TID", width=200)
-        self.data_tree.column("标签号", width=50)
-        self.data_tree.column("图片来源", width=50)
-        self.data_tree.column("时间", width=120)
-
-        # 添加滚动条
-        scrollbar = ttk.Scrollbar(data_list_frame, orient="vertical", command=self.data_tree.yview)
-        self.data_tree.configure(yscrollcommand=scrollbar.set)
-
-        self.data_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        column_widths = {"序号": 50, "厂家名称": 100, "TID": 200, "标签号": 50, "图片来源": 50, "时间": 120}
+        view_class = VirtualDataView if get_config('data_list_virtual_mode', False) else TreeDataView
+        self.data_view = view_class(
+            data_list_frame, columns, column_widths,
+            values_func=self._tree_values,
+            key_func=lambda data: data.id
+        )
+        self.data_view.frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
 
         # 绑定双击事件进行编辑
-        self.data_tree.bind("<Double-1>", self.on_data_tree_double_click)
+        self.data_view.bind_double_click(self.on_data_tree_double_click)
 
         # 批量操作按钮
         batch_frame = ttk.Frame(data_list_frame)
@@ -319,7 +651,27 @@ class DataRecorderApp:
 
         ttk.Button(batch_frame, text="清空列表", command=self.clear_data_list).grid(row=0, column=0, padx=(0, 5))
         ttk.Button(batch_frame, text="删除选中", command=self.delete_selected).grid(row=0, column=1, padx=(5, 5))
-        ttk.Button(batch_frame, text="导出到Excel", command=self.export_to_excel, style="Accent.TButton").grid(row=0, column=2, padx=(5, 0))
+        ttk.Button(batch_frame, text="导出到Excel", command=self.export_to_excel, style="Accent.TButton").grid(row=0, column=2, padx=(5, 5))
+        self.history_import_btn = ttk.Button(batch_frame, text="导入历史", command=self.import_history_workbooks)
+        self.history_import_btn.grid(row=0, column=3, padx=(5, 5))
+        if not self.history_index:
+            self.history_import_btn.config(state="disabled")
+        history_query_btn = ttk.Button(batch_frame, text="历史记录", command=self.show_history_dialog)
+        history_query_btn.grid(row=0, column=4, padx=(5, 0))
+        if not self.journal:
+            history_query_btn.config(state="disabled")
+
+        # 导出进度显示
+        export_progress_frame = ttk.Frame(data_list_frame)
+        export_progress_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+
+        self.export_progress = ttk.Progressbar(export_progress_frame, mode="determinate", maximum=100)
+        self.export_progress.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.export_progress_label = ttk.Label(export_progress_frame, text="", foreground="gray")
+        self.export_progress_label.grid(row=0, column=1, padx=(10, 0), sticky=tk.W)
+        self.export_cancel_btn = ttk.Button(export_progress_frame, text="取消导出", command=self.cancel_export, state="disabled")
+        self.export_cancel_btn.grid(row=0, column=2, padx=(10, 0))
+        export_progress_frame.columnconfigure(0, weight=1)
         
         # 右侧摄像头和预览区域
         # 摄像头预览区域
@@ -329,6 +681,9 @@ class DataRecorderApp:
         self.camera_label = ttk.Label(camera_frame, text="摄像头未启动", anchor="center")
         self.camera_label.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
+        # 摄像头线程只发布最新帧，由渲染器在主线程按帧率刷新
+        self.preview_renderer = PreviewRenderer(self.root, self.camera_label, int(DEFAULT_CAMERA_FPS_DELAY * 1000))
+
         # 摄像头控制按钮
         camera_control_frame = ttk.Frame(camera_frame)
         camera_control_frame.grid(row=1, column=0, pady=(10, 0))
@@ -339,9 +694,6 @@ class DataRecorderApp:
         self.camera_stop_btn = ttk.Button(camera_control_frame, text="停止摄像头", command=self.stop_camera, state="disabled")
         self.camera_stop_btn.grid(row=0, column=1, padx=(5, 0))
 
-        if not self.camera:
-            self.camera_start_btn.config(state="disabled")
-
         # 图片预览区域
         preview_frame = ttk.LabelFrame(right_panel, text="图片预览", padding="10")
         preview_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -407,6 +759,10 @@ class DataRecorderApp:
         self.root.rowconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=0)
 
+        # 设备在后台初始化，就绪前相关按钮不可用
+        for name, status in self.subsystem_status.items():
+            self.set_subsystem_status(name, status)
+
     def rfid_reset(self):
         """RFID重置：停止存盘->读TID"""
         if not RFID_AVAILABLE:
@@ -419,6 +775,7 @@ class DataRecorderApp:
 
         try:
             print("🔄 开始RFID重置操作...")
+            metrics.inc("rfid.resets")
             self.config_status_label.config(text="配置状态：正在执行RFID重置...", foreground="orange")
 
             # 步骤1: 停止存盘
@@ -431,7 +788,7 @@ class DataRecorderApp:
 
             # 等待一段时间确保停止完成
             import time
-            time.sleep(DEFAULT_RFID_OPERATION_DELAY)
+            time.sleep(get_config('rfid_operation_delay'))
 
             # 步骤2: 读TID
             print("🏷️ 步骤2: 读取TID...")
@@ -514,16 +871,9 @@ class DataRecorderApp:
                 messagebox.showerror("错误", f"无法打开图片文件：{str(e)}")
     
     def show_image_preview(self, image_path):
-        """显示图片预览"""
+        """显示图片预览（最大300x300，优先使用缓存的预览图）"""
         try:
-            img = Image.open(image_path)
-            
-            # 计算预览尺寸（最大300x300）
-            max_size = 300
-            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-            
-            # 转换为tkinter可用的格式
-            self.preview_image = ImageTk.PhotoImage(img)
+            self.preview_image = self.preview_cache.get_photo(image_path)
             self.preview_label.config(image=self.preview_image, text="")
             
         except Exception as e:
@@ -553,10 +903,11 @@ class DataRecorderApp:
             """TID读取线程"""
             try:
                 # 使用计数验证读取TID，需要连续读取指定次数相同TID
-                tid = rfid_util.read_tid_with_count_verification(
-                    required_count=int(self.tid_count_var.get()),
-                    max_duration=DEFAULT_TID_MAX_DURATION
-                )
+                with metrics.span("rfid.get_tid"):
+                    tid = rfid_util.read_tid_with_count_verification(
+                        required_count=int(self.tid_count_var.get()),
+                        max_duration=get_config('tid_max_duration')
+                    )
 
                 # 在主线程中更新UI
                 self.root.after(0, self._update_tid_result, tid)
@@ -577,7 +928,7 @@ class DataRecorderApp:
                 self.root.after(0, self._update_tid_error, str(e))
 
         # 在新线程中执行TID读取
-        threading.Thread(target=read_tid_thread, daemon=True).start()
+        threading.Thread(target=read_tid_thread, name="rfid-read", daemon=True).start()
 
     def _update_tid_result(self, tid):
         """更新TID读取结果"""
@@ -612,7 +963,10 @@ class DataRecorderApp:
             return
 
         if not self.ocr_reader:
-            messagebox.showerror("错误", "OCR引擎未初始化")
+            if self.subsystem_status["ocr"] == SUBSYSTEM_LOADING:
+                messagebox.showinfo("提示", "OCR引擎正在加载，请稍后再试")
+            else:
+                messagebox.showerror("错误", "OCR引擎未初始化")
             return
 
         # 显示识别状态
@@ -622,11 +976,15 @@ class DataRecorderApp:
 
         def ocr_recognition_thread():
             """OCR识别线程"""
+            with self.preview_load.busy():
+                recognize()
+
+        def recognize():
             try:
                 # 连续识别逻辑，需要连续指定次数识别到相同的7位标签
                 last_recognized = None
                 count = 0
-                max_attempts = DEFAULT_OCR_MAX_ATTEMPTS_MANUAL  # 最大尝试次数
+                max_attempts = get_config('ocr_max_attempts_manual')  # 最大尝试次数
                 attempts = 0
 
                 while attempts < max_attempts:
@@ -635,7 +993,7 @@ class DataRecorderApp:
                         continue
 
                     # OCR识别
-                    ocr_output, _ = self.ocr_reader(frame)
+                    ocr_output = self.run_ocr(frame)
                     if ocr_output:
                         result = [text for _, text, _ in ocr_output]
                     else:
@@ -655,6 +1013,7 @@ class DataRecorderApp:
                             self.root.after(0, self._update_ocr_display, current_text, count)
 
                             if count >= int(self.ocr_count_var.get()):  # 连续指定次数识别到相同文本
+                                self.record_ocr_result(attempts + 1, True)
                                 self.root.after(0, self._update_label_result, current_text)
                                 return
                         else:
@@ -664,16 +1023,17 @@ class DataRecorderApp:
                             self.root.after(0, self._update_ocr_display, current_text, count)
 
                     attempts += 1
-                    time.sleep(DEFAULT_OCR_SLEEP_INTERVAL)
+                    time.sleep(get_config('ocr_sleep_interval'))
 
                 # 超时未识别到稳定结果
+                self.record_ocr_result(attempts, False)
                 self.root.after(0, self._update_label_timeout)
 
             except Exception as e:
                 self.root.after(0, self._update_label_error, str(e))
 
         # 在新线程中执行OCR识别
-        threading.Thread(target=ocr_recognition_thread, daemon=True).start()
+        threading.Thread(target=ocr_recognition_thread, name="ocr-recognize", daemon=True).start()
 
     def _update_ocr_display(self, text, count):
         """更新OCR识别结果显示"""
@@ -716,37 +1076,35 @@ class DataRecorderApp:
         def camera_thread():
             """摄像头线程"""
             while self.camera_running:
+                cpu_start = time.thread_time()
                 ret, frame = self.camera.read()
                 if ret:
                     self.current_frame = frame.copy()
 
-                    # 调整图像大小以适应显示
-                    display_frame = cv2.resize(frame, (400, 300))
+                    # 调整图像大小以适应显示，繁忙时使用更快的插值
+                    interpolation = cv2.INTER_NEAREST if self.preview_load.use_fast_interpolation() else cv2.INTER_LINEAR
+                    display_frame = cv2.resize(frame, PREVIEW_SIZE, interpolation=interpolation)
                     display_frame = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
 
-                    # 转换为PIL图像
-                    pil_image = Image.fromarray(display_frame)
-                    photo = ImageTk.PhotoImage(pil_image)
+                    # 只发布最新帧，PhotoImage由主线程更新
+                    self.preview_renderer.publish(display_frame)
+                    self.preview_load.record("preview", time.thread_time() - cpu_start)
 
-                    # 在主线程中更新显示
-                    self.root.after(0, self._update_camera_display, photo)
+                # 空闲时约30fps，OCR或自动获取运行时按CPU占用降低
+                frame_delay = self.preview_load.frame_delay()
+                self.preview_renderer.interval_ms = int(frame_delay * 1000)
+                time.sleep(frame_delay)
 
-                time.sleep(DEFAULT_CAMERA_FPS_DELAY)  # 约30fps
-
-        self.camera_thread = threading.Thread(target=camera_thread, daemon=True)
+        self.camera_thread = threading.Thread(target=camera_thread, name="camera-preview", daemon=True)
         self.camera_thread.start()
+        self.preview_renderer.start()
 
     def stop_camera(self):
         """停止摄像头预览"""
         self.camera_running = False
         self.camera_start_btn.config(state="normal")
         self.camera_stop_btn.config(state="disabled")
-        self.camera_label.config(image="", text="摄像头已停止")
-
-    def _update_camera_display(self, photo):
-        """更新摄像头显示"""
-        self.camera_label.config(image=photo, text="")
-        self.camera_label.image = photo  # 保持引用
+        self.preview_renderer.stop("摄像头已停止")
 
     def capture_from_camera(self):
         """从摄像头捕获图片"""
@@ -767,12 +1125,15 @@ class DataRecorderApp:
             frame_rgb = cv2.cvtColor(self.current_frame, cv2.COLOR_BGR2RGB)
             pil_image = Image.fromarray(frame_rgb)
 
-            # 保存到临时文件
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-                temp_path = tmp_file.name
-                pil_image.save(temp_path, 'PNG')
+            # 保存到图片存储
+            buffer = io.BytesIO()
+            pil_image.save(buffer, 'PNG')
+            temp_path = self.save_captured_image(buffer.getvalue(), ".png")
+            self.preview_cache.prepare(temp_path, pil_image)
 
+            # 替换之前捕获但未使用的图片
+            if self.current_image_path and self.current_image_path != temp_path:
+                self.discard_captured_image(self.current_image_path)
             self.current_image_path = temp_path
             self.image_path_label.config(text="摄像头捕获")
 
@@ -872,7 +1233,7 @@ class DataRecorderApp:
         self.status_label.config(text=status_text, foreground="green")
 
         # 启动自动获取线程
-        self.auto_thread = threading.Thread(target=self.auto_get_worker, daemon=True)
+        self.auto_thread = threading.Thread(target=self.auto_get_worker, name="auto-get-worker", daemon=True)
         self.auto_thread.start()
 
     def stop_auto_get(self):
@@ -881,8 +1242,25 @@ class DataRecorderApp:
         self.auto_btn.config(text="开始自动获取")
         self.status_label.config(text="状态：已停止", foreground="gray")
 
+    def run_ocr(self, frame):
+        """执行一次OCR识别并上报CPU时间
+
+        Returns:
+            OCR识别结果列表，未识别到文字时为None
+        """
+        cpu_start = time.thread_time()
+        with metrics.span("ocr.recognize"):
+            ocr_output, _ = self.ocr_reader(frame)
+        self.preview_load.record("ocr", time.thread_time() - cpu_start)
+        return ocr_output
+
     def auto_get_worker(self):
-        """自动获取工作线程"""
+        """自动获取工作线程（运行期间预览降低帧率）"""
+        with self.preview_load.busy():
+            self._auto_get_loop()
+
+    def _auto_get_loop(self):
+        """自动获取循环"""
         while self.auto_running:
             try:
                 # 获取TID和标签号
@@ -890,36 +1268,38 @@ class DataRecorderApp:
                 label = None
                 captured_image_path = None
 
-                # 尝试获取TID
-                if RFID_AVAILABLE and self.rfid_connected:
-                    tid = self.get_tid_sync()
+                with metrics.span("auto.cycle"):
+                    # 尝试获取TID
+                    if RFID_AVAILABLE and self.rfid_connected:
+                        tid = self.get_tid_sync()
 
-                # 尝试获取标签号
-                if OCR_AVAILABLE and self.camera and self.camera.isOpened():
-                    label = self.get_label_sync()
+                    # 尝试获取标签号
+                    if self.ocr_reader and self.camera and self.camera.isOpened():
+                        label = self.get_label_sync()
 
-                # 如果获取到数据，自动捕获摄像头图片
-                if (tid and label) and self.camera and self.camera.isOpened():
-                    captured_image_path = self.auto_capture_image()
+                    # 如果获取到数据，自动捕获摄像头图片
+                    if (tid and label) and self.camera and self.camera.isOpened():
+                        captured_image_path = self.auto_capture_image()
 
-                # 如果获取到数据，添加到列表
-                if tid and label:
-                    self.root.after(0, self.add_data_to_list, tid, label, captured_image_path)
+                    # 如果获取到数据，添加到列表
+                    if tid and label:
+                        self.root.after(0, self.add_data_to_list, tid, label, captured_image_path, True)
 
                 # 等待一段时间再继续
-                time.sleep(DEFAULT_AUTO_GET_INTERVAL)
+                time.sleep(get_config('auto_get_interval'))
 
             except Exception as e:
                 print(f"自动获取错误: {e}")
-                time.sleep(DEFAULT_ERROR_RETRY_DELAY)
+                time.sleep(get_config('error_retry_delay'))
 
     def get_tid_sync(self):
         """同步获取TID"""
         try:
-            return rfid_util.read_tid_with_count_verification(
-                required_count=int(self.tid_count_var.get()),
-                max_duration=DEFAULT_TID_MAX_DURATION
-            )
+            with metrics.span("rfid.get_tid"):
+                return rfid_util.read_tid_with_count_verification(
+                    required_count=int(self.tid_count_var.get()),
+                    max_duration=get_config('tid_max_duration')
+                )
         except EpcFrameDetectedException as e:
             print(f"⚠️ 检测到EPC帧，需要重置RFID设备: {e}")
             # 在主线程中显示弹窗
@@ -962,10 +1342,14 @@ class DataRecorderApp:
 
     def get_label_sync(self):
         """同步获取标签号"""
+        with metrics.span("ocr.get_label"):
+            return self._get_label_sync()
+
+    def _get_label_sync(self):
         try:
             last_recognized = None
             count = 0
-            max_attempts = DEFAULT_OCR_MAX_ATTEMPTS_AUTO
+            max_attempts = get_config('ocr_max_attempts_auto')
             attempts = 0
 
             while attempts < max_attempts and self.auto_running:
@@ -973,7 +1357,7 @@ class DataRecorderApp:
                 if not ret:
                     continue
 
-                ocr_output, _ = self.ocr_reader(frame)
+                ocr_output = self.run_ocr(frame)
                 if ocr_output:
                     result = [text for _, text, _ in ocr_output]
                 else:
@@ -991,6 +1375,7 @@ class DataRecorderApp:
                         self.root.after(0, self._update_ocr_display, current_text, count)
                         
                         if count >= int(self.ocr_count_var.get()):  # 连续指定次数识别到相同文本
+                            self.record_ocr_result(attempts + 1, True)
                             return current_text
                     else:
                         last_recognized = current_text
@@ -1001,14 +1386,34 @@ class DataRecorderApp:
                         self.root.after(0, self._update_ocr_display, current_text, count)
 
                 attempts += 1
-                time.sleep(DEFAULT_OCR_SLEEP_INTERVAL)
+                time.sleep(get_config('ocr_sleep_interval'))
 
+            if self.auto_running:
+                self.record_ocr_result(attempts, False)
             return None
         except:
             return None
 
+    @staticmethod
+    def record_ocr_result(attempts, success):
+        """统计一次标签号识别
+
+        Args:
+            attempts: OCR尝试次数
+            success: 是否识别出标签号（只有识别成功时记录尝试次数）
+        """
+        if success:
+            metrics.record("ocr.attempts_per_label", attempts)
+            metrics.inc("ocr.labels")
+        else:
+            metrics.inc("ocr.label_failures")
+
     def auto_capture_image(self):
         """自动捕获摄像头图片"""
+        with metrics.span("camera.snapshot"):
+            return self._auto_capture_image()
+
+    def _auto_capture_image(self):
         try:
             if not self.camera or not self.camera.isOpened():
                 return None
@@ -1018,24 +1423,15 @@ class DataRecorderApp:
             if not ret:
                 return None
 
-            # 创建临时文件保存图片
-            import tempfile
-            temp_dir = tempfile.gettempdir()
-            temp_dir = temp_dir + "\\auto_capture"
-
-            # 确保auto_capture目录存在
-            if not os.path.exists(temp_dir):
-                os.makedirs(temp_dir)
-                print(f"创建自动捕获目录: {temp_dir}")
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # 精确到毫秒
-            temp_image_path = os.path.join(temp_dir, f"auto_capture_{timestamp}.jpg")
-
-            # 保存图片
-            success = cv2.imwrite(temp_image_path, frame)
+            # 编码后保存到图片存储（内容相同的图片只保存一份）
+            success, encoded = cv2.imencode(".jpg", frame)
             if not success:
-                print(f"❌ 图片保存失败: {temp_image_path}")
+                print("❌ 图片编码失败")
                 return None
+            temp_image_path = self.save_captured_image(encoded.tobytes(), ".jpg")
+
+            # 在捕获线程中生成预览缩略图，添加到列表时直接显示
+            self.preview_cache.prepare(temp_image_path, Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
 
             print(f"自动捕获图片: {temp_image_path}")
             return temp_image_path
@@ -1044,41 +1440,53 @@ class DataRecorderApp:
             print(f"自动捕获图片失败: {e}")
             return None
 
-    def add_data_to_list(self, tid, label, image_path=None):
-        """添加数据到列表"""
-        # 创建唯一标识符用于去重
-        data_key = f"{tid or 'N/A'}_{label or 'N/A'}"
+    def add_data_to_list(self, tid, label, image_path=None, auto_captured=False):
+        """添加数据到列表
 
-        if data_key in self.data_set:
-            # 如果是自动捕获的临时图片，需要清理
-            if image_path and "auto_capture" in image_path and os.path.exists(image_path):
-                try:
-                    os.unlink(image_path)
-                except:
-                    pass
+        Args:
+            tid: TID
+            label: 标签号
+            image_path: 图片路径，为空时使用当前选择的图片
+            auto_captured: 图片是否为自动获取时捕获
+        """
+        with metrics.span("list.add"):
+            self._add_data_to_list(tid, label, image_path, auto_captured)
+
+    def _add_data_to_list(self, tid, label, image_path, auto_captured):
+        # 按配置的去重规则检查
+        if self.record_store.find_duplicate(tid, label) is not None:
+            # 捕获的图片没有被使用，需要清理
+            self.discard_captured_image(image_path)
             return  # 数据已存在，跳过
 
-        # 添加到去重集合
-        self.data_set.add(data_key)
+        # 检查是否在历史导出中出现过
+        if self.history_index and self.history_index.contains(tid, label, self.record_store.dedup.policy):
+            print(f"⏭️ 历史导出中已存在，跳过: TID={tid}, 标签号={label}")
+            self.show_status_message(f"该数据已在历史导出中：TID={tid or 'N/A'}，标签号={label or 'N/A'}", "warning")
+            self.discard_captured_image(image_path)
+            return
 
         # 确定使用的图片路径：优先使用自动捕获的图片，其次使用手动选择的图片
         final_image_path = image_path if image_path else self.current_image_path
 
-        # 创建数据记录
-        data_record = {
-            'manufacturer': self.manufacturer_var.get().strip(),
-            'tid': tid or 'N/A',
-            'label': label or 'N/A',
-            'image_path': final_image_path,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'auto_captured': bool(image_path and "auto_capture" in image_path)  # 只有自动捕获的图片才标记为自动捕获
-        }
+        # 创建数据记录（记录时间为当前时间）
+        data_record = Record(
+            manufacturer=self.manufacturer_var.get().strip(),
+            tid=tid or 'N/A',
+            label=label or 'N/A',
+            image_path=final_image_path,
+            auto_captured=bool(image_path and auto_captured)  # 只有自动捕获的图片才标记为自动捕获
+        )
 
         # 添加到数据列表
-        self.data_list.append(data_record)
+        self.record_store.add(data_record)
+        metrics.inc("records.added")
+        if self.image_store:
+            self.image_store.acquire(final_image_path)
 
-        # 更新界面显示
-        self.update_data_tree()
+        # 只插入新的一行
+        with metrics.span("list.view_update"):
+            self.data_view.append(data_record)
 
         # 更新图片预览（显示最新保存的图片）
         if final_image_path and os.path.exists(final_image_path):
@@ -1096,91 +1504,69 @@ class DataRecorderApp:
             self.label_var.set(label)
 
         # 更新状态
-        status_text = f"状态：已获取 {len(self.data_list)} 条数据"
+        status_text = f"状态：已获取 {len(self.record_store)} 条数据"
         if image_path:
             status_text += " (含自动捕获图片)"
         self.status_label.config(text=status_text, foreground="blue")
 
-    def update_data_tree(self):
-        """更新数据树显示"""
-        # 清空现有数据
-        for item in self.data_tree.get_children():
-            self.data_tree.delete(item)
-
-        # 添加新数据
-        for i, data in enumerate(self.data_list, 1):
-            # 确定图片来源
-            if data.get('auto_captured', False):
-                image_source = "自动捕获"
-            elif data.get('image_path'):
-                image_source = "手动选择"
-            else:
-                image_source = "无图片"
-
-            self.data_tree.insert("", "end", values=(
-                i,
-                data['manufacturer'],
-                data['tid'],
-                data['label'],
-                image_source,
-                data['timestamp']
-            ))
+    def _tree_values(self, data):
+        """生成数据树一行的显示内容"""
+        # 确定图片来源
+        if data.auto_captured:
+            image_source = "自动捕获"
+        elif data.image_path:
+            image_source = "手动选择"
+        else:
+            image_source = "无图片"
+
+        return (
+            data.seq,
+            data.manufacturer,
+            data.tid,
+            data.label,
+            image_source,
+            data.timestamp
+        )
 
     def clear_data_list(self):
         """清空数据列表"""
         if messagebox.askyesno("确认", "确定要清空所有数据吗？"):
-            self.data_list.clear()
-            self.data_set.clear()
-            self.update_data_tree()
+            removed = list(self.record_store)
+            self.record_store.clear()
+            self.data_view.clear()
+            self.release_record_images(removed)
             self.status_label.config(text="状态：列表已清空", foreground="gray")
 
     def delete_selected(self):
         """删除选中的数据"""
-        selected_items = self.data_tree.selection()
-        if not selected_items:
+        selected_keys = self.data_view.selected_keys()
+        if not selected_keys:
             messagebox.showwarning("警告", "请先选择要删除的数据！")
             return
 
-        if messagebox.askyesno("确认", f"确定要删除选中的 {len(selected_items)} 条数据吗？"):
-            # 获取选中项的索引
-            indices_to_remove = []
-            for item in selected_items:
-                index = self.data_tree.index(item)
-                indices_to_remove.append(index)
-
-            # 按倒序删除，避免索引变化
-            for index in sorted(indices_to_remove, reverse=True):
-                if 0 <= index < len(self.data_list):
-                    # 从去重集合中移除
-                    data = self.data_list[index]
-                    data_key = f"{data['tid']}_{data['label']}"
-                    self.data_set.discard(data_key)
-
-                    # 从列表中删除
-                    del self.data_list[index]
-
-            self.update_data_tree()
-            self.status_label.config(text=f"状态：剩余 {len(self.data_list)} 条数据", foreground="blue")
-
-    def on_data_tree_double_click(self, event):
-        """处理数据列表双击事件"""
-        # 获取双击的项目
-        item = self.data_tree.selection()[0] if self.data_tree.selection() else None
-        if not item:
-            return
+        if messagebox.askyesno("确认", f"确定要删除选中的 {len(selected_keys)} 条数据吗？"):
+            # 按ID删除，去重索引由存储同步维护
+            removed = self.record_store.remove_many(selected_keys)
+
+            # 只删除选中的行
+            self.data_view.remove(removed)
+            self.release_record_images(removed)
+            self.status_label.config(text=f"状态：剩余 {len(self.record_store)} 条数据", foreground="blue")
+
+    def on_data_tree_double_click(self, record_id):
+        """处理数据列表双击事件
 
-        # 获取项目的索引
-        index = self.data_tree.index(item)
-        if 0 <= index < len(self.data_list):
-            self.edit_data_item(index)
+        Args:
+            record_id: 被双击记录的ID
+        """
+        self.edit_data_item(record_id)
 
-    def edit_data_item(self, index):
+    def edit_data_item(self, record_id):
         """编辑数据项"""
-        if not (0 <= index < len(self.data_list)):
+        data = self.record_store.get(record_id)
+        if data is None:
             return
 
-        data = self.data_list[index]
-
         # 创建编辑对话框
         edit_dialog = tk.Toplevel(self.root)
         edit_dialog.title("编辑数据")
@@ -1200,7 +1586,7 @@ class DataRecorderApp:
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # 标题
-        title_label = ttk.Label(main_frame, text=f"编辑第 {index + 1} 条数据", font=("TkDefaultFont", 12, "bold"))
+        title_label = ttk.Label(main_frame, text=f"编辑第 {data.seq} 条数据", font=("TkDefaultFont", 12, "bold"))
         title_label.pack(pady=(0, 20))
 
         # 输入字段
@@ -1209,32 +1595,32 @@ class DataRecorderApp:
 
         # 厂家名称
         ttk.Label(fields_frame, text="厂家名称:").grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
-        manufacturer_var = tk.StringVar(value=data.get('manufacturer', ''))
+        manufacturer_var = tk.StringVar(value=data.manufacturer or '')
         manufacturer_entry = ttk.Entry(fields_frame, textvariable=manufacturer_var, width=40)
         manufacturer_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=(0, 10))
 
         # TID
         ttk.Label(fields_frame, text="TID:").grid(row=1, column=0, sticky=tk.W, pady=(0, 10))
-        tid_var = tk.StringVar(value=data.get('tid', ''))
+        tid_var = tk.StringVar(value=data.tid or '')
         tid_entry = ttk.Entry(fields_frame, textvariable=tid_var, width=40)
         tid_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=(0, 10))
 
         # 标签号
         ttk.Label(fields_frame, text="标签号:").grid(row=2, column=0, sticky=tk.W, pady=(0, 10))
-        label_var = tk.StringVar(value=data.get('label', ''))
+        label_var = tk.StringVar(value=data.label or '')
         label_entry = ttk.Entry(fields_frame, textvariable=label_var, width=40)
         label_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=(0, 10))
 
         # 图片路径显示
         ttk.Label(fields_frame, text="图片:").grid(row=3, column=0, sticky=tk.W, pady=(0, 10))
-        image_path = data.get('image_path', '')
+        image_path = data.image_path or ''
         image_display = os.path.basename(image_path) if image_path else "无图片"
         image_label = ttk.Label(fields_frame, text=image_display, foreground="gray")
         image_label.grid(row=3, column=1, sticky=tk.W, padx=(10, 0), pady=(0, 10))
 
         # 时间显示
         ttk.Label(fields_frame, text="记录时间:").grid(row=4, column=0, sticky=tk.W, pady=(0, 10))
-        time_label = ttk.Label(fields_frame, text=data.get('timestamp', ''), foreground="gray")
+        time_label = ttk.Label(fields_frame, text=data.timestamp, foreground="gray")
         time_label.grid(row=4, column=1, sticky=tk.W, padx=(10, 0), pady=(0, 10))
 
         # 配置列权重
@@ -1264,30 +1650,34 @@ class DataRecorderApp:
                 messagebox.showerror("错误", "标签号不能为空！")
                 return
 
-            # 检查是否有重复数据（排除当前编辑的项）
-            new_data_key = f"{new_tid}_{new_label}"
-            old_data_key = f"{data['tid']}_{data['label']}"
+            # 记录可能在对话框打开期间已被导出移除或删除
+            if record_id not in self.record_store:
+                messagebox.showerror("错误", "该数据已被删除！")
+                edit_dialog.destroy()
+                return
 
-            if new_data_key != old_data_key and new_data_key in self.data_set:
-                messagebox.showerror("错误", "该TID和标签号的组合已存在！")
+            # 检查是否有重复数据（排除当前编辑的项）
+            duplicate = self.record_store.find_duplicate(new_tid, new_label, exclude_id=record_id)
+            if duplicate is not None:
+                policy_name = DedupIndex.POLICY_NAMES[self.record_store.dedup.policy]
+                messagebox.showerror("错误", f"与第 {duplicate.seq} 条数据重复（去重规则：{policy_name}）！")
                 return
 
-            # 更新数据
-            if old_data_key != new_data_key:
-                # 如果数据键发生变化，需要更新去重集合
-                self.data_set.discard(old_data_key)
-                self.data_set.add(new_data_key)
+            # 修改了TID或标签号时检查历史导出
+            key_changed = (new_tid, new_label) != (data.tid, data.label)
+            if key_changed and self.history_index and \
+                    self.history_index.contains(new_tid, new_label, self.record_store.dedup.policy):
+                if not messagebox.askyesno("提示", "该数据已在历史导出中出现过，是否仍然保存修改？", parent=edit_dialog):
+                    return
 
-            # 更新数据记录
-            self.data_list[index]['manufacturer'] = new_manufacturer
-            self.data_list[index]['tid'] = new_tid
-            self.data_list[index]['label'] = new_label
+            # 更新数据记录，去重索引由存储同步维护
+            self.record_store.update(record_id, manufacturer=new_manufacturer, tid=new_tid, label=new_label)
 
-            # 更新界面
-            self.update_data_tree()
+            # 只刷新被编辑的一行
+            self.data_view.update(data)
 
             # 显示成功消息
-            self.show_status_message(f"第 {index + 1} 条数据已更新", "success")
+            self.show_status_message(f"第 {data.seq} 条数据已更新", "success")
 
             # 关闭对话框
             edit_dialog.destroy()
@@ -1301,8 +1691,12 @@ class DataRecorderApp:
         ttk.Button(button_frame, text="取消", command=cancel_edit).pack(side=tk.RIGHT)
 
     def export_to_excel(self):
-        """导出数据到Excel"""
-        if not self.data_list:
+        """导出数据到Excel（后台执行，导出期间可继续采集数据）"""
+        if self.export_job and self.export_job.is_running():
+            messagebox.showwarning("警告", "上一批数据正在导出，请等待完成或取消后再试！")
+            return
+
+        if not len(self.record_store):
             messagebox.showwarning("警告", "没有数据可导出！")
             return
 
@@ -1314,61 +1708,313 @@ class DataRecorderApp:
 
         if choice is None:  # 用户点击取消
             return
-        elif choice:  # 用户选择新建
+        elif choice:  # 用户选择新建，流式写入
             excel_file = self.create_excel_for_export()
+            export_mode = ExcelExportJob.MODE_NEW
         else:  # 用户选择现有文件
             excel_file = self.select_excel_for_export()
+            export_mode = ExcelExportJob.MODE_IN_PLACE
+            # 大文件追加时写入分卷，避免重新解析和保存已有内容
+            split_size_mb = get_config('excel_append_split_mb', DEFAULT_APPEND_SPLIT_SIZE_MB)
+            if excel_file and should_append_as_parts(excel_file, split_size_mb):
+                export_mode = ExcelExportJob.MODE_PARTS
 
         if not excel_file:
             return
 
-        try:
-            # 打开Excel文件
-            wb = openpyxl.load_workbook(excel_file)
-            ws = wb.active
+        self._start_export_job(excel_file, export_mode, list(self.record_store))
 
-            success_count = 0
+    def _start_export_job(self, excel_file, export_mode, records, export_journal_id=None):
+        """启动后台导出任务
 
-            for data in self.data_list:
-                # 找到下一个空行
-                next_row = ws.max_row + 1
+        Args:
+            excel_file: 目标Excel文件
+            export_mode: 写入方式
+            records: 要导出的数据记录
+            export_journal_id: 重新导出时沿用的数据日志导出ID
+        """
+        self.export_record_ids = [data.id for data in records]
+        if self.journal:
+            # 在数据日志中保存快照后按批读取，不在内存中复制整批数据，导出期间编辑或删除的数据不受影响
+            journal_ids = [data.journal_id for data in records]
+            if export_journal_id is None:
+                export_journal_id = self.journal.start_export(excel_file, export_mode, journal_ids)
+            else:
+                self.journal.restart_export(export_journal_id, journal_ids)
+            if not self.journal.flush():
+                self.journal.finish_export(export_journal_id, EXPORT_CANCELLED)
+                self.export_record_ids = []
+                messagebox.showerror("错误", "数据日志写入失败，暂时无法导出。\n\n请检查磁盘空间后重试。")
+                return
+            source = self.journal.record_source(export_journal_id, len(journal_ids))
+        else:
+            # 后台任务使用副本，导出期间新采集或编辑的数据不受影响
+            source = [dict(data) for data in records]
+        self.export_journal_id = export_journal_id
+
+        # 导出结束前保持对图片的引用，导出期间删除或清空数据不会删除导出还要使用的图片
+        self.export_image_paths = [data.image_path for data in records]
+        if self.image_store:
+            self.image_store.acquire_many(self.export_image_paths)
+        self.export_job = ExcelExportJob(excel_file, source, export_mode)
+        self.export_job.start()
+
+        self.export_cancel_btn.config(state="normal")
+        if export_mode == ExcelExportJob.MODE_PARTS:
+            self.show_status_message(f"开始后台导出 {len(self.export_record_ids)} 条数据到分卷目录：{get_parts_dir(excel_file)}", "info")
+        else:
+            self.show_status_message(f"开始后台导出 {len(self.export_record_ids)} 条数据...", "info")
+        self.root.after(100, self._poll_export_job)
+
+    def cancel_export(self):
+        """取消正在进行的导出任务"""
+        if self.export_job and self.export_job.is_running():
+            self.export_job.cancel()
+            self.export_cancel_btn.config(state="disabled")
+            self._update_export_progress(0, 0, "正在取消导出...")
+
+    def _poll_export_job(self):
+        """定时读取后台导出任务的进度，任务结束后处理结果"""
+        job = self.export_job
+        if job is None:
+            return
 
-                # 写入数据
-                ws.cell(row=next_row, column=1, value=next_row - 1)  # 序号
-                ws.cell(row=next_row, column=2, value=data['manufacturer'])  # 厂家名称
-                ws.cell(row=next_row, column=3, value=data['tid'])  # TID
-                ws.cell(row=next_row, column=4, value=data['label'])  # 标签号
-                ws.cell(row=next_row, column=6, value=data['timestamp'])  # 记录时间
+        done, total, stage = job.progress
+        self._update_export_progress(done, total, stage)
 
-                # 插入图片
-                if data['image_path'] and os.path.exists(data['image_path']):
-                    try:
-                        self.insert_image_to_excel_batch(ws, next_row, 5, data['image_path'])
-                    except Exception as e:
-                        print(f"插入图片失败: {e}")
+        if job.is_running():
+            self.root.after(100, self._poll_export_job)
+            return
 
-                success_count += 1
+        self.export_cancel_btn.config(state="disabled")
+        exported_ids = self.export_record_ids
+        self.export_record_ids = []
+        export_image_paths = self.export_image_paths
+        self.export_image_paths = []
+        if self.journal and self.export_journal_id is not None:
+            self.journal.finish_export(self.export_journal_id, job.status, job.output_file)
+        self.export_journal_id = None
+
+        if self.image_store:
+            # 已导出的图片不再引用后可以被淘汰（包括导出期间被删除的数据的图片）
+            if job.status == ExcelExportJob.STATUS_DONE:
+                self.image_store.mark_exported(export_image_paths)
+            # 释放导出期间保持的引用，导出失败或取消时已删除数据的图片在这里清理
+            self.image_store.release(export_image_paths)
+
+        if job.status == ExcelExportJob.STATUS_DONE:
+            # 登记到历史导出索引
+            if self.history_index:
+                try:
+                    self.history_index.add_records(job.exported_records, job.output_file)
+                except Exception as e:
+                    print(f"⚠️ 更新历史导出索引失败: {e}")
 
-            # 保存文件
-            wb.save(excel_file)
-            wb.close()
+            if job.mode == ExcelExportJob.MODE_PARTS:
+                self.show_status_message(f"成功导出 {job.success_count} 条数据到分卷：{os.path.basename(job.output_file)}", "success", 6000)
+            else:
+                self.show_status_message(f"成功导出 {job.success_count} 条数据到Excel！", "success")
 
-            self.show_status_message(f"成功导出 {success_count} 条数据到Excel！", "success")
+            # 询问是否从列表中移除已导出的数据（导出期间新增的数据保留）
+            if messagebox.askyesno("提示", f"导出成功！是否从列表中移除已导出的 {len(exported_ids)} 条数据？"):
+                self.remove_exported_records(exported_ids)
 
-            # 询问是否清空列表
-            if messagebox.askyesno("提示", "导出成功！是否清空当前数据列表？"):
-                self.clear_data_list()
+        elif job.status == ExcelExportJob.STATUS_CANCELLED:
+            self.show_status_message("导出已取消，Excel文件未被修改", "warning")
 
-        except PermissionError as e:
-            # 权限错误，通常是文件被其他程序打开
-            messagebox.showerror("错误", f"无法保存Excel文件，文件可能已在Excel或其他程序中打开。\n\n请关闭相关程序后重试。\n\n文件路径：{excel_file}")
-        except Exception as e:
-            # 检查是否是权限相关的错误
-            error_msg = str(e).lower()
-            if "permission denied" in error_msg or "errno 13" in error_msg:
+        else:
+            excel_file = job.excel_file
+            error_msg = str(job.error).lower()
+            if isinstance(job.error, PermissionError) or "permission denied" in error_msg or "errno 13" in error_msg:
+                # 权限错误，通常是文件被其他程序打开
                 messagebox.showerror("错误", f"无法保存Excel文件，文件可能已在Excel或其他程序中打开。\n\n请关闭相关程序后重试。\n\n文件路径：{excel_file}")
             else:
-                messagebox.showerror("错误", f"导出失败：{str(e)}")
+                messagebox.showerror("错误", f"导出失败：{str(job.error)}")
+
+    def resume_pending_export(self):
+        """上次导出中途退出时，询问是否重新导出（目标文件只在导出完成时替换，重新导出不会重复写入）"""
+        pending = self.journal.pending_export()
+        if not pending:
+            return
+
+        by_journal_id = {data.journal_id: data for data in self.record_store}
+        records = [by_journal_id[jid] for jid in pending['journal_ids'] if jid in by_journal_id]
+        excel_file = pending['excel_file']
+        if not records or not messagebox.askyesno(
+                "提示",
+                f"上次导出未完成（{pending['started_at']}，{len(records)} 条数据）：\n{excel_file}\n\n是否重新导出？"):
+            self.journal.finish_export(pending['export_id'], EXPORT_CANCELLED)
+            return
+
+        export_mode = pending['mode']
+        if not os.path.exists(excel_file):
+            if export_mode != ExcelExportJob.MODE_NEW:
+                messagebox.showerror("错误", f"Excel文件不存在，无法重新导出：\n{excel_file}")
+                self.journal.finish_export(pending['export_id'], EXPORT_CANCELLED)
+                return
+            write_empty_export_file(excel_file)
+
+        self._start_export_job(excel_file, export_mode, records, export_journal_id=pending['export_id'])
+
+    def show_metrics_panel(self):
+        """显示性能统计窗口"""
+        if self.metrics_panel is None:
+            self.metrics_panel = MetricsPanel(self.root, metrics, get_config('metrics_refresh_ms', DEFAULT_PANEL_REFRESH_MS))
+        self.metrics_panel.show()
+
+    def toggle_sampling_profile(self):
+        """开始采样分析，正在采样时提前结束"""
+        if self.sampling_profiler.running:
+            self.sampling_profiler.stop()
+        else:
+            self.start_sampling_profile()
+
+    def start_sampling_profile(self):
+        """开始采样分析，结果写入配置目录下的profiles目录（可在任意线程调用）"""
+        self.sampling_profiler.interval = get_config('sampling_profile_interval')
+        output_file = os.path.join(get_config_dir(), DEFAULT_SAMPLING_PROFILE_DIR,
+                                   f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded")
+        started = self.sampling_profiler.start(
+            get_config('sampling_profile_duration'), output_file,
+            lambda path, samples: self._post_to_ui(self._on_sampling_profile_finished, path, samples)
+        )
+        if started:
+            self._post_to_ui(self._update_sampling_menu, True)
+
+    def _on_sampling_profile_finished(self, output_file, samples):
+        """采样分析结束后更新界面（Tk线程）"""
+        self._update_sampling_menu(False)
+        if output_file:
+            self.show_status_message(f"采样分析完成（采样{samples}次），结果已保存: {output_file}", "success", 8000)
+        else:
+            self.show_status_message("采样分析结果保存失败", "error")
+
+    def _update_sampling_menu(self, running):
+        self.tools_menu.entryconfig(self.sampling_menu_index, label="停止采样分析" if running else "采样分析")
+
+    def show_history_dialog(self):
+        """查询历史会话中的数据记录"""
+        if not self.journal:
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("历史记录")
+        dialog.geometry("900x500")
+        dialog.transient(self.root)
+
+        query_frame = ttk.Frame(dialog, padding="10")
+        query_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+
+        sessions = self.journal.list_sessions()
+        session_options = ["全部会话"] + [
+            f"#{session['session_id']} {session['started_at']}（{session['record_count']} 条，已导出 {session['exported_count']} 条）"
+            for session in sessions
+        ]
+        ttk.Label(query_frame, text="会话:").grid(row=0, column=0, sticky=tk.W)
+        session_var = tk.StringVar(value=session_options[0])
+        session_combo = ttk.Combobox(query_frame, textvariable=session_var, values=session_options,
+                                     state="readonly", width=45)
+        session_combo.grid(row=0, column=1, padx=(5, 10))
+
+        ttk.Label(query_frame, text="关键字:").grid(row=0, column=2, sticky=tk.W)
+        keyword_var = tk.StringVar()
+        keyword_entry = ttk.Entry(query_frame, textvariable=keyword_var, width=20)
+        keyword_entry.grid(row=0, column=3, padx=(5, 10))
+
+        columns = ("会话", "厂家名称", "TID", "标签号", "记录时间", "导出状态")
+        tree = ttk.Treeview(dialog, columns=columns, show="headings")
+        for column, width in zip(columns, (50, 100, 220, 80, 140, 220)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width)
+        scrollbar = ttk.Scrollbar(dialog, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0))
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S), padx=(0, 10))
+
+        result_label = ttk.Label(dialog, text="", foreground="gray")
+        result_label.grid(row=2, column=0, sticky=tk.W, padx=10, pady=(5, 10))
+
+        def run_query(*args):
+            index = session_combo.current()
+            session_id = sessions[index - 1]['session_id'] if index > 0 else None
+            records = self.journal.query_records(session_id, keyword_var.get().strip())
+            tree.delete(*tree.get_children())
+            for data in records:
+                if data['exported_at']:
+                    export_state = f"{data['exported_at']} {os.path.basename(data['export_file'] or '')}"
+                elif data['in_list']:
+                    export_state = "未导出（在列表中）"
+                else:
+                    export_state = "未导出"
+                tree.insert("", tk.END, values=(
+                    data['session_id'], data['manufacturer'], data['tid'], data['label'],
+                    data['timestamp'], export_state
+                ))
+            result_label.config(text=f"显示最近 {len(records)} 条记录")
+
+        ttk.Button(query_frame, text="查询", command=run_query).grid(row=0, column=4)
+        session_combo.bind("<<ComboboxSelected>>", run_query)
+        keyword_entry.bind("<Return>", run_query)
+
+        dialog.columnconfigure(0, weight=1)
+        dialog.rowconfigure(1, weight=1)
+        run_query()
+
+    def remove_exported_records(self, record_ids):
+        """从数据列表中移除已导出的记录
+
+        Args:
+            record_ids: 已导出的数据记录ID
+        """
+        removed = self.record_store.remove_many(record_ids)
+
+        # 只删除已导出记录对应的行（导出期间已被删除或清空的记录不再处理）
+        self.data_view.remove(removed)
+        self.release_record_images(removed)
+        self.status_label.config(text=f"状态：剩余 {len(self.record_store)} 条数据", foreground="blue")
+
+    def import_history_workbooks(self):
+        """选择已有的Excel工作簿导入历史导出索引（后台执行）"""
+        if not self.history_index:
+            return
+        if self.history_import_thread and self.history_import_thread.is_alive():
+            messagebox.showwarning("警告", "正在导入历史数据，请稍候！")
+            return
+
+        files = filedialog.askopenfilenames(
+            title="选择已导出的Excel文件（分卷会一并导入）",
+            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+        )
+        if not files:
+            return
+
+        def import_thread():
+            total = 0
+            try:
+                for excel_file in files:
+                    if self.history_import_cancel.is_set():
+                        break
+                    total += self.history_index.import_workbook(
+                        excel_file,
+                        progress_callback=lambda path, rows: self._post_to_ui(
+                            self._update_export_progress, 0, 0, f"正在导入历史：{os.path.basename(path)} {rows} 行"),
+                        cancel_event=self.history_import_cancel
+                    )
+                count = self.history_index.count()
+                self._post_to_ui(self._on_history_import_done,
+                                 f"历史导入完成：读取 {total} 行，索引共 {count} 条", "success")
+            except Exception as e:
+                self._post_to_ui(self._on_history_import_done, f"历史导入失败：{e}", "error")
+
+        self.history_import_btn.config(state="disabled")
+        self.history_import_thread = threading.Thread(target=import_thread, name="history-import", daemon=True)
+        self.history_import_thread.start()
+
+    def _on_history_import_done(self, message, message_type):
+        """历史导入结束后恢复界面"""
+        self.history_import_btn.config(state="normal")
+        self._update_export_progress(0, 0, "")
+        self.show_status_message(message, message_type, 6000)
 
     def create_excel_for_export(self):
         """为导出创建新的Excel文件"""
@@ -1380,26 +2026,8 @@ class DataRecorderApp:
 
         if file_path:
             try:
-                # 创建新的工作簿
-                wb = openpyxl.Workbook()
-                ws = wb.active
-                ws.title = "数据记录"
-
-                # 设置表头
-                headers = ["序号", "厂家名称", "TID", "标签号", "图片", "记录时间"]
-                for col, header in enumerate(headers, 1):
-                    ws.cell(row=1, column=col, value=header)
-
-                # 设置列宽
-                ws.column_dimensions['A'].width = 8
-                ws.column_dimensions['B'].width = 20
-                ws.column_dimensions['C'].width = 25
-                ws.column_dimensions['D'].width = 20
-                ws.column_dimensions['E'].width = 30
-                ws.column_dimensions['F'].width = 20
-
-                wb.save(file_path)
-                wb.close()
+                # 创建只有表头的新文件，数据由后台任务流式写入
+                write_empty_export_file(file_path)
 
                 self.show_status_message("Excel文件创建成功！", "success")
                 return file_path
@@ -1428,9 +2056,8 @@ class DataRecorderApp:
 
         if file_path:
             try:
-                # 验证文件是否可以打开
-                wb = openpyxl.load_workbook(file_path)
-                wb.close()
+                # 快速验证文件格式和写入权限，不加载工作簿内容
+                validate_workbook_file(file_path)
 
                 return file_path
 
@@ -1449,37 +2076,20 @@ class DataRecorderApp:
 
         return None
 
-    def insert_image_to_excel_batch(self, worksheet, row, col, image_path):
-        """批量插入图片到Excel"""
-        try:
-            # 打开并处理图片
-            img = Image.open(image_path)
-
-            # 调整图片大小
-            max_width, max_height = 200, 150
-            img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-
-            # 将图片保存到内存中
-            img_buffer = io.BytesIO()
-            img_format = img.format if img.format else 'PNG'
-            img.save(img_buffer, format=img_format)
-            img_buffer.seek(0)
-
-            # 创建Excel图片对象
-            excel_img = ExcelImage(img_buffer)
-
-            # 设置图片位置
-            cell_address = worksheet.cell(row=row, column=col).coordinate
-            excel_img.anchor = cell_address
+    def _update_export_progress(self, done, total, stage):
+        """更新导出进度显示
 
-            # 插入图片
-            worksheet.add_image(excel_img)
-
-            # 调整行高
-            worksheet.row_dimensions[row].height = max_height * 0.75
-
-        except Exception as e:
-            raise Exception(f"插入图片失败：{str(e)}")
+        Args:
+            done: 已完成数量
+            total: 总数量
+            stage: 当前阶段描述
+        """
+        percent = (done * 100 / total) if total else 0
+        self.export_progress['value'] = percent
+        if total:
+            self.export_progress_label.config(text=f"{stage} {done}/{total}")
+        else:
+            self.export_progress_label.config(text=stage)
 
     def cleanup_resources(self):
         """清理资源"""
@@ -1491,32 +2101,76 @@ class DataRecorderApp:
                 self.stop_auto_get()
                 time.sleep(DEFAULT_THREAD_STOP_WAIT)  # 等待线程结束
 
+            # 取消未完成的导出（目标文件只在导出完成时替换，取消不会损坏文件）
+            if self.export_job and self.export_job.is_running():
+                self.export_job.cancel()
+                self.export_job.join(DEFAULT_EXPORT_CANCEL_WAIT)
+
+            # 停止设备插拔检测
+            self.device_discovery.stop_watch()
+
+            # 停止历史导入后关闭历史导出索引（导入在下一批提交后停止，未导入完的文件下次会重新导入）
+            if self.history_import_thread and self.history_import_thread.is_alive():
+                self.history_import_cancel.set()
+                self.history_import_thread.join(DEFAULT_HISTORY_IMPORT_STOP_WAIT)
+            if self.history_index:
+                self.history_index.close()
+
             # 停止摄像头
             if self.camera_running:
                 self.camera_running = False
                 time.sleep(DEFAULT_CAMERA_STOP_WAIT)  # 等待线程结束
 
-            # 释放摄像头
-            if self.camera:
-                self.camera.release()
-                print("✅ 摄像头资源已释放")
-
-            # 关闭RFID连接
-            if RFID_AVAILABLE and self.rfid_connected:
-                rfid_util.close()
-                print("✅ RFID连接已关闭")
+            # 等待后台的设备初始化/检测结束，再释放摄像头和关闭RFID连接
+            device_locked = self.device_lock.acquire(timeout=DEFAULT_DEVICE_INIT_WAIT)
+            try:
+                # 释放摄像头
+                if self.camera:
+                    self.camera.release()
+                    print("✅ 摄像头资源已释放")
 
-            # 清理临时文件
-            if self.current_image_path and os.path.exists(self.current_image_path) and "temp" in self.current_image_path:
+                # 关闭RFID连接
+                if RFID_AVAILABLE and self.rfid_connected:
+                    rfid_util.close()
+                    print("✅ RFID连接已关闭")
+            finally:
+                if device_locked:
+                    self.device_lock.release()
+
+            # 清理临时文件（日志中的记录仍在使用的图片保留，图片存储中的图片由存储清理）
+            if self.current_image_path and os.path.exists(self.current_image_path) and "temp" in self.current_image_path \
+                    and self.current_image_path not in self._journaled_image_paths() \
+                    and not (self.image_store and self.image_store.is_managed(self.current_image_path)):
                 try:
                     os.unlink(self.current_image_path)
                     print("✅ 临时文件已清理")
                 except:
                     pass
 
-            # 清理自动捕获的临时图片
+            # 清理图片存储：没有数据日志时列表中的数据不会恢复，其图片也不再保留
+            if self.image_store:
+                if not self.journal:
+                    self.release_record_images(self.record_store)
+                self.image_store.sweep()
+                self.image_store.close()
+                print("✅ 图片存储已清理")
+
+            # 清理旧版本临时目录中的自动捕获图片
             self.cleanup_auto_captured_images()
 
+            # 写完并关闭数据日志
+            if self.journal:
+                self.journal.close(DEFAULT_JOURNAL_CLOSE_WAIT)
+                print("✅ 数据日志已保存")
+
+            # 写入尚未保存的配置修改
+            stop_config_watch()
+            flush_config()
+
+            # 停止性能统计接口和采样分析
+            self.metrics_server.stop()
+            self.sampling_profiler.stop()
+
             # 清理状态消息定时器
             if self.status_message_timer:
                 self.root.after_cancel(self.status_message_timer)
@@ -1525,31 +2179,43 @@ class DataRecorderApp:
         except Exception as e:
             print(f"⚠️ 资源清理时发生错误: {e}")
 
+    def _journaled_image_paths(self):
+        """日志中尚未导出的记录使用的图片，下次启动恢复时还需要"""
+        if not self.journal:
+            return set()
+        return {data.image_path for data in self.record_store if data.image_path}
+
     def cleanup_auto_captured_images(self):
-        """清理自动捕获的临时图片"""
+        """清理临时目录中的自动捕获图片（图片存储不可用时保存的或旧版本遗留的，启用数据日志时保留未导出记录的图片）"""
         try:
             import tempfile
             temp_dir = tempfile.gettempdir()
+            keep_paths = self._journaled_image_paths()
 
             # 清理数据列表中的自动捕获图片
-            for data in self.data_list:
-                if (data.get('auto_captured', False) and
-                    data.get('image_path') and
-                    "auto_capture" in data['image_path'] and
-                    os.path.exists(data['image_path'])):
+            for data in self.record_store:
+                image_path = data.image_path
+                if image_path in keep_paths:
+                    continue
+                if (data.auto_captured and
+                    image_path and
+                    "auto_capture" in image_path and
+                    os.path.exists(image_path)):
                     try:
-                        os.unlink(data['image_path'])
-                        print(f"✅ 清理自动捕获图片: {os.path.basename(data['image_path'])}")
+                        os.unlink(image_path)
+                        print(f"✅ 清理自动捕获图片: {os.path.basename(image_path)}")
                     except:
                         pass
 
             # 清理临时目录中的所有自动捕获图片
-            auto_capture_dir = temp_dir + "\\auto_capture"
+            auto_capture_dir = os.path.join(temp_dir, "auto_capture")
             try:
                 if os.path.exists(auto_capture_dir):
                     for filename in os.listdir(auto_capture_dir):
                         if filename.startswith("auto_capture_") and filename.endswith(".jpg"):
                             file_path = os.path.join(auto_capture_dir, filename)
+                            if file_path in keep_paths:
+                                continue
                             try:
                                 os.unlink(file_path)
                                 print(f"✅ 清理遗留图片: {filename}")
@@ -1581,9 +2247,9 @@ class DataRecorderApp:
             self.camera_var.set(f"摄像头 {camera_index}")
 
             # 加载OCR和TID次数配置
-            ocr_count = get_config('ocr_required_count', DEFAULT_OCR_REQUIRED_COUNT)
+            ocr_count = get_config('ocr_required_count')
             self.ocr_count_var.set(str(ocr_count))
-            tid_count = get_config('tid_required_count', DEFAULT_TID_REQUIRED_COUNT)
+            tid_count = get_config('tid_required_count')
             self.tid_count_var.set(str(tid_count))
 
             self.config_status_label.config(text="配置状态：已加载", foreground="green")
@@ -1594,52 +2260,85 @@ class DataRecorderApp:
             print(f"⚠️ 配置加载失败: {e}")
 
     def refresh_ports(self):
-        """刷新串口列表"""
-        try:
-            ports = serial.tools.list_ports.comports()
-            port_list = [port.device for port in ports]
+        """在后台刷新串口列表"""
+        def probe():
+            try:
+                port_list = self.device_discovery.list_ports()
+            except Exception as e:
+                print(f"⚠️ 串口检测失败: {e}")
+                port_list = None
+            self._post_to_ui(self._apply_port_list, port_list)
+
+        threading.Thread(target=probe, name="port-probe", daemon=True).start()
 
-            if not port_list:
-                port_list = ["无可用端口"]
+    def _apply_port_list(self, port_list):
+        """显示检测到的串口列表（Tk线程）
 
-            self.rfid_port_combo['values'] = port_list
+        Args:
+            port_list: 串口列表，检测失败时为None
+        """
+        if port_list is None:
+            self.rfid_port_combo['values'] = ["端口检测失败"]
+            return
+        if not port_list:
+            port_list = ["无可用端口"]
 
-            # 如果当前选择的端口不在列表中，选择第一个
-            current_port = self.rfid_port_var.get()
-            if current_port not in port_list and port_list[0] != "无可用端口":
-                self.rfid_port_var.set(port_list[0])
+        self.rfid_port_combo['values'] = port_list
 
-            print(f"✓ 发现 {len(port_list)} 个串口: {port_list}")
+        # 如果当前选择的端口不在列表中，选择第一个
+        current_port = self.rfid_port_var.get()
+        if current_port not in port_list and port_list[0] != "无可用端口":
+            self.rfid_port_var.set(port_list[0])
 
-        except Exception as e:
-            self.rfid_port_combo['values'] = ["端口检测失败"]
-            print(f"⚠️ 串口检测失败: {e}")
+        print(f"✓ 发现 {len(port_list)} 个串口: {port_list}")
 
-    def refresh_cameras(self):
-        """刷新摄像头列表"""
-        try:
-            camera_list = []
+    def refresh_cameras(self, force=False):
+        """在后台刷新摄像头列表（各索引并行检测，检测期间不阻塞界面）
+
+        Args:
+            force: 忽略缓存重新检测（手动刷新时）
+        """
+        if self.camera_probe_running:
+            return
+        self.camera_probe_running = True
+
+        def probe():
+            with self.device_lock:
+                camera_list = self._probe_cameras(force)
+            self._post_to_ui(self._apply_camera_list, camera_list)
+
+        threading.Thread(target=probe, name="camera-probe", daemon=True).start()
+
+    def _probe_cameras(self, force=False):
+        """检测可用的摄像头，正在使用的摄像头不重新打开（后台线程，调用方持有device_lock）
+
+        Args:
+            force: 忽略缓存重新检测
 
-            # 检测摄像头（最多检测5个）
-            for i in range(5):
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    camera_list.append(f"摄像头 {i}")
-                    cap.release()
+        Returns:
+            list: 摄像头列表的显示文本
+        """
+        try:
+            indices = self.device_discovery.list_cameras(self.camera_index, force)
+            camera_list = [f"摄像头 {i}" for i in indices]
 
             if not camera_list:
                 camera_list = ["无可用摄像头"]
+            print(f"✓ 发现 {len(camera_list)} 个摄像头: {camera_list}")
+            return camera_list
+        except Exception as e:
+            print(f"⚠️ 摄像头检测失败: {e}")
+            return ["摄像头检测失败"]
 
-            self.camera_combo['values'] = camera_list
+    def _apply_camera_list(self, camera_list):
+        """显示检测到的摄像头列表（Tk线程）"""
+        self.camera_probe_running = False
+        self.camera_combo['values'] = camera_list
 
-            # 如果当前选择的摄像头不在列表中，选择第一个
-            current_camera = self.camera_var.get()
-            if current_camera not in camera_list and camera_list[0] != "无可用摄像头":
-                print(f"✓ 发现 {len(camera_list)} 个摄像头: {camera_list}")
+        # 如果当前选择的摄像头不在列表中，选择第一个
+        current_camera = self.camera_var.get()
+        if current_camera not in camera_list:
             self.camera_var.set(camera_list[0])
-        except Exception as e:
-            self.camera_combo['values'] = ["摄像头检测失败"]
-            print(f"⚠️ 摄像头检测失败: {e}")
 
     def on_rfid_port_changed(self, event):
         """RFID端口选择改变事件"""
@@ -1653,22 +2352,22 @@ class DataRecorderApp:
                 self.config_status_label.config(text=f"配置状态：RFID端口已保存 ({selected_port})", foreground="blue")
                 print(f"✓ RFID端口配置已保存: {selected_port}")
 
-                # 重新初始化RFID连接
+                # 在后台重新连接RFID
                 if RFID_AVAILABLE:
-                    try:
-                        rfid_util.close()
-                        self.rfid_connected = rfid_util.connect(selected_port)
-                        if self.rfid_connected:
-                            print(f"✓ RFID重新连接成功: {selected_port}")
-                        else:
-                            print(f"⚠️ RFID重新连接失败: {selected_port}")
-                    except Exception as e:
-                        print(f"⚠️ RFID重新连接异常: {e}")
+                    self.set_subsystem_status("rfid", SUBSYSTEM_LOADING)
+                    threading.Thread(target=self._reconnect_rfid, args=(selected_port,),
+                                     name="rfid-reconnect", daemon=True).start()
 
             except Exception as e:
                 self.config_status_label.config(text="配置状态：保存失败", foreground="red")
                 print(f"⚠️ RFID端口配置保存失败: {e}")
 
+    def _apply_config_change(self, key, value):
+        """把重新加载的配置同步到界面（Tk线程）"""
+        var = {'ocr_required_count': self.ocr_count_var, 'tid_required_count': self.tid_count_var}[key]
+        if var.get() != str(value):
+            var.set(str(value))
+
     def on_ocr_count_changed(self, *args):
         """OCR识别次数改变事件"""
         try:
@@ -1710,21 +2409,10 @@ class DataRecorderApp:
                 self.config_status_label.config(text=f"配置状态：摄像头已保存 (索引{camera_index})", foreground="blue")
                 print(f"✓ 摄像头配置已保存: 索引{camera_index}")
 
-                # 重新初始化摄像头
-                try:
-                    if self.camera:
-                        self.camera.release()
-
-                    self.camera = cv2.VideoCapture(camera_index)
-                    if self.camera.isOpened():
-                        print(f"✓ 摄像头重新连接成功: 索引{camera_index}")
-                    else:
-                        print(f"⚠️ 摄像头重新连接失败: 索引{camera_index}")
-                        self.camera = None
-
-                except Exception as e:
-                    print(f"⚠️ 摄像头重新连接异常: {e}")
-                    self.camera = None
+                # 在后台重新打开摄像头
+                self.set_subsystem_status("camera", SUBSYSTEM_LOADING)
+                threading.Thread(target=self._reopen_camera, args=(camera_index,),
+                                 name="camera-reopen", daemon=True).start()
 
             except Exception as e:
                 self.config_status_label.config(text="配置状态：保存失败", foreground="red")
@@ -1732,9 +2420,22 @@ class DataRecorderApp:
 
 
 def main():
-    """主程序入口"""
+    """主程序入口
+
+    命令行选项 --profile-startup[=文件路径] 记录启动时各模块的导入耗时和各子系统的初始化耗时，
+    默认报告写入配置目录下的 startup_profile.txt。
+    """
+    profile_file = startup_profiler.parse_option(sys.argv)
+    if profile_file is not None:
+        profiler = startup_profiler.start()
+        profiler.output_file = profile_file or os.path.join(get_config_dir(),
+                                                            startup_profiler.DEFAULT_STARTUP_PROFILE_FILE)
+
     root = tk.Tk()
+    startup_profiler.mark("Tk窗口创建")
     app = DataRecorderApp(root)
+    startup_profiler.mark("界面初始化完成")
+    root.after_idle(startup_profiler.mark, "窗口显示")
 
     # 设置窗口图标（如果有的话）
     try:
@@ -1750,7 +2451,10 @@ def main():
 
     # 设置窗口关闭事件
     def on_closing():
-        if messagebox.askokcancel("退出", "确定要退出程序吗？"):
+        message = "确定要退出程序吗？"
+        if app.export_job and app.export_job.is_running():
+            message = "数据正在后台导出，退出将取消本次导出（Excel文件不会被修改）。\n\n确定要退出程序吗？"
+        if messagebox.askokcancel("退出", message):
             # 清理资源
             app.cleanup_resources()
             root.destroy()
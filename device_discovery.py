@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+设备检测模块
+
+检测可用的串口和摄像头：
+- 摄像头索引并行检测，不存在的索引在Windows上可能要等待数秒，总耗时只取决于最慢的一个
+- 检测结果按索引缓存，正在使用的摄像头不重新打开
+- 后台轮询串口列表和/dev/video*（Linux），设备插拔时让缓存失效并通知调用方
+Windows没有轻量的摄像头枚举方法，摄像头缓存在超过有效期或手动刷新时重新检测。
+"""
+import glob
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import serial.tools.list_ports
+
+from lazy_import import LazyModule
+
+cv2 = LazyModule("cv2")
+
+# 检测的摄像头索引数
+DEFAULT_CAMERA_PROBE_COUNT = 5
+
+# 摄像头检测结果的有效期(秒)
+DEFAULT_CAMERA_CACHE_TTL = 600
+
+# 插拔检测的轮询间隔(秒)
+DEFAULT_DEVICE_WATCH_INTERVAL = 2.0
+
+
+def list_serial_ports() -> List[str]:
+    """列出当前的串口设备名"""
+    return sorted(port.device for port in serial.tools.list_ports.comports())
+
+
+def list_video_nodes() -> Tuple[str, ...]:
+    """列出摄像头设备节点（只在Linux上可用，其他系统返回空）"""
+    if not sys.platform.startswith("linux"):
+        return ()
+    return tuple(sorted(glob.glob("/dev/video*")))
+
+
+class DeviceDiscovery:
+    """串口和摄像头检测，带缓存和插拔检测
+
+    所有方法都可以在任意线程调用；检测会打开设备，不要在Tk线程调用list_cameras。
+    """
+
+    def __init__(self, camera_count: int = DEFAULT_CAMERA_PROBE_COUNT,
+                 cache_ttl: float = DEFAULT_CAMERA_CACHE_TTL):
+        """初始化设备检测
+
+        Args:
+            camera_count: 检测的摄像头索引数（0到camera_count-1）
+            cache_ttl: 摄像头检测结果的有效期(秒)，小于等于0表示只在插拔或强制刷新时失效
+        """
+        self.camera_count = max(1, camera_count)
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._camera_cache = {}  # 索引 -> (是否可用, 检测时间)
+        self._video_nodes = list_video_nodes()
+        self._watch_thread = None
+        self._watch_stop = threading.Event()
+
+    def list_ports(self) -> List[str]:
+        """列出当前的串口（开销很小，不缓存）"""
+        return list_serial_ports()
+
+    def list_cameras(self, active_index: Optional[int] = None, force: bool = False) -> List[int]:
+        """列出可用的摄像头索引
+
+        缓存中没有或已过期的索引并行检测。
+
+        Args:
+            active_index: 正在使用的摄像头索引，视为可用，不重新打开
+            force: 忽略缓存，重新检测所有索引
+
+        Returns:
+            List[int]: 可用的摄像头索引
+        """
+        self._check_video_nodes()
+        now = time.monotonic()
+        with self._lock:
+            if force:
+                self._camera_cache.clear()
+            results = {}
+            pending = []
+            for index in range(self.camera_count):
+                if index == active_index:
+                    results[index] = True
+                    continue
+                cached = self._camera_cache.get(index)
+                if cached is not None and (self.cache_ttl <= 0 or now - cached[1] < self.cache_ttl):
+                    results[index] = cached[0]
+                else:
+                    pending.append(index)
+
+        if pending:
+            results.update(self._probe_cameras(pending))
+        return [index for index in range(self.camera_count) if results.get(index)]
+
+    def invalidate_cameras(self) -> None:
+        """清空摄像头检测缓存"""
+        with self._lock:
+            self._camera_cache.clear()
+
+    def start_watch(self, on_ports_changed: Callable[[List[str]], None],
+                    on_cameras_changed: Callable[[], None],
+                    interval: float = DEFAULT_DEVICE_WATCH_INTERVAL) -> None:
+        """启动后台插拔检测
+
+        回调在检测线程中调用，需要更新界面时由调用方转交给Tk线程。
+
+        Args:
+            on_ports_changed: 串口列表变化时调用，参数为新的串口列表
+            on_cameras_changed: 摄像头设备节点变化时调用（缓存已清空）
+            interval: 轮询间隔(秒)
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(on_ports_changed, on_cameras_changed, interval),
+            name="device-watch", daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop_watch(self) -> None:
+        """停止插拔检测"""
+        self._watch_stop.set()
+        self._watch_thread = None
+
+    def _watch_loop(self, on_ports_changed, on_cameras_changed, interval: float) -> None:
+        try:
+            ports = list_serial_ports()
+        except Exception as e:
+            print(f"⚠️ 串口检测失败: {e}")
+            ports = None
+        while not self._watch_stop.wait(interval):
+            try:
+                current_ports = list_serial_ports()
+                if ports is not None and current_ports != ports:
+                    print(f"🔌 串口发生变化: {current_ports}")
+                    on_ports_changed(current_ports)
+                ports = current_ports
+
+                if self._check_video_nodes():
+                    on_cameras_changed()
+            except Exception as e:
+                print(f"⚠️ 设备插拔检测失败: {e}")
+
+    def _check_video_nodes(self) -> bool:
+        """摄像头设备节点有变化时清空缓存
+
+        Returns:
+            bool: 是否发生了变化
+        """
+        nodes = list_video_nodes()
+        with self._lock:
+            if nodes == self._video_nodes:
+                return False
+            self._video_nodes = nodes
+            self._camera_cache.clear()
+        print(f"📷 摄像头设备发生变化: {list(nodes)}")
+        return True
+
+    def _probe_cameras(self, indices: List[int]) -> Dict[int, bool]:
+        """并行打开摄像头索引检测是否可用，并写入缓存"""
+        with ThreadPoolExecutor(max_workers=len(indices), thread_name_prefix="camera-probe") as executor:
+            results = dict(zip(indices, executor.map(self._probe_camera, indices)))
+        now = time.monotonic()
+        with self._lock:
+            for index, available in results.items():
+                self._camera_cache[index] = (available, now)
+        return results
+
+    @staticmethod
+    def _probe_camera(index: int) -> bool:
+        cap = cv2.VideoCapture(index)
+        try:
+            return cap.isOpened()
+        finally:
+            cap.release()
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel导出工具模块
+
+负责导出前的图片预处理（在线程池中并行完成图片解码、缩放和编码），
+以及在后台线程中执行的导出任务，目标文件只在导出完成后原子替换。
+
+向体积较大的现有工作簿追加时使用分卷模式：每批数据写入独立的分卷文件，
+并在轻量的索引工作簿中登记，追加耗时只与新数据量相关。
+
+新建文件和分卷文件使用流式写入，缩略图按批准备、写完即释放，内存占用与行数无关。
+导出的数据可以是记录列表，也可以是按批读取的记录源（见record_journal.JournalRecordSource）
+"""
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lazy_import import LazyModule
+from metrics import metrics
+from xlsx_stream_writer import StreamingXlsxWriter
+
+# 导出时才导入，不拖慢程序启动
+openpyxl = LazyModule("openpyxl")
+openpyxl_drawing = LazyModule("openpyxl.drawing.image")
+Image = LazyModule("PIL.Image")
+
+# 嵌入Excel的缩略图最大尺寸(像素)
+THUMBNAIL_MAX_WIDTH = 200
+THUMBNAIL_MAX_HEIGHT = 150
+
+# 导出表格格式
+EXPORT_SHEET_TITLE = "数据记录"
+EXPORT_HEADERS = ["序号", "厂家名称", "TID", "标签号", "图片", "记录时间"]
+EXPORT_COLUMN_WIDTHS = {'A': 8, 'B': 20, 'C': 25, 'D': 20, 'E': 30, 'F': 20}
+
+# 流式写入时每批准备的缩略图数量
+THUMBNAIL_CHUNK_SIZE = 256
+
+# 分卷追加配置
+DEFAULT_APPEND_SPLIT_SIZE_MB = 20   # 现有工作簿超过此大小时使用分卷追加(MB)
+PARTS_DIR_SUFFIX = "_分卷"           # 分卷目录后缀
+INDEX_FILE_SUFFIX = "_索引.xlsx"     # 索引工作簿后缀
+PENDING_FILE_SUFFIX = "_待登记.txt"  # 正在写入、尚未登记到索引的分卷文件名
+INDEX_SHEET_TITLE = "分卷索引"
+INDEX_HEADERS = ["分卷文件", "起始序号", "结束序号", "条数", "导出时间"]
+
+
+def prepare_thumbnail(image_path: str) -> bytes:
+    """读取图片并生成嵌入Excel用的缩略图
+
+    Args:
+        image_path: 图片文件路径
+
+    Returns:
+        编码后的缩略图字节数据
+    """
+    with Image.open(image_path) as img:
+        img_format = img.format if img.format else 'PNG'
+        img.thumbnail((THUMBNAIL_MAX_WIDTH, THUMBNAIL_MAX_HEIGHT), Image.Resampling.LANCZOS)
+
+        img_buffer = io.BytesIO()
+        img.save(img_buffer, format=img_format)
+    return img_buffer.getvalue()
+
+
+class ExportCancelledException(Exception):
+    """导出任务被用户取消时抛出的异常"""
+    pass
+
+
+def prepare_thumbnails(image_paths: Iterable[str],
+                       max_workers: Optional[int] = None,
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       cancel_event: Optional[threading.Event] = None) -> Dict[str, bytes]:
+    """并行准备多张图片的缩略图
+
+    Pillow在解码和缩放时会释放GIL，因此线程池即可利用多核。
+    相同路径只处理一次，不存在或处理失败的图片不会出现在结果中。
+
+    Args:
+        image_paths: 图片路径列表
+        max_workers: 最大线程数，默认为CPU核心数
+        progress_callback: 进度回调，参数为(已完成数, 总数)，在调用线程中执行
+        cancel_event: 取消事件，被设置后放弃未开始的任务并抛出ExportCancelledException
+
+    Returns:
+        dict: 图片路径 -> 缩略图字节数据
+    """
+    unique_paths = []
+    seen = set()
+    for path in image_paths:
+        if path and path not in seen and os.path.exists(path):
+            seen.add(path)
+            unique_paths.append(path)
+
+    thumbnails = {}
+    total = len(unique_paths)
+    if total == 0:
+        return thumbnails
+
+    workers = max_workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, total)) as executor:
+        futures = {executor.submit(prepare_thumbnail, path): path for path in unique_paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            if cancel_event is not None and cancel_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+                raise ExportCancelledException("导出已取消")
+
+            path = futures[future]
+            try:
+                thumbnails[path] = future.result()
+            except Exception as e:
+                print(f"处理图片失败 {os.path.basename(path)}: {e}")
+
+            if progress_callback:
+                progress_callback(done, total)
+
+    return thumbnails
+
+
+def write_empty_export_file(file_path: str) -> None:
+    """创建只有表头的导出文件
+
+    Args:
+        file_path: 文件路径
+    """
+    with StreamingXlsxWriter(file_path, EXPORT_SHEET_TITLE, EXPORT_COLUMN_WIDTHS) as writer:
+        writer.append_row(EXPORT_HEADERS)
+
+
+def validate_workbook_file(file_path: str) -> None:
+    """快速校验现有Excel文件，不解析工作簿内容
+
+    只检查文件是否为xlsx压缩包以及是否可写，避免为校验而完整加载大文件。
+
+    Args:
+        file_path: Excel文件路径
+
+    Raises:
+        PermissionError: 文件被其他程序占用或没有写入权限
+        ValueError: 文件不是有效的xlsx工作簿
+    """
+    if not zipfile.is_zipfile(file_path):
+        raise ValueError("文件不是有效的xlsx工作簿")
+
+    with zipfile.ZipFile(file_path) as zf:
+        if 'xl/workbook.xml' not in zf.namelist():
+            raise ValueError("文件不是有效的xlsx工作簿")
+
+    # 以读写方式打开一次，文件被Excel占用时会抛出PermissionError
+    with open(file_path, 'r+b'):
+        pass
+
+
+def get_parts_dir(excel_file: str) -> str:
+    """获取工作簿对应的分卷目录"""
+    stem = os.path.splitext(excel_file)[0]
+    return stem + PARTS_DIR_SUFFIX
+
+
+def get_index_file(excel_file: str) -> str:
+    """获取工作簿对应的分卷索引文件"""
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    return os.path.join(get_parts_dir(excel_file), stem + INDEX_FILE_SUFFIX)
+
+
+def should_append_as_parts(excel_file: str, split_size_mb: float = DEFAULT_APPEND_SPLIT_SIZE_MB) -> bool:
+    """判断追加到现有工作簿时是否使用分卷模式
+
+    已经存在分卷索引的工作簿始终使用分卷模式，保证序号连续；
+    否则在文件大小超过阈值时启用。
+
+    Args:
+        excel_file: 现有工作簿路径
+        split_size_mb: 启用分卷的文件大小阈值(MB)，小于等于0表示不启用
+
+    Returns:
+        bool: 是否使用分卷模式
+    """
+    if os.path.exists(get_index_file(excel_file)):
+        return True
+    if split_size_mb <= 0:
+        return False
+    return os.path.getsize(excel_file) >= split_size_mb * 1024 * 1024
+
+
+def _read_index_rows(excel_file: str) -> List[tuple]:
+    """读取分卷索引的数据行，没有索引时返回空列表"""
+    index_file = get_index_file(excel_file)
+    if not os.path.exists(index_file):
+        return []
+    wb = openpyxl.load_workbook(index_file, read_only=True)
+    try:
+        return [row for row in wb.active.iter_rows(min_row=2, values_only=True) if row]
+    finally:
+        wb.close()
+
+
+def _serial_after(last_row: int, last_serial) -> int:
+    """最后一个数据行之后的序号：优先接续A列的数字，否则按行号计算（第一行为表头）"""
+    if isinstance(last_serial, int) and not isinstance(last_serial, bool):
+        return last_serial + 1
+    return last_row
+
+
+def read_next_serial(excel_file: str) -> int:
+    """读取分卷模式下一条数据的序号
+
+    有索引时取索引最后一行的结束序号；否则以只读模式流式读取一遍主工作簿（不加载图片），
+    按与find_append_position相同的规则跳过末尾只有格式的空行并接续A列的序号。
+
+    Args:
+        excel_file: 主工作簿路径
+
+    Returns:
+        int: 下一条数据的序号
+    """
+    index_rows = _read_index_rows(excel_file)
+    if index_rows:
+        last_end = 0
+        for row in index_rows:
+            if len(row) > 2 and isinstance(row[2], int):
+                last_end = row[2]
+        return last_end + 1
+
+    wb = openpyxl.load_workbook(excel_file, read_only=True)
+    try:
+        last_row, last_serial = 1, 0
+        for row_index, row in enumerate(wb.active.iter_rows(values_only=True), 1):
+            if row_index > 1 and any(value is not None for value in row):
+                last_row, last_serial = row_index, row[0]
+        return _serial_after(last_row, last_serial)
+    finally:
+        wb.close()
+
+
+def get_pending_file(excel_file: str) -> str:
+    """获取记录正在写入的分卷文件名的文件"""
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    return os.path.join(get_parts_dir(excel_file), stem + PENDING_FILE_SUFFIX)
+
+
+def part_file_name(excel_file: str, export_time: datetime, suffix: int = 1) -> str:
+    """分卷文件名：<主工作簿名>_<导出时间>[_<编号>].xlsx"""
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    name = f"{stem}_{export_time.strftime('%Y%m%d_%H%M%S')}"
+    return f"{name}_{suffix}.xlsx" if suffix > 1 else f"{name}.xlsx"
+
+
+def _is_part_file_name(excel_file: str, name: str) -> bool:
+    """是否为导出时生成的分卷文件名"""
+    stem = os.path.splitext(os.path.basename(excel_file))[0]
+    return re.fullmatch(re.escape(stem) + r"_\d{8}_\d{6}(?:_\d+)?\.xlsx", name) is not None
+
+
+def remove_pending_part(excel_file: str) -> Optional[str]:
+    """删除上次中断的导出留下的未登记分卷
+
+    分卷文件写入前先记录文件名，登记到索引后清除记录；记录仍然存在说明两步之间程序退出或登记失败，
+    该分卷中的数据没有标记为已导出，重新导出时会再次写入，不删除会造成重复。
+    只删除记录中的那一个文件，分卷目录中的其他文件不受影响。
+
+    Returns:
+        str: 删除的文件路径，没有需要删除的分卷时返回None
+    """
+    pending_file = get_pending_file(excel_file)
+    if not os.path.exists(pending_file):
+        return None
+    with open(pending_file, 'r', encoding='utf-8') as f:
+        name = f.read().strip()
+    removed = None
+    if _is_part_file_name(excel_file, name) and name not in {row[0] for row in _read_index_rows(excel_file)}:
+        path = os.path.join(get_parts_dir(excel_file), name)
+        try:
+            os.remove(path)
+            removed = path
+            print(f"🧹 删除未登记到索引的分卷文件: {name}")
+        except FileNotFoundError:
+            pass
+    os.remove(pending_file)
+    return removed
+
+
+def find_append_position(worksheet) -> Tuple[int, int]:
+    """确定追加数据的起始行和起始序号
+
+    只读取一次max_row，并跳过末尾只有格式没有值的空行；
+    空工作表会补写表头。序号优先接续最后一行A列的数字。
+
+    Args:
+        worksheet: 目标工作表
+
+    Returns:
+        tuple: (起始行号, 起始序号)
+    """
+    last_row = worksheet.max_row
+    while last_row > 1 and all(cell.value is None for cell in worksheet[last_row]):
+        last_row -= 1
+
+    header = [cell.value for cell in worksheet[1]][:len(EXPORT_HEADERS)]
+    if last_row <= 1 and all(value is None for value in header):
+        # 空工作表，补写表头
+        for col, title in enumerate(EXPORT_HEADERS, 1):
+            worksheet.cell(row=1, column=col, value=title)
+        return 2, 1
+
+    if header != EXPORT_HEADERS:
+        print(f"⚠️ 工作表表头与导出格式不一致，将在第{last_row + 1}行之后继续追加: {header}")
+
+    last_serial = worksheet.cell(row=last_row, column=1).value if last_row > 1 else 0
+    return last_row + 1, _serial_after(last_row, last_serial)
+
+
+def insert_image(worksheet, row: int, col: int, image_data: bytes) -> None:
+    """把已准备好的缩略图锚定到指定单元格
+
+    Args:
+        worksheet: 目标工作表
+        row: 行号
+        col: 列号
+        image_data: 缩略图字节数据
+    """
+    try:
+        # 创建Excel图片对象
+        excel_img = openpyxl_drawing.Image(io.BytesIO(image_data))
+
+        # 设置图片位置
+        excel_img.anchor = worksheet.cell(row=row, column=col).coordinate
+
+        # 插入图片
+        worksheet.add_image(excel_img)
+
+        # 调整行高
+        worksheet.row_dimensions[row].height = THUMBNAIL_MAX_HEIGHT * 0.75
+
+    except Exception as e:
+        raise Exception(f"插入图片失败：{str(e)}")
+
+
+def replace_file_atomically(write_func: Callable[[str], None], target_path: str) -> None:
+    """先写入同目录下的临时文件，成功后再原子替换目标文件
+
+    写入过程中出错或被取消时，目标文件保持原样。
+
+    Args:
+        write_func: 写文件函数，参数为临时文件路径
+        target_path: 目标文件路径
+    """
+    target_dir = os.path.dirname(os.path.abspath(target_path))
+    fd, temp_path = tempfile.mkstemp(dir=target_dir, prefix='.~', suffix='.xlsx')
+    os.close(fd)
+    try:
+        write_func(temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ExcelExportJob:
+    """后台Excel导出任务
+
+    在独立线程中完成图片处理、写入和保存，不访问任何Tk对象。
+    界面通过定时读取progress属性显示进度，通过cancel()取消任务。
+    """
+
+    # 任务状态
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_FAILED = "failed"
+
+    # 写入方式
+    MODE_NEW = "new"            # 流式写入新文件（覆盖目标文件）
+    MODE_IN_PLACE = "in_place"  # 直接追加到目标工作簿
+    MODE_PARTS = "parts"        # 写入新的分卷文件并登记到索引
+
+    def __init__(self, excel_file: str, records, mode: str = MODE_IN_PLACE):
+        """初始化导出任务
+
+        Args:
+            excel_file: 目标Excel文件路径（必须已存在）
+            records: 要导出的数据记录快照列表，或提供__len__和iter_chunks(size)的记录源
+            mode: 写入方式，MODE_NEW、MODE_IN_PLACE或MODE_PARTS
+        """
+        self.excel_file = excel_file
+        self.records = records
+        self.total_count = len(records)
+        self.exported_records = []  # 已写入的记录的TID和标签号，用于登记历史导出
+        self.mode = mode
+        self.output_file = excel_file  # 实际写入的文件，分卷模式下为分卷文件
+        self.status = self.STATUS_PENDING
+        self.progress = (0, 0, "等待导出")  # (已完成数, 总数, 阶段描述)
+        self.success_count = 0
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """启动后台导出线程"""
+        self.status = self.STATUS_RUNNING
+        self._thread = threading.Thread(target=self._run, name="excel_export", daemon=True)
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """请求取消导出，目标文件不会被修改"""
+        self._cancel_event.set()
+
+    def is_running(self) -> bool:
+        """任务是否仍在执行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """等待导出线程结束"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _check_cancelled(self) -> None:
+        if self._cancel_event.is_set():
+            raise ExportCancelledException("导出已取消")
+
+    def _run(self) -> None:
+        try:
+            start = time.perf_counter()
+            self._export()
+            # 只统计完成的导出，取消和失败的耗时没有参考意义
+            metrics.observe("export.total", time.perf_counter() - start)
+            self.status = self.STATUS_DONE
+        except ExportCancelledException:
+            self.status = self.STATUS_CANCELLED
+            self.progress = (0, 0, "导出已取消")
+        except Exception as e:
+            self.error = e
+            self.status = self.STATUS_FAILED
+            self.progress = (0, 0, "导出失败")
+
+    def _export(self) -> None:
+        if self.mode == self.MODE_PARTS:
+            self._export_parts()
+        elif self.mode == self.MODE_NEW:
+            self.progress = (0, self.total_count, "正在写入数据")
+            replace_file_atomically(lambda path: self._write_streaming(path, 1), self.excel_file)
+        else:
+            self._export_in_place()
+
+        self.progress = (self.total_count, self.total_count, "导出完成")
+
+    def _iter_chunks(self, chunk_size: int) -> Iterator[List[dict]]:
+        """按批返回要导出的记录"""
+        if hasattr(self.records, 'iter_chunks'):
+            yield from self.records.iter_chunks(chunk_size)
+            return
+        for start in range(0, self.total_count, chunk_size):
+            yield self.records[start:start + chunk_size]
+
+    def _record_written(self, data: dict) -> None:
+        """记录一条数据已写入并更新进度"""
+        self.exported_records.append({'tid': data['tid'], 'label': data['label']})
+        self.success_count += 1
+        self.progress = (self.success_count, self.total_count, "正在写入数据")
+
+    def _prepare_thumbnails(self, records: List[dict]) -> Dict[str, bytes]:
+        """并行准备一组记录的缩略图，并报告图片处理进度"""
+        image_paths = [data['image_path'] for data in records if data['image_path']]
+        with metrics.span("export.thumbnails"):
+            thumbnails = prepare_thumbnails(
+                image_paths,
+                progress_callback=lambda done, total: setattr(self, 'progress', (done, total, "正在处理图片")),
+                cancel_event=self._cancel_event
+            )
+        self._check_cancelled()
+        return thumbnails
+
+    def _write_record(self, ws, row: int, serial: int, data: dict, thumbnails: Dict[str, bytes]) -> None:
+        """写入一条数据记录及其图片"""
+        ws.cell(row=row, column=1, value=serial)  # 序号
+        ws.cell(row=row, column=2, value=data['manufacturer'])  # 厂家名称
+        ws.cell(row=row, column=3, value=data['tid'])  # TID
+        ws.cell(row=row, column=4, value=data['label'])  # 标签号
+        ws.cell(row=row, column=6, value=data['timestamp'])  # 记录时间
+
+        # 插入图片
+        image_data = thumbnails.get(data['image_path'])
+        if image_data:
+            try:
+                insert_image(ws, row, 5, image_data)
+            except Exception as e:
+                print(f"插入图片失败: {e}")
+
+        self._record_written(data)
+
+    def _write_streaming(self, file_path: str, start_serial: int) -> None:
+        """流式写入带表头的新文件
+
+        缩略图按THUMBNAIL_CHUNK_SIZE分批并行准备，每批写入后即释放。
+
+        Args:
+            file_path: 输出文件路径
+            start_serial: 第一条数据的序号
+        """
+        total_count = self.total_count
+        serial = start_serial
+        with StreamingXlsxWriter(file_path, EXPORT_SHEET_TITLE, EXPORT_COLUMN_WIDTHS) as writer:
+            writer.append_row(EXPORT_HEADERS)
+
+            for chunk in self._iter_chunks(THUMBNAIL_CHUNK_SIZE):
+                thumbnails = self._prepare_thumbnails(chunk)
+
+                for data in chunk:
+                    self._check_cancelled()
+
+                    image_data = thumbnails.get(data['image_path'])
+                    row = writer.append_row(
+                        [serial, data['manufacturer'], data['tid'],
+                         data['label'], None, data['timestamp']],
+                        height=THUMBNAIL_MAX_HEIGHT * 0.75 if image_data else None
+                    )
+                    if image_data:
+                        try:
+                            writer.add_image(row, 5, image_data)
+                        except Exception as e:
+                            print(f"插入图片失败: {e}")
+
+                    serial += 1
+                    self._record_written(data)
+
+                del thumbnails
+
+            self._check_cancelled()
+            self.progress = (total_count, total_count, "正在保存文件")
+
+    def _export_in_place(self) -> None:
+        """加载目标工作簿追加数据后整体保存"""
+        total_count = self.total_count
+
+        # 打开Excel文件
+        self.progress = (0, total_count, "正在打开Excel文件")
+        with metrics.span("export.open"):
+            wb = openpyxl.load_workbook(self.excel_file)
+        try:
+            ws = wb.active
+
+            # 起始行和序号只计算一次，之后按偏移写入
+            start_row, start_serial = find_append_position(ws)
+            offset = 0
+            for chunk in self._iter_chunks(THUMBNAIL_CHUNK_SIZE):
+                # 按批并行准备缩略图
+                thumbnails = self._prepare_thumbnails(chunk)
+                for data in chunk:
+                    self._check_cancelled()
+                    self._write_record(ws, start_row + offset, start_serial + offset, data, thumbnails)
+                    offset += 1
+                del thumbnails
+
+            self._check_cancelled()
+
+            # 写入临时文件后原子替换目标文件
+            self.progress = (total_count, total_count, "正在保存文件")
+            with metrics.span("export.save"):
+                replace_file_atomically(wb.save, self.excel_file)
+        finally:
+            wb.close()
+
+    def _export_parts(self) -> None:
+        """把本批数据流式写入新的分卷文件，并在索引工作簿中登记
+
+        不加载主工作簿和已有分卷，耗时只与本批数据量相关。
+        """
+        total_count = self.total_count
+        self.progress = (0, total_count, "正在读取分卷索引")
+
+        parts_dir = get_parts_dir(self.excel_file)
+        os.makedirs(parts_dir, exist_ok=True)
+        # 清理之前中断的导出留下的未登记分卷，其中的数据会在本次重新写入
+        remove_pending_part(self.excel_file)
+        start_serial = read_next_serial(self.excel_file)
+
+        export_time = datetime.now()
+        suffix = 1
+        part_name = part_file_name(self.excel_file, export_time)
+        while os.path.exists(os.path.join(parts_dir, part_name)):
+            suffix += 1
+            part_name = part_file_name(self.excel_file, export_time, suffix)
+        self.output_file = os.path.join(parts_dir, part_name)
+
+        # 写入前记录分卷文件名，写入或登记中途退出时下次导出只删除这个文件
+        pending_file = get_pending_file(self.excel_file)
+        with open(pending_file, 'w', encoding='utf-8') as f:
+            f.write(part_name)
+
+        # 写入分卷文件，并登记到索引工作簿（只含少量文本，重写代价很小），登记失败时删除分卷
+        try:
+            replace_file_atomically(lambda path: self._write_streaming(path, start_serial), self.output_file)
+            self.progress = (total_count, total_count, "正在更新分卷索引")
+            self._register_part(part_name, start_serial, export_time)
+        except BaseException:
+            try:
+                if os.path.exists(self.output_file):
+                    os.remove(self.output_file)
+                os.remove(pending_file)
+            except OSError:
+                pass  # 删除失败时保留记录，下次导出时再删除
+            raise
+        os.remove(pending_file)
+
+    def _register_part(self, part_name: str, start_serial: int, export_time: datetime) -> None:
+        """在索引工作簿中登记写入的分卷"""
+        index_file = get_index_file(self.excel_file)
+        if os.path.exists(index_file):
+            index_wb = openpyxl.load_workbook(index_file)
+        else:
+            index_wb = openpyxl.Workbook()
+            index_wb.active.title = INDEX_SHEET_TITLE
+            index_wb.active.append(INDEX_HEADERS)
+            index_wb.active.column_dimensions['A'].width = 40
+            index_wb.active.column_dimensions['E'].width = 20
+        try:
+            # 按实际写入的条数登记
+            index_wb.active.append([
+                part_name,
+                start_serial,
+                start_serial + self.success_count - 1,
+                self.success_count,
+                export_time.strftime("%Y-%m-%d %H:%M:%S")
+            ])
+            with metrics.span("export.index"):
+                replace_file_atomically(index_wb.save, index_file)
+        finally:
+            index_wb.close()
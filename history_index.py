@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史导出索引模块
+
+用SQLite保存所有已导出过的TID和标签号，跨会话去重：
+- 可从已有的xlsx工作簿（含分卷）一次性建立索引，只读流式读取
+- 每次导出成功后增量登记本批数据
+- 查询走主键/索引，数百万条历史数据下仍然很快
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from excel_exporter import get_parts_dir, get_index_file
+from lazy_import import LazyModule
+from record_store import DedupIndex, normalize_value
+
+# 导入工作簿时才导入
+openpyxl = LazyModule("openpyxl")
+
+# 导入时每批提交的行数，批次之间释放锁，避免阻塞界面上的查询
+IMPORT_BATCH_SIZE = 5000
+
+# 工作簿中用于识别TID和标签号列的表头
+TID_HEADER = "TID"
+LABEL_HEADER = "标签号"
+# 找不到表头时使用的默认列（从0开始，与导出格式一致）
+DEFAULT_TID_COLUMN = 2
+DEFAULT_LABEL_COLUMN = 3
+
+
+def _cell_text(value) -> Optional[str]:
+    """把单元格的值转换为索引使用的文本"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return normalize_value(str(value))
+
+
+def list_workbook_files(excel_file: str) -> List[str]:
+    """列出工作簿及其全部分卷文件（不含分卷索引）"""
+    files = [excel_file]
+    parts_dir = get_parts_dir(excel_file)
+    if os.path.isdir(parts_dir):
+        index_file = os.path.normcase(os.path.abspath(get_index_file(excel_file)))
+        for name in sorted(os.listdir(parts_dir)):
+            path = os.path.join(parts_dir, name)
+            if name.lower().endswith('.xlsx') and os.path.normcase(os.path.abspath(path)) != index_file:
+                files.append(path)
+    return files
+
+
+class HistoryIndex:
+    """已导出数据的持久化索引
+
+    缺失的TID/标签号以空字符串保存。所有数据库操作在同一把锁内执行，
+    可以在后台线程导入工作簿的同时在界面线程查询。
+    关闭后查询返回空结果、写入被忽略，正在进行的导入在下一批时停止。
+    """
+
+    def __init__(self, db_file: str):
+        """打开（必要时创建）索引数据库
+
+        Args:
+            db_file: SQLite数据库文件路径
+        """
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._closed = False
+        db_dir = os.path.dirname(db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tags ("
+                " tid TEXT NOT NULL,"
+                " label TEXT NOT NULL,"
+                " PRIMARY KEY (tid, label)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tags_label ON tags (label)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER,"
+                " mtime REAL,"
+                " row_count INTEGER,"
+                " updated_at TEXT)"
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接（等待正在执行的数据库操作完成）"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._conn.close()
+
+    def count(self) -> int:
+        """索引中的记录数"""
+        with self._lock:
+            if self._closed:
+                return 0
+            return self._conn.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+
+    def contains(self, tid: Optional[str], label: Optional[str], policy: str = DedupIndex.POLICY_PAIR) -> bool:
+        """按去重规则检查TID/标签号是否已经导出过
+
+        Args:
+            tid: TID，空值或'N/A'视为无TID
+            label: 标签号，空值或'N/A'视为无标签号
+            policy: 去重规则，与DedupIndex一致
+
+        Returns:
+            bool: 是否已存在于历史导出中
+        """
+        tid = normalize_value(tid)
+        label = normalize_value(label)
+
+        queries = []
+        if policy == DedupIndex.POLICY_PAIR:
+            queries.append(("SELECT 1 FROM tags WHERE tid = ? AND label = ? LIMIT 1", (tid or '', label or '')))
+        else:
+            if tid is not None and policy in (DedupIndex.POLICY_TID, DedupIndex.POLICY_EACH):
+                queries.append(("SELECT 1 FROM tags WHERE tid = ? LIMIT 1", (tid,)))
+            if label is not None and policy in (DedupIndex.POLICY_LABEL, DedupIndex.POLICY_EACH):
+                queries.append(("SELECT 1 FROM tags WHERE label = ? LIMIT 1", (label,)))
+
+        with self._lock:
+            if self._closed:
+                return False
+            for sql, params in queries:
+                if self._conn.execute(sql, params).fetchone() is not None:
+                    return True
+        return False
+
+    def add_records(self, records: Iterable[dict], source: Optional[str] = None) -> None:
+        """登记一批已导出的数据记录
+
+        Args:
+            records: 数据记录，包含'tid'和'label'
+            source: 导出到的文件，仅用于登记来源
+        """
+        rows = [(normalize_value(r['tid']) or '', normalize_value(r['label']) or '') for r in records]
+        with self._lock:
+            if self._closed:
+                return
+            self._conn.executemany("INSERT OR IGNORE INTO tags (tid, label) VALUES (?, ?)", rows)
+            if source:
+                # 只登记导出时间，不记录文件大小，之后导入该文件时会重新扫描
+                self._conn.execute(
+                    "INSERT INTO sources (path, updated_at) VALUES (?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET size = NULL, mtime = NULL, updated_at = excluded.updated_at",
+                    (os.path.abspath(source), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+            self._conn.commit()
+
+    def import_workbook(self, excel_file: str,
+                        progress_callback: Optional[Callable[[str, int], None]] = None,
+                        cancel_event: Optional[threading.Event] = None) -> int:
+        """从工作簿（含分卷）导入历史数据
+
+        以只读模式逐行读取，未变化（大小和修改时间相同）的文件会被跳过。
+
+        Args:
+            excel_file: 工作簿路径
+            progress_callback: 进度回调，参数为(当前文件, 已读取行数)
+            cancel_event: 设置后在下一批提交后停止导入（索引关闭时同样停止）
+
+        Returns:
+            int: 读取的数据行数
+        """
+        total_rows = 0
+        for path in list_workbook_files(excel_file):
+            if self._stopped(cancel_event):
+                break
+            if self._is_source_current(path):
+                print(f"⏭️ 历史索引已是最新，跳过: {path}")
+                continue
+            total_rows += self._import_file(path, progress_callback, cancel_event)
+        return total_rows
+
+    def _is_source_current(self, path: str) -> bool:
+        stat = os.stat(path)
+        with self._lock:
+            if self._closed:
+                return False
+            row = self._conn.execute(
+                "SELECT size, mtime FROM sources WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return row is not None and row[0] == stat.st_size and row[1] == stat.st_mtime
+
+    def _import_file(self, path: str, progress_callback, cancel_event) -> int:
+        stat = os.stat(path)
+        wb = openpyxl.load_workbook(path, read_only=True)
+        row_count = 0
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            tid_col, label_col = DEFAULT_TID_COLUMN, DEFAULT_LABEL_COLUMN
+            if header:
+                header = [str(v).strip() if v is not None else '' for v in header]
+                if TID_HEADER in header and LABEL_HEADER in header:
+                    tid_col, label_col = header.index(TID_HEADER), header.index(LABEL_HEADER)
+
+            batch = []
+            for row in rows:
+                if not row:
+                    continue
+                tid = _cell_text(row[tid_col]) if tid_col < len(row) else None
+                label = _cell_text(row[label_col]) if label_col < len(row) else None
+                if tid is None and label is None:
+                    continue
+                batch.append((tid or '', label or ''))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    row_count += self._insert_batch(batch)
+                    batch = []
+                    if progress_callback:
+                        progress_callback(path, row_count)
+                    if self._stopped(cancel_event):
+                        return row_count
+            if batch:
+                row_count += self._insert_batch(batch)
+        finally:
+            wb.close()
+
+        with self._lock:
+            if self._closed:
+                return row_count
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (path, size, mtime, row_count, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(path), stat.st_size, stat.st_mtime, row_count,
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self._conn.commit()
+        if progress_callback:
+            progress_callback(path, row_count)
+        print(f"✅ 已导入历史数据 {row_count} 行: {path}")
+        return row_count
+
+    def _stopped(self, cancel_event: Optional[threading.Event]) -> bool:
+        """导入是否应该停止（已取消或索引已关闭）"""
+        return self._closed or (cancel_event is not None and cancel_event.is_set())
+
+    def _insert_batch(self, batch: list) -> int:
+        with self._lock:
+            if self._closed:
+                return 0
+            self._conn.executemany("INSERT OR IGNORE INTO tags (tid, label) VALUES (?, ?)", batch)
+            self._conn.commit()
+        return len(batch)
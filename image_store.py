@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片存储模块
+
+以内容哈希命名保存捕获的图片，相同内容的图片只保存一份。
+用SQLite索引记录每张图片的大小、引用数和导出状态，不需要扫描目录：
+- 被列表中的记录引用的图片始终保留
+- 没有引用且未导出的图片（重复数据、已删除的记录）立即删除
+- 已导出且不再引用的图片保留作历史，总大小超过上限时按最近使用时间淘汰
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Iterable, Optional
+
+# 图片目录总大小上限默认值(MB)
+DEFAULT_IMAGE_STORE_MAX_MB = 2048
+
+# 索引数据库文件名（保存在图片目录中）
+INDEX_FILE_NAME = "index.db"
+
+
+class ImageStore:
+    """内容寻址的图片存储
+
+    图片保存为 <根目录>/<哈希前两位>/<哈希>.<扩展名>，所有方法都可以在任意线程调用。
+    """
+
+    def __init__(self, root_dir: str, max_size_mb: float = DEFAULT_IMAGE_STORE_MAX_MB):
+        """打开（必要时创建）图片存储
+
+        引用数在每次打开时清零，需要由调用方为仍在使用的图片重新调用acquire。
+
+        Args:
+            root_dir: 图片根目录
+            max_size_mb: 图片总大小上限(MB)，只淘汰已导出且没有引用的图片，小于等于0表示不限制
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb > 0 else 0
+        os.makedirs(self.root_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.root_dir, INDEX_FILE_NAME), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " hash TEXT PRIMARY KEY,"
+                " rel_path TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " ref_count INTEGER NOT NULL DEFAULT 0,"
+                " exported INTEGER NOT NULL DEFAULT 0,"
+                " last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_images_evict ON images (exported, ref_count, last_used)")
+            self._conn.execute("UPDATE images SET ref_count = 0")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭索引数据库"""
+        with self._lock:
+            self._conn.close()
+
+    def is_managed(self, path: Optional[str]) -> bool:
+        """图片是否保存在本存储中"""
+        if not path:
+            return False
+        return os.path.normcase(os.path.abspath(path)).startswith(os.path.normcase(self.root_dir + os.sep))
+
+    def put(self, data: bytes, ext: str = ".jpg") -> str:
+        """保存图片数据，内容相同的图片返回已有的文件
+
+        Args:
+            data: 编码后的图片数据
+            ext: 文件扩展名
+
+        Returns:
+            str: 图片文件路径
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        rel_path = os.path.join(digest[:2], digest + ext.lower())
+        path = os.path.join(self.root_dir, rel_path)
+
+        with self._lock:
+            row = self._conn.execute("SELECT rel_path FROM images WHERE hash = ?", (digest,)).fetchone()
+            if row is not None and os.path.exists(os.path.join(self.root_dir, row[0])):
+                self._conn.execute("UPDATE images SET last_used = ? WHERE hash = ?", (time.time(), digest))
+                self._conn.commit()
+                return os.path.join(self.root_dir, row[0])
+
+        # 先写临时文件再改名，中途退出不会留下不完整的图片
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images (hash, rel_path, size, ref_count, exported, last_used) "
+                "VALUES (?, ?, ?, COALESCE((SELECT ref_count FROM images WHERE hash = ?), 0), 0, ?)",
+                (digest, rel_path, len(data), digest, time.time())
+            )
+            self._conn.commit()
+        return path
+
+    def acquire(self, path: Optional[str]) -> None:
+        """登记一条记录引用了该图片"""
+        self._update_refs([path], 1)
+
+    def acquire_many(self, paths: Iterable[Optional[str]]) -> None:
+        """登记对一组图片的引用（如正在导出的记录），用release释放"""
+        self._update_refs(paths, 1)
+
+    def release(self, paths: Iterable[Optional[str]]) -> None:
+        """登记记录不再引用这些图片，没有引用且未导出的图片立即删除"""
+        self._update_refs(paths, -1)
+        self._delete_where("ref_count <= 0 AND exported = 0", self._hashes(paths))
+
+    def discard(self, path: Optional[str]) -> None:
+        """丢弃没有被任何记录使用的图片（如重复数据的图片）"""
+        self._delete_where("ref_count <= 0 AND exported = 0", self._hashes([path]))
+
+    def mark_exported(self, paths: Iterable[Optional[str]]) -> None:
+        """登记图片已导出，不再引用后可以被淘汰"""
+        hashes = self._hashes(paths)
+        if not hashes:
+            return
+        with self._lock:
+            self._conn.executemany("UPDATE images SET exported = 1, last_used = ? WHERE hash = ?",
+                                   [(time.time(), digest) for digest in hashes])
+            self._conn.commit()
+        self.evict()
+
+    def sweep(self) -> None:
+        """删除所有没有引用且未导出的图片，并按大小上限淘汰已导出的图片"""
+        self._delete_where("ref_count <= 0 AND exported = 0")
+        self.evict()
+
+    def total_size(self) -> int:
+        """所有图片的总大小(字节)"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM images").fetchone()[0]
+
+    def evict(self) -> int:
+        """总大小超过上限时，按最近使用时间淘汰已导出且没有引用的图片
+
+        Returns:
+            int: 淘汰的图片数
+        """
+        if not self.max_size_bytes:
+            return 0
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM images").fetchone()[0]
+            if total <= self.max_size_bytes:
+                return 0
+            victims = []
+            for digest, rel_path, size in self._conn.execute(
+                    "SELECT hash, rel_path, size FROM images WHERE exported = 1 AND ref_count <= 0 "
+                    "ORDER BY last_used"):
+                if total <= self.max_size_bytes:
+                    break
+                victims.append((digest, rel_path))
+                total -= size
+            self._remove_files(victims)
+        if victims:
+            print(f"🧹 图片目录超过上限，已淘汰 {len(victims)} 张已导出的图片")
+        return len(victims)
+
+    def _hashes(self, paths: Iterable[Optional[str]]) -> list:
+        """从本存储中的图片路径得到内容哈希"""
+        return [os.path.splitext(os.path.basename(path))[0] for path in paths if self.is_managed(path)]
+
+    def _update_refs(self, paths: Iterable[Optional[str]], delta: int) -> None:
+        hashes = self._hashes(paths)
+        if not hashes:
+            return
+        with self._lock:
+            self._conn.executemany("UPDATE images SET ref_count = MAX(ref_count + ?, 0) WHERE hash = ?",
+                                   [(delta, digest) for digest in hashes])
+            self._conn.commit()
+
+    def _delete_where(self, condition: str, hashes: Optional[list] = None) -> None:
+        if hashes is not None and not hashes:
+            return
+        with self._lock:
+            if hashes is None:
+                rows = self._conn.execute(f"SELECT hash, rel_path FROM images WHERE {condition}").fetchall()
+            else:
+                rows = []
+                for digest in set(hashes):
+                    rows.extend(self._conn.execute(
+                        f"SELECT hash, rel_path FROM images WHERE hash = ? AND {condition}", (digest,)
+                    ).fetchall())
+            self._remove_files(rows)
+
+    def _remove_files(self, rows: list) -> None:
+        """删除图片文件和索引（调用方持有锁）"""
+        if not rows:
+            return
+        for digest, rel_path in rows:
+            try:
+                os.unlink(os.path.join(self.root_dir, rel_path))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ 删除图片失败: {rel_path}: {e}")
+        self._conn.executemany("DELETE FROM images WHERE hash = ?", [(digest,) for digest, _ in rows])
+        self._conn.commit()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入模块
+
+cv2、openpyxl、PIL等依赖导入耗时较长，模块级直接导入会推迟窗口的显示。
+LazyModule在第一次访问属性时才真正导入模块：
+- 可以在后台线程调用preload提前导入，界面线程第一次使用时不再等待
+- 多个线程同时触发导入时只导入一次
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """第一次访问属性时才导入的模块代理"""
+
+    def __init__(self, name: str):
+        """创建代理，不导入模块
+
+        Args:
+            name: 模块全名，如"cv2"、"PIL.Image"
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def preload(self):
+        """导入模块（可在后台线程调用）
+
+        Returns:
+            导入的模块
+
+        Raises:
+            ImportError: 模块无法导入
+        """
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        """模块是否已经导入"""
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self.preload(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self.preload(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "已导入" if self.loaded else "未导入"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能统计模块
+
+按阶段记录耗时（RFID读取、OCR识别、拍照、列表更新、导出等），
+每个阶段保存总次数、总耗时、最大值和最近DEFAULT_HISTOGRAM_WINDOW次的样本，
+用于计算p50/p95/p99，可以导出为CSV或JSON。
+另有计数（读到的标签数、超时次数等，同时统计最近一小时的增量）
+和数值分布（每个标签号的OCR尝试次数等），由metrics_server对外提供。
+所有方法都可以在任意线程调用。
+"""
+import csv
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# 每个阶段保留的最近样本数（分位数按这些样本计算）
+DEFAULT_HISTOGRAM_WINDOW = 2048
+
+# 统计的分位数
+PERCENTILES = (50, 95, 99)
+
+# 计数器统计最近增量的时长(分钟)
+RATE_WINDOW_MINUTES = 60
+
+# 导出的字段
+EXPORT_FIELDS = ("stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "total_s")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """按最近秩法计算分位数
+
+    Args:
+        sorted_values: 已排序的样本
+        pct: 分位（0-100）
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class Histogram:
+    """一个阶段的耗时统计（秒）"""
+
+    def __init__(self, window: int = DEFAULT_HISTOGRAM_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """记录一次耗时"""
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> dict:
+        """当前统计值
+
+        Returns:
+            dict: count、total、mean、max以及各分位数(p50等)，时间单位为秒
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total, maximum = self.count, self.total, self.max
+        result = {"count": count, "total": total, "mean": total / count if count else 0.0, "max": maximum}
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = percentile(samples, pct)
+        return result
+
+
+class Counter:
+    """累计计数，同时按分钟分桶记录最近RATE_WINDOW_MINUTES分钟的增量"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = deque(maxlen=RATE_WINDOW_MINUTES)  # [分钟序号, 增量]
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """增加计数"""
+        minute = int(time.time() // 60)
+        with self._lock:
+            self.value += amount
+            if self._buckets and self._buckets[-1][0] == minute:
+                self._buckets[-1][1] += amount
+            else:
+                self._buckets.append([minute, amount])
+
+    def recent(self) -> int:
+        """最近RATE_WINDOW_MINUTES分钟的增量"""
+        oldest = int(time.time() // 60) - RATE_WINDOW_MINUTES + 1
+        with self._lock:
+            return sum(amount for minute, amount in self._buckets if minute >= oldest)
+
+
+class MetricsRegistry:
+    """各阶段耗时统计、计数和数值分布的集合"""
+
+    def __init__(self, window: int = DEFAULT_HISTOGRAM_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._values: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Counter] = {}
+        self.started_at = time.time()
+
+    def histogram(self, stage: str) -> Histogram:
+        """获取（必要时创建）阶段的统计"""
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram(self.window))
+        return histogram
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """记录一次耗时"""
+        self.histogram(stage).observe(seconds)
+
+    def record(self, name: str, value: float) -> None:
+        """记录一个数值（不是耗时，如OCR尝试次数）"""
+        histogram = self._values.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._values.setdefault(name, Histogram(self.window))
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: int = 1) -> None:
+        """增加计数"""
+        counter = self._counters.get(name)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(name, Counter())
+        counter.inc(amount)
+
+    def timings(self) -> List[Tuple[str, Histogram]]:
+        """所有阶段的耗时统计（秒），按阶段名排序"""
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def values(self) -> List[Tuple[str, Histogram]]:
+        """所有数值分布，按名称排序"""
+        with self._lock:
+            return sorted(self._values.items())
+
+    def counters(self) -> List[Tuple[str, Counter]]:
+        """所有计数，按名称排序"""
+        with self._lock:
+            return sorted(self._counters.items())
+
+    @contextmanager
+    def span(self, stage: str):
+        """统计一段代码的耗时，出现异常时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self._lock:
+            self._histograms = {}
+            self._values = {}
+            self._counters = {}
+            self.started_at = time.time()
+
+    def snapshot(self) -> List[dict]:
+        """所有阶段的统计，按阶段名排序
+
+        Returns:
+            List[dict]: 每项包含EXPORT_FIELDS中的字段，时间单位为毫秒（total_s为秒）
+        """
+        rows = []
+        for stage, histogram in self.timings():
+            stats = histogram.snapshot()
+            rows.append({
+                "stage": stage,
+                "count": stats["count"],
+                "mean_ms": stats["mean"] * 1000,
+                "p50_ms": stats["p50"] * 1000,
+                "p95_ms": stats["p95"] * 1000,
+                "p99_ms": stats["p99"] * 1000,
+                "max_ms": stats["max"] * 1000,
+                "total_s": stats["total"],
+            })
+        return rows
+
+    def export_csv(self, file_path: str) -> None:
+        """导出统计为CSV文件"""
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for row in self.snapshot():
+                writer.writerow({key: round(value, 3) if isinstance(value, float) else value
+                                 for key, value in row.items()})
+
+    def export_json(self, file_path: str) -> None:
+        """导出统计为JSON文件"""
+        data = {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+            "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "window": self.window,
+            "stages": self.snapshot(),
+            "values": {name: histogram.snapshot() for name, histogram in self.values()},
+            "counters": {name: counter.value for name, counter in self.counters()},
+        }
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# 全局统计实例
+metrics = MetricsRegistry()
+
+
+def span(stage: str):
+    """统计一段代码的耗时（使用全局统计实例）"""
+    return metrics.span(stage)
+
+
+def observe(stage: str, seconds: float) -> None:
+    """记录一次耗时（使用全局统计实例）"""
+    metrics.observe(stage, seconds)
+
+
+def record(name: str, value: float) -> None:
+    """记录一个数值（使用全局统计实例）"""
+    metrics.record(name, value)
+
+
+def inc(name: str, amount: int = 1) -> None:
+    """增加计数（使用全局统计实例）"""
+    metrics.inc(name, amount)
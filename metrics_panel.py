@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能统计面板
+
+在独立窗口中按阶段显示耗时统计（次数、平均、p50/p95/p99、最大），定时刷新，
+可以导出为CSV或JSON、清零重新统计。
+"""
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+
+from metrics import MetricsRegistry, metrics
+
+# 默认刷新间隔(毫秒)
+DEFAULT_PANEL_REFRESH_MS = 1000
+
+# 阶段名 -> 显示名称（未列出的阶段直接显示阶段名）
+STAGE_LABELS = {
+    "auto.cycle": "自动获取一轮",
+    "rfid.get_tid": "RFID读取TID",
+    "ocr.recognize": "OCR单次识别",
+    "ocr.get_label": "OCR获取标签号",
+    "camera.snapshot": "拍照保存",
+    "list.add": "添加到列表",
+    "list.view_update": "列表界面更新",
+    "export.total": "导出总耗时",
+    "export.open": "导出-打开工作簿",
+    "export.thumbnails": "导出-准备缩略图",
+    "export.save": "导出-保存文件",
+    "export.index": "导出-更新分卷索引",
+}
+
+
+class MetricsPanel:
+    """性能统计窗口（只能在Tk线程使用）"""
+
+    COLUMNS = ("阶段", "次数", "平均(ms)", "p50(ms)", "p95(ms)", "p99(ms)", "最大(ms)")
+
+    def __init__(self, root, registry: MetricsRegistry = metrics, refresh_ms: int = DEFAULT_PANEL_REFRESH_MS):
+        """初始化面板，调用show时才创建窗口
+
+        Args:
+            root: Tk根窗口
+            registry: 显示的统计
+            refresh_ms: 刷新间隔(毫秒)
+        """
+        self.root = root
+        self.registry = registry
+        self.refresh_ms = refresh_ms
+        self.window = None
+        self.tree = None
+        self._after_id = None
+
+    def show(self) -> None:
+        """显示窗口，已打开时移到最前"""
+        if self.window is not None and self.window.winfo_exists():
+            self.window.deiconify()
+            self.window.lift()
+            return
+
+        self.window = tk.Toplevel(self.root)
+        self.window.title("性能统计")
+        self.window.geometry("720x360")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.tree = ttk.Treeview(self.window, columns=self.COLUMNS, show="headings")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=160 if column == "阶段" else 80, anchor=tk.W if column == "阶段" else tk.E)
+        scrollbar = ttk.Scrollbar(self.window, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0), pady=(10, 0))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S), padx=(0, 10), pady=(10, 0))
+
+        button_frame = ttk.Frame(self.window, padding="10")
+        button_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        ttk.Button(button_frame, text="导出CSV", command=lambda: self.export("csv")).grid(row=0, column=0, padx=(0, 5))
+        ttk.Button(button_frame, text="导出JSON", command=lambda: self.export("json")).grid(row=0, column=1, padx=(5, 5))
+        ttk.Button(button_frame, text="清零", command=self.reset).grid(row=0, column=2, padx=(5, 0))
+        self.summary_label = ttk.Label(button_frame, text="", foreground="gray")
+        self.summary_label.grid(row=0, column=3, padx=(10, 0), sticky=tk.W)
+
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(0, weight=1)
+        self.refresh()
+
+    def close(self) -> None:
+        """关闭窗口并停止刷新"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def refresh(self) -> None:
+        """刷新统计显示"""
+        self._after_id = None
+        if self.window is None or not self.window.winfo_exists():
+            return
+        rows = self.registry.snapshot()
+        existing = set(self.tree.get_children())
+        for row in rows:
+            values = (
+                STAGE_LABELS.get(row["stage"], row["stage"]),
+                row["count"],
+                f"{row['mean_ms']:.1f}",
+                f"{row['p50_ms']:.1f}",
+                f"{row['p95_ms']:.1f}",
+                f"{row['p99_ms']:.1f}",
+                f"{row['max_ms']:.1f}",
+            )
+            if row["stage"] in existing:
+                self.tree.item(row["stage"], values=values)
+                existing.discard(row["stage"])
+            else:
+                self.tree.insert("", tk.END, iid=row["stage"], values=values)
+        for iid in existing:
+            self.tree.delete(iid)
+        self.summary_label.config(text=f"共 {len(rows)} 个阶段，每 {self.refresh_ms / 1000:g} 秒刷新")
+        self._after_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def reset(self) -> None:
+        """清空统计"""
+        if messagebox.askyesno("确认", "确定要清空所有性能统计吗？", parent=self.window):
+            self.registry.reset()
+            self.tree.delete(*self.tree.get_children())
+
+    def export(self, file_format: str) -> None:
+        """导出统计
+
+        Args:
+            file_format: "csv"或"json"
+        """
+        file_path = filedialog.asksaveasfilename(
+            parent=self.window,
+            title="导出性能统计",
+            defaultextension=f".{file_format}",
+            filetypes=[(f"{file_format.upper()}文件", f"*.{file_format}"), ("所有文件", "*.*")],
+            initialfile=f"metrics.{file_format}"
+        )
+        if not file_path:
+            return
+        try:
+            if file_format == "csv":
+                self.registry.export_csv(file_path)
+            else:
+                self.registry.export_json(file_path)
+            messagebox.showinfo("导出成功", f"性能统计已导出到:\n{file_path}", parent=self.window)
+        except OSError as e:
+            messagebox.showerror("导出失败", f"导出性能统计失败: {e}", parent=self.window)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能统计HTTP接口
+
+以Prometheus文本格式(0.0.4)在 http://<metrics_host>:<metrics_port>/metrics 提供metrics中的统计：
+- 各阶段耗时为summary（带quantile标签的p50/p95/p99，以及_sum、_count）
+- 数值分布（如每个标签号的OCR尝试次数）为summary
+- 计数为counter（名称以_total结尾），另提供最近一小时添加的数据条数
+只使用标准库，请求在独立线程中处理，不影响界面和采集。
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from metrics import MetricsRegistry, metrics, PERCENTILES
+
+# 默认监听地址（只允许本机访问，需要从其他机器采集时设为0.0.0.0）
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# 指标名前缀
+METRIC_PREFIX = "tidtoexcel"
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 各计数的说明（未列出的计数使用计数名）
+COUNTER_HELP = {
+    "rfid.frames_parsed": "解析的RFID数据帧数",
+    "rfid.tags_read": "读到的TID数",
+    "rfid.checksum_failures": "校验和错误的RFID数据帧数",
+    "rfid.epc_frames": "TID模式下收到EPC帧的次数",
+    "rfid.resets": "执行RFID重置（停止存盘->读TID）的次数",
+    "rfid.timeouts": "RFID通信超时次数",
+    "ocr.labels": "OCR识别出的标签号数",
+    "ocr.label_failures": "OCR未能识别出标签号的次数",
+    "records.added": "添加到列表的数据条数",
+}
+
+# 各数值分布的说明
+VALUE_HELP = {
+    "ocr.attempts_per_label": "每个标签号的OCR尝试次数",
+}
+
+
+def metric_name(name: str) -> str:
+    """把统计名（如rfid.tags_read）转换为Prometheus指标名"""
+    return f"{METRIC_PREFIX}_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _summary_lines(name: str, stats: dict, labels: str = "") -> list:
+    """一个summary的样本行
+
+    Args:
+        name: 指标名
+        stats: Histogram.snapshot()的结果
+        labels: 附加的标签（如 stage="ocr.recognize"），不含大括号
+    """
+    prefix = labels + "," if labels else ""
+    lines = [f'{name}{{{prefix}quantile="{pct / 100:g}"}} {_format_value(stats[f"p{pct}"])}'
+             for pct in PERCENTILES]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {_format_value(stats['total'])}")
+    lines.append(f"{name}_count{suffix} {stats['count']}")
+    return lines
+
+
+def render_metrics(registry: MetricsRegistry = metrics) -> str:
+    """生成Prometheus文本格式的统计
+
+    Returns:
+        str: 以换行结尾的文本
+    """
+    lines = []
+
+    timings = registry.timings()
+    if timings:
+        name = metric_name("stage_duration_seconds")
+        lines += [f"# HELP {name} 各阶段耗时(秒)", f"# TYPE {name} summary"]
+        for stage, histogram in timings:
+            lines += _summary_lines(name, histogram.snapshot(), f'stage="{_escape_label(stage)}"')
+
+    for value_name, histogram in registry.values():
+        name = metric_name(value_name)
+        lines += [f"# HELP {name} {VALUE_HELP.get(value_name, value_name)}", f"# TYPE {name} summary"]
+        lines += _summary_lines(name, histogram.snapshot())
+
+    items_last_hour = 0
+    for counter_name, counter in registry.counters():
+        name = metric_name(counter_name) + "_total"
+        lines += [f"# HELP {name} {COUNTER_HELP.get(counter_name, counter_name)}", f"# TYPE {name} counter",
+                  f"{name} {counter.value}"]
+        if counter_name == "records.added":
+            items_last_hour = counter.recent()
+
+    name = metric_name("items_per_hour")
+    lines += [f"# HELP {name} 最近一小时添加到列表的数据条数", f"# TYPE {name} gauge", f"{name} {items_last_hour}"]
+
+    name = metric_name("metrics_start_time_seconds")
+    lines += [f"# HELP {name} 开始统计的时间（Unix时间戳，清零后重新计算）", f"# TYPE {name} gauge",
+              f"{name} {_format_value(registry.started_at)}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = metrics
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = render_metrics(self.registry).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+        elif path == "/":
+            body = b'<html><body><a href="/metrics">metrics</a></body></html>'
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        else:
+            body = b"not found\n"
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 采集请求很频繁，不输出访问日志
+        pass
+
+
+class MetricsServer:
+    """在后台线程中运行的统计HTTP服务，所有方法都可以在任意线程调用"""
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self) -> Optional[Tuple[str, int]]:
+        """当前监听的地址，未运行时为None"""
+        server = self._server
+        return server.server_address[:2] if server is not None else None
+
+    def start(self, port: int, host: str = DEFAULT_METRICS_HOST) -> bool:
+        """启动服务，已在运行时先停止
+
+        Args:
+            port: 监听端口，0表示不启动
+            host: 监听地址
+
+        Returns:
+            bool: 是否已启动
+        """
+        with self._lock:
+            self._stop()
+            if not port:
+                return False
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+            try:
+                server = ThreadingHTTPServer((host, port), handler)
+            except OSError as e:
+                print(f"❌ 性能统计接口启动失败 ({host}:{port}): {e}")
+                return False
+            server.daemon_threads = True
+            self._server = server
+            self._thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+            self._thread.start()
+        print(f"📈 性能统计接口已启动: http://{host}:{port}/metrics")
+        return True
+
+    def stop(self) -> None:
+        """停止服务"""
+        with self._lock:
+            self._stop()
+
+    def _stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+        print("📈 性能统计接口已停止")
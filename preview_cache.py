@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片预览缓存模块
+
+按(图片路径, 修改时间)缓存缩放好的预览图，最近使用的保留在内存中：
+- 捕获阶段在工作线程中调用prepare生成缩略图（PIL图像，可以在任意线程创建）
+- 界面线程调用get_photo时只需把缩略图转换为PhotoImage，并缓存转换结果
+缓存命中时预览不需要读取磁盘和缩放图片。
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from lazy_import import LazyModule
+
+# 第一次生成预览图时才导入
+Image = LazyModule("PIL.Image")
+ImageTk = LazyModule("PIL.ImageTk")
+
+# 预览图最大尺寸(像素)
+PREVIEW_MAX_SIZE = 300
+
+# 默认缓存的预览图数量
+DEFAULT_PREVIEW_CACHE_SIZE = 32
+
+
+class PreviewCache:
+    """预览图LRU缓存
+
+    prepare可以在任意线程调用；get_photo会创建PhotoImage，只能在Tk线程调用。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_PREVIEW_CACHE_SIZE, max_size: int = PREVIEW_MAX_SIZE):
+        """初始化缓存
+
+        Args:
+            max_entries: 最多缓存的预览图数量
+            max_size: 预览图最大边长(像素)
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (路径, 修改时间) -> [缩略图, PhotoImage或None]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(image_path: str) -> Optional[tuple]:
+        try:
+            return (os.path.abspath(image_path), os.stat(image_path).st_mtime_ns)
+        except OSError:
+            return None
+
+    def _make_thumbnail(self, image: 'Image.Image') -> 'Image.Image':
+        thumbnail = image.copy()
+        thumbnail.thumbnail((self.max_size, self.max_size), Image.Resampling.LANCZOS)
+        if thumbnail.mode not in ("RGB", "RGBA"):
+            thumbnail = thumbnail.convert("RGB")
+        return thumbnail
+
+    def prepare(self, image_path: str, image: Optional['Image.Image'] = None) -> None:
+        """生成并缓存预览缩略图（可在工作线程调用）
+
+        Args:
+            image_path: 图片文件路径（已保存）
+            image: 已在内存中的图片，提供时不读取文件
+        """
+        key = self._key(image_path)
+        if key is None:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+        try:
+            if image is None:
+                with Image.open(image_path) as img:
+                    thumbnail = self._make_thumbnail(img)
+            else:
+                thumbnail = self._make_thumbnail(image)
+        except Exception as e:
+            print(f"⚠️ 生成预览图失败: {e}")
+            return
+        self._store(key, thumbnail)
+
+    def get_photo(self, image_path: str) -> 'ImageTk.PhotoImage':
+        """获取可直接显示的预览图（只能在Tk线程调用）
+
+        未缓存时从文件生成。
+
+        Raises:
+            OSError: 图片文件不存在或无法读取
+        """
+        key = self._key(image_path)
+        if key is None:
+            raise FileNotFoundError(image_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            with Image.open(image_path) as img:
+                entry = self._store(key, self._make_thumbnail(img))
+
+        if entry[1] is None:
+            entry[1] = ImageTk.PhotoImage(entry[0])
+        return entry[1]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: tuple, thumbnail: 'Image.Image') -> list:
+        entry = [thumbnail, None]
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+摄像头预览渲染模块
+
+摄像头线程只发布最新一帧缩放好的RGB数据（覆盖未显示的旧帧），
+Tk线程按显示帧率轮询，有新帧时粘贴到同一个PhotoImage上：
+- PhotoImage只在Tk线程创建和更新
+- 界面繁忙时中间帧被直接丢弃，事件队列不会堆积
+
+自适应模式下，OCR或自动获取运行期间根据各阶段实测的CPU时间降低预览帧率、
+使用更快的缩放插值，空闲时恢复。
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from lazy_import import LazyModule
+
+# 第一次显示画面时才导入
+Image = LazyModule("PIL.Image")
+ImageTk = LazyModule("PIL.ImageTk")
+
+# 预览画面尺寸(像素)
+PREVIEW_SIZE = (400, 300)
+
+# 默认刷新间隔(毫秒)
+DEFAULT_PREVIEW_INTERVAL_MS = 30
+
+# 自适应预览配置
+BUSY_MIN_FRAME_DELAY = 0.1      # 繁忙时的最小帧间隔(秒, 约10fps)
+MAX_FRAME_DELAY = 0.5           # 最大帧间隔(秒, 约2fps)
+BUSY_PREVIEW_CPU_SHARE = 0.1    # 繁忙时预览最多占用的CPU比例(单核)
+REFERENCE_OCR_CPU_TIME = 0.15   # 参考的单次OCR CPU时间(秒)，OCR越慢预览让出越多
+CPU_TIME_SMOOTHING = 0.2        # CPU时间指数平均的权重
+
+
+class LatestFrame:
+    """只保存最新一帧的线程安全槽位"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+
+    def publish(self, frame) -> None:
+        """发布新的一帧，未取走的旧帧被覆盖"""
+        with self._lock:
+            self._frame = frame
+            self._seq += 1
+
+    def take_if_newer(self, last_seq: int) -> Tuple[int, Optional[object]]:
+        """取出比last_seq新的帧
+
+        Returns:
+            (序号, 帧)，没有新帧时帧为None
+        """
+        with self._lock:
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._frame
+
+    @property
+    def published_count(self) -> int:
+        """已发布的帧数"""
+        return self._seq
+
+
+class PreviewRenderer:
+    """摄像头预览渲染器
+
+    publish可以在任意线程调用；start、stop只能在Tk线程调用。
+    """
+
+    def __init__(self, root, label, interval_ms: int = DEFAULT_PREVIEW_INTERVAL_MS):
+        """初始化渲染器
+
+        Args:
+            root: Tk根窗口
+            label: 显示预览的标签控件
+            interval_ms: 刷新间隔(毫秒)
+        """
+        self.root = root
+        self.label = label
+        self.interval_ms = interval_ms
+        self.rendered_count = 0
+        self._frames = LatestFrame()
+        self._last_seq = 0
+        self._photo = None
+        self._after_id = None
+
+    def publish(self, rgb_frame) -> None:
+        """发布一帧缩放好的RGB数据（numpy数组，高x宽x3）"""
+        self._frames.publish(rgb_frame)
+
+    @property
+    def dropped_count(self) -> int:
+        """未显示就被覆盖的帧数"""
+        return max(self._frames.published_count - self.rendered_count, 0)
+
+    def start(self) -> None:
+        """开始轮询刷新"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._render)
+
+    def stop(self, text: str = "") -> None:
+        """停止刷新并清空画面"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.label.config(image="", text=text)
+        self._photo = None
+
+    def _render(self) -> None:
+        self._after_id = None
+        self._last_seq, frame = self._frames.take_if_newer(self._last_seq)
+        if frame is not None:
+            image = Image.fromarray(frame)
+            if self._photo is None or (self._photo.width(), self._photo.height()) != image.size:
+                self._photo = ImageTk.PhotoImage(image)
+                self.label.config(image=self._photo, text="")
+            else:
+                self._photo.paste(image)
+            self.rendered_count += 1
+        self._after_id = self.root.after(self.interval_ms, self._render)
+
+
+class PreviewLoadController:
+    """根据后台任务和实测CPU时间调整预览帧率和缩放质量
+
+    各线程用busy()标记OCR、自动获取等耗CPU任务的运行期间，
+    用record()上报各阶段每次执行的CPU时间（time.thread_time之差）。
+    """
+
+    def __init__(self, base_delay: float, adaptive: bool = True):
+        """初始化控制器
+
+        Args:
+            base_delay: 空闲时的帧间隔(秒)
+            adaptive: 是否启用自适应，关闭时始终使用空闲设置
+        """
+        self.base_delay = base_delay
+        self.adaptive = adaptive
+        self._lock = threading.Lock()
+        self._busy_count = 0
+        self._cpu_times = {}  # 阶段 -> CPU时间指数平均(秒)
+
+    @contextmanager
+    def busy(self):
+        """标记一段耗CPU任务的运行期间，可嵌套"""
+        with self._lock:
+            self._busy_count += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy_count -= 1
+
+    def is_busy(self) -> bool:
+        """是否有耗CPU任务在运行"""
+        return self.adaptive and self._busy_count > 0
+
+    def record(self, stage: str, cpu_time: float) -> None:
+        """上报某阶段一次执行的CPU时间
+
+        Args:
+            stage: 阶段名称，如"preview"、"ocr"
+            cpu_time: CPU时间(秒)
+        """
+        with self._lock:
+            previous = self._cpu_times.get(stage)
+            self._cpu_times[stage] = cpu_time if previous is None else \
+                previous + (cpu_time - previous) * CPU_TIME_SMOOTHING
+
+    def cpu_times(self) -> Dict[str, float]:
+        """各阶段CPU时间的指数平均(秒)"""
+        with self._lock:
+            return dict(self._cpu_times)
+
+    def frame_delay(self) -> float:
+        """当前应使用的帧间隔(秒)
+
+        繁忙时预览的CPU占用限制在BUSY_PREVIEW_CPU_SHARE以内，OCR单次耗时超过参考值时按比例继续降低。
+        """
+        if not self.is_busy():
+            return self.base_delay
+        with self._lock:
+            preview_cpu = self._cpu_times.get("preview", 0.0)
+            ocr_cpu = self._cpu_times.get("ocr", 0.0)
+        share = BUSY_PREVIEW_CPU_SHARE
+        if ocr_cpu > REFERENCE_OCR_CPU_TIME:
+            share *= REFERENCE_OCR_CPU_TIME / ocr_cpu
+        delay = max(BUSY_MIN_FRAME_DELAY, preview_cpu / share if share > 0 else MAX_FRAME_DELAY)
+        return min(max(delay, self.base_delay), MAX_FRAME_DELAY)
+
+    def use_fast_interpolation(self) -> bool:
+        """是否使用更快（质量较低）的缩放插值"""
+        return self.is_busy()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据记录日志模块
+
+把采集到的数据记录写入本地SQLite（WAL模式）：
+- 程序崩溃、断电或直接关闭窗口后，下次启动时恢复列表中的数据
+- 按会话保存记录，导出并移出列表的记录保留在数据库中，可以查询历史会话
+- 登记每次导出任务，导出中途退出后可以重新导出
+- 导出开始时在数据库中保存要导出的记录的快照，导出任务按批读取快照，不需要在内存中复制整批数据，
+  导出期间编辑或删除列表中的数据不影响导出内容
+
+界面线程只把写操作放入队列，由后台线程批量提交，每条记录的写入开销可以忽略。
+每个操作在单独的保存点中执行，写入失败的操作（及其后的操作）保留下来按顺序重试，并通过回调报告。
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# 记录中需要持久化的字段
+JOURNAL_FIELDS = ('manufacturer', 'tid', 'label', 'image_path', 'timestamp', 'auto_captured')
+
+# 后台线程两次提交之间最多等待的时间(秒)，期间到达的操作合并为一个事务
+DEFAULT_JOURNAL_FLUSH_INTERVAL = 0.2
+
+# 写入失败后重试的间隔(秒)
+DEFAULT_JOURNAL_RETRY_INTERVAL = 2.0
+
+# 导出时每次从数据库读取的记录数
+DEFAULT_SOURCE_CHUNK_SIZE = 500
+
+# 历史查询最多返回的记录数
+DEFAULT_QUERY_LIMIT = 1000
+
+# 导出任务状态（与ExcelExportJob一致）
+EXPORT_RUNNING = "running"
+EXPORT_DONE = "done"
+EXPORT_CANCELLED = "cancelled"
+EXPORT_FAILED = "failed"
+
+# 在旧版本日志上补充的列
+_EXTRA_RECORD_COLUMNS = {
+    'session_id': "INTEGER",
+    'in_list': "INTEGER NOT NULL DEFAULT 1",
+    'export_id': "INTEGER",
+    'exported_at': "TEXT",
+    'export_file': "TEXT",
+}
+
+# 不属于正在进行的导出的记录
+_NOT_EXPORTING = (
+    "exported_at IS NULL AND (export_id IS NULL OR export_id NOT IN "
+    f"(SELECT export_id FROM exports WHERE status = '{EXPORT_RUNNING}'))"
+)
+
+_STOP = object()
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _row_to_record(columns, row) -> dict:
+    record = dict(zip(columns, row))
+    record['auto_captured'] = bool(record['auto_captured'])
+    return record
+
+
+def _connect(db_file: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_file, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class JournalRecordSource:
+    """按批从日志数据库读取一次导出的记录快照，供导出任务使用
+
+    在导出线程中使用独立的只读连接；快照在导出开始时保存，导出期间列表中的编辑和删除不影响读取结果。
+    """
+
+    def __init__(self, db_file: str, export_id: int, count: int, chunk_size: int = DEFAULT_SOURCE_CHUNK_SIZE):
+        """初始化记录源
+
+        Args:
+            db_file: 日志数据库文件路径
+            export_id: 导出任务ID
+            count: 快照中的记录数
+            chunk_size: 每批读取的记录数
+        """
+        self.db_file = db_file
+        self.export_id = export_id
+        self.count = count
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_chunks(self, chunk_size: Optional[int] = None) -> Iterator[List[dict]]:
+        """按批返回记录
+
+        Args:
+            chunk_size: 每批记录数，默认使用初始化时的值
+        """
+        chunk_size = chunk_size or self.chunk_size
+        columns = ('journal_id',) + JOURNAL_FIELDS
+        conn = sqlite3.connect(self.db_file)
+        try:
+            position = -1
+            while True:
+                rows = conn.execute(
+                    f"SELECT position, {', '.join(columns)} FROM export_rows "
+                    f"WHERE export_id = ? AND position > ? ORDER BY position LIMIT ?",
+                    (self.export_id, position, chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+                position = rows[-1][0]
+                yield [_row_to_record(columns, row[1:]) for row in rows]
+        finally:
+            conn.close()
+
+
+class RecordJournal:
+    """数据记录日志和会话存储
+
+    每条记录用'journal_id'标识（添加时分配，跨会话不变）。
+    列表中的记录in_list为1；导出过的记录移出列表后保留，未导出的记录删除后即从日志中移除。
+    写操作按提交顺序由后台线程执行，读操作使用独立连接。
+    """
+
+    def __init__(self, db_file: str, flush_interval: float = DEFAULT_JOURNAL_FLUSH_INTERVAL,
+                 on_error: Optional[Callable[[str], None]] = None,
+                 retry_interval: float = DEFAULT_JOURNAL_RETRY_INTERVAL):
+        """打开（必要时创建）日志数据库，开始新会话并启动后台写入线程
+
+        Args:
+            db_file: SQLite数据库文件路径
+            flush_interval: 批量提交的最长等待时间(秒)
+            on_error: 每次写入失败时在后台写入线程中调用，参数为错误说明
+            retry_interval: 写入失败后重试的间隔(秒)
+        """
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.retry_interval = retry_interval
+        db_dir = os.path.dirname(db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._conn = _connect(db_file)
+        self._create_schema()
+
+        # 读操作使用独立连接，不与后台线程的写事务交错
+        self._read_conn = _connect(db_file)
+        self._read_lock = threading.Lock()
+
+        self._key_lock = threading.Lock()
+        self._next_key = self._max_id("records", "journal_id") + 1
+        self._next_export_id = self._max_id("exports", "export_id") + 1
+        self.session_id = self._max_id("sessions", "session_id") + 1
+        self._conn.execute("INSERT INTO sessions (session_id, started_at) VALUES (?, ?)", (self.session_id, _now()))
+        self._conn.commit()
+
+        self._queue = queue.Queue()
+        self._pending = []  # 写入失败、等待重试的操作（按提交顺序）
+        self._thread = threading.Thread(target=self._writer_loop, name="RecordJournalWriter", daemon=True)
+        self._thread.start()
+
+    def _create_schema(self) -> None:
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " journal_id INTEGER PRIMARY KEY,"
+            " manufacturer TEXT,"
+            " tid TEXT,"
+            " label TEXT,"
+            " image_path TEXT,"
+            " timestamp TEXT,"
+            " auto_captured INTEGER)"
+        )
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(records)")}
+        for column, column_type in _EXTRA_RECORD_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE records ADD COLUMN {column} {column_type}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_session ON records (session_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_export ON records (export_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id INTEGER PRIMARY KEY,"
+            " started_at TEXT,"
+            " ended_at TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS exports ("
+            " export_id INTEGER PRIMARY KEY,"
+            " excel_file TEXT,"
+            " mode TEXT,"
+            " status TEXT,"
+            " record_count INTEGER,"
+            " output_file TEXT,"
+            " started_at TEXT,"
+            " finished_at TEXT)"
+        )
+        # 正在进行的导出的记录快照，导出结束后删除
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS export_rows ("
+            " export_id INTEGER,"
+            " position INTEGER,"
+            " journal_id INTEGER,"
+            " manufacturer TEXT,"
+            " tid TEXT,"
+            " label TEXT,"
+            " image_path TEXT,"
+            " timestamp TEXT,"
+            " auto_captured INTEGER,"
+            " PRIMARY KEY (export_id, position))"
+        )
+        self._conn.commit()
+
+    def _max_id(self, table: str, column: str) -> int:
+        return self._conn.execute(f"SELECT MAX({column}) FROM {table}").fetchone()[0] or 0
+
+    def _read(self, sql: str, params=()) -> list:
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    # ---------- 恢复和查询 ----------
+
+    def load(self) -> List[dict]:
+        """读取仍在列表中的全部记录（按添加顺序），用于启动时恢复
+
+        应在开始写入之前调用。
+        """
+        columns = ('journal_id', 'session_id') + JOURNAL_FIELDS
+        rows = self._read(
+            f"SELECT {', '.join(columns)} FROM records WHERE in_list = 1 ORDER BY journal_id"
+        )
+        return [_row_to_record(columns, row) for row in rows]
+
+    def pending_export(self) -> Optional[dict]:
+        """上次未完成的导出任务
+
+        Returns:
+            dict: 包含export_id、excel_file、mode、started_at和journal_ids（仍在列表中的记录），
+                  没有未完成的导出返回None
+        """
+        rows = self._read(
+            "SELECT export_id, excel_file, mode, started_at FROM exports "
+            "WHERE status = ? ORDER BY export_id DESC LIMIT 1", (EXPORT_RUNNING,)
+        )
+        if not rows:
+            return None
+        export = dict(zip(('export_id', 'excel_file', 'mode', 'started_at'), rows[0]))
+        export['journal_ids'] = [row[0] for row in self._read(
+            "SELECT journal_id FROM records WHERE export_id = ? AND in_list = 1 AND exported_at IS NULL "
+            "ORDER BY journal_id", (export['export_id'],)
+        )]
+        return export
+
+    def list_sessions(self) -> List[dict]:
+        """所有会话及其记录数、已导出数（最近的在前）"""
+        rows = self._read(
+            "SELECT s.session_id, s.started_at, s.ended_at, COUNT(r.journal_id), COUNT(r.exported_at) "
+            "FROM sessions s LEFT JOIN records r ON r.session_id = s.session_id "
+            "GROUP BY s.session_id ORDER BY s.session_id DESC"
+        )
+        return [dict(zip(('session_id', 'started_at', 'ended_at', 'record_count', 'exported_count'), row))
+                for row in rows]
+
+    def query_records(self, session_id: Optional[int] = None, keyword: str = "",
+                      limit: int = DEFAULT_QUERY_LIMIT) -> List[dict]:
+        """查询历史记录
+
+        Args:
+            session_id: 只查询该会话，None表示全部会话
+            keyword: 在厂家名称、TID、标签号中模糊匹配
+            limit: 最多返回的记录数
+
+        Returns:
+            list: 记录（最近的在前），包含session_id、exported_at和export_file
+        """
+        columns = ('journal_id', 'session_id') + JOURNAL_FIELDS + ('in_list', 'exported_at', 'export_file')
+        conditions, params = [], []
+        if session_id is not None:
+            conditions.append("session_id = ?")
+            params.append(session_id)
+        if keyword:
+            conditions.append("(manufacturer LIKE ? OR tid LIKE ? OR label LIKE ?)")
+            params.extend([f"%{keyword}%"] * 3)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._read(
+            f"SELECT {', '.join(columns)} FROM records {where} ORDER BY journal_id DESC LIMIT ?",
+            params + [limit]
+        )
+        return [_row_to_record(columns, row) for row in rows]
+
+    def record_source(self, export_id: int, count: int) -> JournalRecordSource:
+        """创建按批读取导出快照的数据源（调用前应先flush，确保快照已写入）
+
+        Args:
+            export_id: 导出任务ID
+            count: 快照中的记录数
+        """
+        return JournalRecordSource(self.db_file, export_id, count)
+
+    # ---------- 写操作（异步） ----------
+
+    def put(self, record: dict) -> None:
+        """写入或更新一条记录，首次写入时为记录分配'journal_id'并归入当前会话"""
+        if 'journal_id' not in record:
+            with self._key_lock:
+                record['journal_id'] = self._next_key
+                self._next_key += 1
+        values = tuple(
+            int(bool(record.get(field))) if field == 'auto_captured' else record.get(field)
+            for field in JOURNAL_FIELDS
+        )
+        self._queue.put(('put', (record['journal_id'], record.get('session_id', self.session_id)) + values))
+
+    def delete(self, journal_ids: Iterable[int]) -> None:
+        """把记录移出列表：已导出的保留为历史，未导出的删除"""
+        ids = [(journal_id,) for journal_id in journal_ids if journal_id is not None]
+        if ids:
+            self._queue.put(('delete', ids))
+
+    def clear(self) -> None:
+        """把所有记录移出列表"""
+        self._queue.put(('clear', None))
+
+    def start_export(self, excel_file: str, mode: str, journal_ids: List[int]) -> int:
+        """登记一次导出任务，并保存这些记录当前内容的快照
+
+        快照在之前提交的写操作之后生成，之后的编辑和删除不影响导出内容。
+
+        Returns:
+            int: 导出任务ID
+        """
+        with self._key_lock:
+            export_id = self._next_export_id
+            self._next_export_id += 1
+        self._queue.put(('export_start', (export_id, excel_file, mode, list(journal_ids))))
+        return export_id
+
+    def restart_export(self, export_id: int, journal_ids: List[int]) -> None:
+        """重新导出未完成的导出任务，按这些记录当前的内容重新保存快照"""
+        self._queue.put(('export_snapshot', (export_id, list(journal_ids))))
+
+    def finish_export(self, export_id: int, status: str, output_file: Optional[str] = None) -> None:
+        """登记导出任务结束，成功时把相关记录标记为已导出"""
+        self._queue.put(('export_finish', (export_id, status, output_file)))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待之前提交的写操作全部写入数据库
+
+        Returns:
+            bool: 是否在超时前完成，且没有写入失败、等待重试的操作
+        """
+        event = threading.Event()
+        self._queue.put(('sync', event))
+        return event.wait(timeout) and not self._pending
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """提交所有未写入的操作，结束当前会话并关闭（关闭前仍写入失败的操作会丢失）"""
+        self._queue.put(('session_end', self.session_id))
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._conn.close()
+            with self._read_lock:
+                self._read_conn.close()
+
+    def _writer_loop(self) -> None:
+        """后台线程：等待操作，把一段时间内到达的操作合并为一个事务提交"""
+        stopping = False
+        while not stopping:
+            try:
+                # 有等待重试的操作时定时重试
+                ops = [self._queue.get(timeout=self.retry_interval if self._pending else None)]
+            except queue.Empty:
+                self._apply([])
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while ops[-1] is not _STOP and ops[-1][0] != 'sync':
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    ops.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+            if ops[-1] is _STOP:
+                ops.pop()
+                stopping = True
+            self._apply(ops)
+        if self._pending:
+            self._report_error(f"关闭时仍有 {len(self._pending)} 项操作未能写入数据日志")
+
+    def _apply(self, ops: list) -> None:
+        """在一个事务中按顺序执行等待重试的操作和新操作
+
+        每个操作使用单独的保存点，失败时只回滚该操作，之前的操作照常提交；
+        失败的操作和之后的操作保留到下次重试，保证执行顺序不变。
+        数据本身有误、重试也不会成功的操作直接放弃。
+        """
+        events = [arg for op, arg in ops if op == 'sync']
+        try:
+            self._apply_ops(self._pending + [(op, arg) for op, arg in ops if op != 'sync'])
+        finally:
+            for event in events:
+                event.set()
+
+    def _apply_ops(self, ops: list) -> None:
+        self._pending = []
+        failed_at, error = None, None
+        try:
+            conn = self._conn
+            conn.execute("BEGIN")
+            for index, (op, arg) in enumerate(ops):
+                conn.execute("SAVEPOINT journal_op")
+                try:
+                    self._apply_one(op, arg)
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO journal_op")
+                    failed_at, error = index, e
+                    break
+                finally:
+                    conn.execute("RELEASE journal_op")
+            conn.commit()
+        except sqlite3.Error as e:
+            # 提交失败时整批回滚，全部重试
+            try:
+                self._conn.rollback()
+            except sqlite3.Error:
+                pass
+            failed_at, error = 0, e
+
+        if failed_at is None:
+            return
+        if isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError)):
+            self._report_error(f"数据日志操作 {ops[failed_at][0]} 无法写入，已放弃: {error}")
+            if failed_at + 1 < len(ops):
+                self._apply_ops(ops[failed_at + 1:])
+        else:
+            self._pending = ops[failed_at:]
+            self._report_error(f"写入数据日志失败，{len(self._pending)} 项操作将在 "
+                               f"{self.retry_interval:g} 秒后重试: {error}")
+
+    def _report_error(self, message: str) -> None:
+        print(f"⚠️ {message}")
+        if self.on_error:
+            try:
+                self.on_error(message)
+            except Exception as e:
+                print(f"⚠️ 数据日志错误回调出错: {e}")
+
+    def _snapshot_export(self, export_id: int, journal_ids: List[int]) -> None:
+        """保存导出记录的快照（按journal_ids的顺序），并把记录关联到导出任务"""
+        conn = self._conn
+        conn.execute("DELETE FROM export_rows WHERE export_id = ?", (export_id,))
+        conn.executemany(
+            f"INSERT INTO export_rows (export_id, position, journal_id, {', '.join(JOURNAL_FIELDS)}) "
+            f"SELECT ?, ?, journal_id, {', '.join(JOURNAL_FIELDS)} FROM records WHERE journal_id = ?",
+            [(export_id, position, journal_id) for position, journal_id in enumerate(journal_ids)]
+        )
+        conn.executemany("UPDATE records SET export_id = ? WHERE journal_id = ?",
+                         [(export_id, journal_id) for journal_id in journal_ids])
+
+    def _apply_one(self, op: str, arg) -> None:
+        conn = self._conn
+        if op == 'put':
+            columns = ('journal_id', 'session_id') + JOURNAL_FIELDS
+            updates = ', '.join(f"{field} = excluded.{field}" for field in JOURNAL_FIELDS)
+            conn.execute(
+                f"INSERT INTO records ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(journal_id) DO UPDATE SET {updates}, in_list = 1", arg
+            )
+        elif op == 'delete':
+            # 正在导出的记录导出成功后要登记为已导出，先只移出列表
+            conn.executemany(f"DELETE FROM records WHERE journal_id = ? AND {_NOT_EXPORTING}", arg)
+            conn.executemany("UPDATE records SET in_list = 0 WHERE journal_id = ?", arg)
+        elif op == 'clear':
+            conn.execute(f"DELETE FROM records WHERE in_list = 1 AND {_NOT_EXPORTING}")
+            conn.execute("UPDATE records SET in_list = 0 WHERE in_list = 1")
+        elif op == 'export_start':
+            export_id, excel_file, mode, journal_ids = arg
+            conn.execute(
+                "INSERT INTO exports (export_id, excel_file, mode, status, record_count, started_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (export_id, excel_file, mode, EXPORT_RUNNING, len(journal_ids), _now())
+            )
+            self._snapshot_export(export_id, journal_ids)
+        elif op == 'export_snapshot':
+            export_id, journal_ids = arg
+            conn.execute("UPDATE exports SET record_count = ? WHERE export_id = ?", (len(journal_ids), export_id))
+            self._snapshot_export(export_id, journal_ids)
+        elif op == 'export_finish':
+            export_id, status, output_file = arg
+            finished_at = _now()
+            conn.execute("UPDATE exports SET status = ?, output_file = ?, finished_at = ? WHERE export_id = ?",
+                         (status, output_file, finished_at, export_id))
+            conn.execute("DELETE FROM export_rows WHERE export_id = ?", (export_id,))
+            if status == EXPORT_DONE:
+                conn.execute("UPDATE records SET exported_at = ?, export_file = ? WHERE export_id = ?",
+                             (finished_at, output_file, export_id))
+            else:
+                # 导出期间移出列表的未导出记录不再需要保留
+                conn.execute("DELETE FROM records WHERE export_id = ? AND in_list = 0 AND exported_at IS NULL",
+                             (export_id,))
+        elif op == 'session_end':
+            conn.execute("UPDATE sessions SET ended_at = ? WHERE session_id = ?", (_now(), arg))
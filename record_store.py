@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据记录存储模块
+
+以稳定ID保存采集到的数据记录，提供O(1)的查找、删除，
+以及按TID、标签号的二级索引和去重索引，所有索引随记录增删改同步维护。
+
+记录使用紧凑的Record对象保存：所有字段打包在一个bytes中，时间为时间戳浮点数，
+十六进制的TID和图片文件名保存为原始字节，纯数字标签号保存为整数，
+厂家名称、图片目录和扩展名保存为共享字符串的编号，只在显示和导出时还原。
+索引中只对应一条记录的值直接保存记录ID，不单独创建集合。
+"""
+import os
+import re
+import struct
+import threading
+from datetime import datetime
+from typing import AbstractSet, Iterable, Iterator, List, Optional, Tuple
+
+# 表示“无值”的显示文本
+MISSING_VALUE = 'N/A'
+
+# 记录时间的显示格式
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 可以无损压缩为字节保存的文本（同一大小写的十六进制，偶数位）
+_UPPER_HEX = re.compile(r'(?:[0-9A-F]{2})+')
+_LOWER_HEX = re.compile(r'(?:[0-9a-f]{2})+')
+
+# 记录的固定部分：标志、显示序号、日志ID、会话ID、记录时间、厂家名称编号
+_HEADER = struct.Struct('<BIqIdI')
+_HEADER_SEQ, _HEADER_JOURNAL_ID, _HEADER_SESSION_ID, _HEADER_CREATED_AT, _HEADER_MANUFACTURER = range(1, 6)
+
+# 标志位：图片是否自动捕获，以及各个可为空的整数字段是否有值
+_FLAG_AUTO_CAPTURED = 0x01
+_OPTIONAL_INT_FLAGS = {_HEADER_SEQ: 0x02, _HEADER_JOURNAL_ID: 0x04, _HEADER_SESSION_ID: 0x08}
+
+# 可变部分中文本的保存方式
+_TEXT_NONE, _TEXT_UPPER_HEX, _TEXT_LOWER_HEX, _TEXT_INT, _TEXT_UTF8 = range(5)
+_INT64_MAX = 2 ** 63 - 1
+_REF = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_LENGTH = struct.Struct('<I')
+
+# 共享字符串（厂家名称、图片目录、扩展名），编号0表示None
+_shared_values = [None]
+_shared_refs = {}
+_shared_lock = threading.Lock()
+
+
+def _share(value: Optional[str]) -> int:
+    """取得共享字符串的编号"""
+    if value is None:
+        return 0
+    ref = _shared_refs.get(value)
+    if ref is None:
+        with _shared_lock:
+            ref = _shared_refs.get(value)
+            if ref is None:
+                _shared_values.append(value)
+                ref = len(_shared_values) - 1
+                _shared_refs[value] = ref
+    return ref
+
+
+def _pack_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return bytes([_TEXT_NONE])
+    # 没有前导零的纯数字保存为整数
+    if value.isdigit() and value.isascii() and str(int(value)) == value and int(value) <= _INT64_MAX:
+        return bytes([_TEXT_INT]) + _INT.pack(int(value))
+    if len(value) <= 510:
+        if _UPPER_HEX.fullmatch(value):
+            return bytes([_TEXT_UPPER_HEX, len(value) // 2]) + bytes.fromhex(value)
+        if _LOWER_HEX.fullmatch(value):
+            return bytes([_TEXT_LOWER_HEX, len(value) // 2]) + bytes.fromhex(value)
+    data = value.encode('utf-8', 'surrogatepass')
+    return bytes([_TEXT_UTF8]) + _LENGTH.pack(len(data)) + data
+
+
+def _skip_text(data: bytes, offset: int) -> int:
+    """跳过一段文本，返回下一段的位置"""
+    kind = data[offset]
+    if kind == _TEXT_NONE:
+        return offset + 1
+    if kind == _TEXT_INT:
+        return offset + 1 + _INT.size
+    if kind in (_TEXT_UPPER_HEX, _TEXT_LOWER_HEX):
+        return offset + 2 + data[offset + 1]
+    return offset + 1 + _LENGTH.size + _LENGTH.unpack_from(data, offset + 1)[0]
+
+
+def _unpack_text(data: bytes, offset: int) -> Tuple[Optional[str], int]:
+    """读取一段文本，返回(文本, 下一段的位置)"""
+    kind = data[offset]
+    offset += 1
+    if kind == _TEXT_NONE:
+        return None, offset
+    if kind == _TEXT_INT:
+        return str(_INT.unpack_from(data, offset)[0]), offset + _INT.size
+    if kind in (_TEXT_UPPER_HEX, _TEXT_LOWER_HEX):
+        end = offset + 1 + data[offset]
+        text = data[offset + 1:end].hex()
+        return (text.upper() if kind == _TEXT_UPPER_HEX else text), end
+    length = _LENGTH.unpack_from(data, offset)[0]
+    offset += _LENGTH.size
+    return data[offset:offset + length].decode('utf-8', 'surrogatepass'), offset + length
+
+
+class Record:
+    """紧凑的数据记录
+
+    按属性访问，同时支持record['tid']、record.get('tid')等只读字典式访问，
+    可以和从数据库读取的dict记录交给相同的代码处理。
+    除ID外的字段打包保存在一个bytes中：固定部分为_HEADER，之后依次为TID、标签号、图片目录编号、
+    图片文件名（不含扩展名）和扩展名编号；修改字段时重新打包。
+    ID与存储和索引共用同一个整数对象，直接保存。
+    """
+
+    __slots__ = ('id', '_data')
+
+    FIELDS = ('id', 'seq', 'journal_id', 'session_id', 'manufacturer', 'tid', 'label',
+              'image_path', 'timestamp', 'auto_captured')
+
+    def __init__(self, manufacturer: str, tid: Optional[str], label: Optional[str],
+                 image_path: Optional[str] = None, timestamp=None, auto_captured: bool = False,
+                 journal_id: Optional[int] = None, session_id: Optional[int] = None):
+        """创建记录
+
+        Args:
+            manufacturer: 厂家名称
+            tid: TID
+            label: 标签号
+            image_path: 图片路径
+            timestamp: 记录时间，时间戳浮点数或TIMESTAMP_FORMAT格式的字符串，默认为当前时间
+            auto_captured: 图片是否为自动捕获
+            journal_id: 数据日志中的ID（恢复的记录）
+            session_id: 数据日志中的会话ID（恢复的记录）
+        """
+        self.id = None
+        header = [_FLAG_AUTO_CAPTURED if auto_captured else 0, 0, 0, 0,
+                  _to_epoch(timestamp) if timestamp is not None else datetime.now().timestamp(),
+                  _share(manufacturer)]
+        for index, value in ((_HEADER_JOURNAL_ID, journal_id), (_HEADER_SESSION_ID, session_id)):
+            if value is not None:
+                header[0] |= _OPTIONAL_INT_FLAGS[index]
+                header[index] = value
+        self._data = _HEADER.pack(*header) + self._pack_body(tid, label, image_path)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Record':
+        """从dict记录（如数据日志中恢复的记录）创建"""
+        return cls(data.get('manufacturer'), data.get('tid'), data.get('label'),
+                   data.get('image_path'), data.get('timestamp'), data.get('auto_captured', False),
+                   data.get('journal_id'), data.get('session_id'))
+
+    # ---------- 打包和解包 ----------
+
+    @staticmethod
+    def _pack_body(tid: Optional[str], label: Optional[str], image_path: Optional[str]) -> bytes:
+        image_dir, image_name = os.path.split(image_path) if image_path else (None, None)
+        if image_name:
+            stem, ext = os.path.splitext(image_name)
+        else:
+            image_dir = stem = ext = None
+        return (_pack_text(tid) + _pack_text(label) + _REF.pack(_share(image_dir))
+                + _pack_text(stem) + _REF.pack(_share(ext)))
+
+    def _unpack_body(self) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """解包可变部分，返回(TID, 标签号, 图片路径)"""
+        data = self._data
+        tid, offset = _unpack_text(data, _HEADER.size)
+        label, offset = _unpack_text(data, offset)
+        image_dir = _shared_values[_REF.unpack_from(data, offset)[0]]
+        stem, offset = _unpack_text(data, offset + _REF.size)
+        if stem is None:
+            return tid, label, None
+        image_name = stem + _shared_values[_REF.unpack_from(data, offset)[0]]
+        return tid, label, os.path.join(image_dir, image_name) if image_dir else image_name
+
+    def _set_body(self, **fields) -> None:
+        tid, label, image_path = self._unpack_body()
+        fields = dict({'tid': tid, 'label': label, 'image_path': image_path}, **fields)
+        self._data = self._data[:_HEADER.size] + self._pack_body(fields['tid'], fields['label'], fields['image_path'])
+
+    def _get_int(self, index: int) -> Optional[int]:
+        header = _HEADER.unpack_from(self._data)
+        return header[index] if header[0] & _OPTIONAL_INT_FLAGS[index] else None
+
+    def _set_header(self, index: int, value) -> None:
+        header = list(_HEADER.unpack_from(self._data))
+        flag = _OPTIONAL_INT_FLAGS.get(index)
+        if flag is not None:
+            header[0] = header[0] | flag if value is not None else header[0] & ~flag
+            value = value if value is not None else 0
+        header[index] = value
+        self._data = _HEADER.pack(*header) + self._data[_HEADER.size:]
+
+    # ---------- 字段 ----------
+
+    @property
+    def seq(self) -> Optional[int]:
+        return self._get_int(_HEADER_SEQ)
+
+    @seq.setter
+    def seq(self, value: Optional[int]) -> None:
+        self._set_header(_HEADER_SEQ, value)
+
+    @property
+    def journal_id(self) -> Optional[int]:
+        return self._get_int(_HEADER_JOURNAL_ID)
+
+    @journal_id.setter
+    def journal_id(self, value: Optional[int]) -> None:
+        self._set_header(_HEADER_JOURNAL_ID, value)
+
+    @property
+    def session_id(self) -> Optional[int]:
+        return self._get_int(_HEADER_SESSION_ID)
+
+    @session_id.setter
+    def session_id(self, value: Optional[int]) -> None:
+        self._set_header(_HEADER_SESSION_ID, value)
+
+    @property
+    def auto_captured(self) -> bool:
+        return bool(self._data[0] & _FLAG_AUTO_CAPTURED)
+
+    @auto_captured.setter
+    def auto_captured(self, value: bool) -> None:
+        flags = self._data[0] | _FLAG_AUTO_CAPTURED if value else self._data[0] & ~_FLAG_AUTO_CAPTURED
+        self._data = bytes([flags]) + self._data[1:]
+
+    @property
+    def manufacturer(self) -> str:
+        return _shared_values[_HEADER.unpack_from(self._data)[_HEADER_MANUFACTURER]]
+
+    @manufacturer.setter
+    def manufacturer(self, value: str) -> None:
+        self._set_header(_HEADER_MANUFACTURER, _share(value))
+
+    @property
+    def tid(self) -> Optional[str]:
+        return _unpack_text(self._data, _HEADER.size)[0]
+
+    @tid.setter
+    def tid(self, value: Optional[str]) -> None:
+        self._set_body(tid=value)
+
+    @property
+    def label(self) -> Optional[str]:
+        data = self._data
+        return _unpack_text(data, _skip_text(data, _HEADER.size))[0]
+
+    @label.setter
+    def label(self, value: Optional[str]) -> None:
+        self._set_body(label=value)
+
+    @property
+    def image_path(self) -> Optional[str]:
+        return self._unpack_body()[2]
+
+    @image_path.setter
+    def image_path(self, value: Optional[str]) -> None:
+        self._set_body(image_path=value)
+
+    @property
+    def created_at(self) -> float:
+        """记录时间（时间戳）"""
+        return _HEADER.unpack_from(self._data)[_HEADER_CREATED_AT]
+
+    @property
+    def timestamp(self) -> str:
+        """格式化的记录时间"""
+        return datetime.fromtimestamp(self.created_at).strftime(TIMESTAMP_FORMAT)
+
+    @timestamp.setter
+    def timestamp(self, value) -> None:
+        self._set_header(_HEADER_CREATED_AT, _to_epoch(value))
+
+    # ---------- 字典式访问 ----------
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        return default if value is None else value
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def update(self, fields: dict) -> None:
+        for key, value in fields.items():
+            self[key] = value
+
+    def __repr__(self) -> str:
+        return f"Record(id={self.id}, tid={self.tid!r}, label={self.label!r}, timestamp={self.timestamp!r})"
+
+
+def _to_epoch(value) -> float:
+    """记录时间转换为时间戳：接受时间戳或TIMESTAMP_FORMAT格式的字符串"""
+    if isinstance(value, str):
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    return float(value)
+
+
+def _index_add(index: dict, key, record_id: int) -> None:
+    """添加到 值 -> 记录ID 的索引：只有一条记录时直接保存ID，有多条时保存ID集合"""
+    ids = index.get(key)
+    if ids is None:
+        index[key] = record_id
+    elif isinstance(ids, set):
+        ids.add(record_id)
+    elif ids != record_id:
+        index[key] = {ids, record_id}
+
+
+def _index_remove(index: dict, key, record_id: int) -> None:
+    ids = index.get(key)
+    if ids is None:
+        return
+    if isinstance(ids, set):
+        ids.discard(record_id)
+        if len(ids) == 1:
+            index[key] = next(iter(ids))
+    elif ids == record_id:
+        del index[key]
+
+
+def _index_ids(index: dict, key) -> AbstractSet:
+    """索引中某个值对应的记录ID"""
+    ids = index.get(key)
+    if ids is None:
+        return frozenset()
+    return ids if isinstance(ids, set) else frozenset((ids,))
+
+
+def normalize_value(value: Optional[str]) -> Optional[str]:
+    """规范化TID/标签号用于索引：去除首尾空白，空值和'N/A'统一为None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value == MISSING_VALUE:
+        return None
+    return value
+
+
+class DedupIndex:
+    """去重索引
+
+    按去重规则为每条记录生成一个或多个去重键，键 -> 记录ID集合，检查为O(1)。
+    支持的规则：
+    - pair: TID和标签号组合唯一（默认）
+    - tid: TID唯一，没有TID的记录不参与去重
+    - label: 标签号唯一，没有标签号的记录不参与去重
+    - each: TID和标签号各自唯一
+    """
+
+    POLICY_PAIR = "pair"
+    POLICY_TID = "tid"
+    POLICY_LABEL = "label"
+    POLICY_EACH = "each"
+
+    POLICY_NAMES = {
+        POLICY_PAIR: "TID和标签号组合唯一",
+        POLICY_TID: "TID唯一",
+        POLICY_LABEL: "标签号唯一",
+        POLICY_EACH: "TID和标签号各自唯一",
+    }
+
+    def __init__(self, policy: str = POLICY_PAIR):
+        if policy not in self.POLICY_NAMES:
+            print(f"⚠️ 未知的去重规则 {policy}，使用默认规则 {self.POLICY_PAIR}")
+            policy = self.POLICY_PAIR
+        self.policy = policy
+        self._keys = {}  # 去重键 -> 记录ID或记录ID集合
+
+    def keys_for(self, tid: Optional[str], label: Optional[str]) -> List[Tuple]:
+        """按当前规则生成去重键（参数需已规范化）"""
+        if self.policy == self.POLICY_PAIR:
+            return [('pair', tid, label)]
+        keys = []
+        if tid is not None and self.policy in (self.POLICY_TID, self.POLICY_EACH):
+            keys.append(('tid', tid))
+        if label is not None and self.policy in (self.POLICY_LABEL, self.POLICY_EACH):
+            keys.append(('label', label))
+        return keys
+
+    def find(self, tid: Optional[str], label: Optional[str], exclude_id=None) -> Optional[int]:
+        """查找与给定值冲突的记录ID
+
+        Args:
+            tid: 规范化后的TID
+            label: 规范化后的标签号
+            exclude_id: 不参与比较的记录ID（编辑时排除自身）
+
+        Returns:
+            int: 冲突记录的ID，没有冲突返回None
+        """
+        for key in self.keys_for(tid, label):
+            for record_id in _index_ids(self._keys, key):
+                if record_id != exclude_id:
+                    return record_id
+        return None
+
+    def add(self, record_id, tid: Optional[str], label: Optional[str]) -> None:
+        for key in self.keys_for(tid, label):
+            _index_add(self._keys, key, record_id)
+
+    def remove(self, record_id, tid: Optional[str], label: Optional[str]) -> None:
+        for key in self.keys_for(tid, label):
+            _index_remove(self._keys, key, record_id)
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+class RecordStore:
+    """数据记录存储
+
+    每条记录为Record，添加时分配：
+    - 'id': 稳定ID，整个运行期间不重复，用作界面行的iid
+    - 'seq': 显示序号，清空后从1重新开始
+    记录按添加顺序保存。
+    """
+
+    def __init__(self, dedup_policy: str = DedupIndex.POLICY_PAIR):
+        """初始化存储
+
+        Args:
+            dedup_policy: 去重规则，见DedupIndex
+        """
+        self._records = {}                  # ID -> 记录，保持插入顺序
+        self._next_id = 1
+        self._next_seq = 1
+        self._by_tid = {}                   # 规范化TID -> ID或ID集合
+        self._by_label = {}                 # 规范化标签号 -> ID或ID集合
+        self.dedup = DedupIndex(dedup_policy)
+        self.journal = None                 # 预写日志，见attach_journal
+
+    def attach_journal(self, journal) -> None:
+        """关联预写日志，此后记录的增删改和清空都会写入日志
+
+        Args:
+            journal: 提供put/delete/clear方法的日志对象（见record_journal.RecordJournal）
+        """
+        self.journal = journal
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter(list(self._records.values()))
+
+    def __contains__(self, record_id) -> bool:
+        return record_id in self._records
+
+    def add(self, record: Record) -> int:
+        """添加一条记录
+
+        Args:
+            record: 数据记录
+
+        Returns:
+            int: 分配的记录ID
+        """
+        record_id = self._next_id
+        self._next_id += 1
+        record.id = record_id
+        record.seq = self._next_seq
+        self._next_seq += 1
+
+        self._records[record_id] = record
+        self._index(record)
+        if self.journal is not None:
+            self.journal.put(record)
+        return record_id
+
+    def get(self, record_id) -> Optional[Record]:
+        """按ID获取记录，不存在返回None"""
+        return self._records.get(record_id)
+
+    def update(self, record_id, **fields) -> Optional[Record]:
+        """更新记录字段，同步更新索引
+
+        Args:
+            record_id: 记录ID
+            **fields: 要更新的字段
+
+        Returns:
+            Record: 更新后的记录，不存在返回None
+        """
+        record = self._records.get(record_id)
+        if record is None:
+            return None
+        self._unindex(record)
+        record.update(fields)
+        self._index(record)
+        if self.journal is not None:
+            self.journal.put(record)
+        return record
+
+    def remove(self, record_id) -> Optional[Record]:
+        """删除一条记录
+
+        Returns:
+            Record: 被删除的记录，不存在返回None
+        """
+        record = self._records.pop(record_id, None)
+        if record is not None:
+            self._unindex(record)
+            if self.journal is not None:
+                self.journal.delete([record.journal_id])
+        return record
+
+    def remove_many(self, record_ids: Iterable) -> List[Record]:
+        """批量删除记录，不存在的ID会被忽略
+
+        Returns:
+            list: 被删除的记录
+        """
+        removed = []
+        for record_id in record_ids:
+            record = self.remove(record_id)
+            if record is not None:
+                removed.append(record)
+        return removed
+
+    def clear(self) -> None:
+        """清空所有记录，显示序号从1重新开始（ID不重置）"""
+        self._records.clear()
+        self._by_tid.clear()
+        self._by_label.clear()
+        self.dedup.clear()
+        self._next_seq = 1
+        if self.journal is not None:
+            self.journal.clear()
+
+    def find_by_tid(self, tid: str) -> List[Record]:
+        """按TID查找记录"""
+        return [self._records[record_id] for record_id in _index_ids(self._by_tid, normalize_value(tid))]
+
+    def find_by_label(self, label: str) -> List[Record]:
+        """按标签号查找记录"""
+        return [self._records[record_id] for record_id in _index_ids(self._by_label, normalize_value(label))]
+
+    def find_duplicate(self, tid: Optional[str], label: Optional[str], exclude_id=None) -> Optional[Record]:
+        """按去重规则查找与给定TID/标签号重复的记录
+
+        Args:
+            tid: TID，空值或'N/A'视为无TID
+            label: 标签号，空值或'N/A'视为无标签号
+            exclude_id: 不参与比较的记录ID（编辑时排除自身）
+
+        Returns:
+            Record: 重复的记录，没有重复返回None
+        """
+        record_id = self.dedup.find(normalize_value(tid), normalize_value(label), exclude_id)
+        return self._records.get(record_id) if record_id is not None else None
+
+    def set_dedup_policy(self, policy: str) -> None:
+        """切换去重规则并按现有记录重建去重索引"""
+        self.dedup = DedupIndex(policy)
+        for record in self._records.values():
+            self.dedup.add(record.id, normalize_value(record.tid), normalize_value(record.label))
+
+    def ids(self) -> List[int]:
+        """按添加顺序返回所有记录ID"""
+        return list(self._records)
+
+    def _index(self, record: Record) -> None:
+        record_id = record.id
+        tid = normalize_value(record.tid)
+        label = normalize_value(record.label)
+        if tid is not None:
+            _index_add(self._by_tid, tid, record_id)
+        if label is not None:
+            _index_add(self._by_label, label, record_id)
+        self.dedup.add(record_id, tid, label)
+
+    def _unindex(self, record: Record) -> None:
+        record_id = record.id
+        tid = normalize_value(record.tid)
+        label = normalize_value(record.label)
+        _index_remove(self._by_tid, tid, record_id)
+        _index_remove(self._by_label, label, record_id)
+        self.dedup.remove(record_id, tid, label)
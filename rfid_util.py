@@ -26,17 +26,28 @@ class TimeoutDetectedException(Exception):
 
 # 尝试导入配置管理器，如果失败则使用简化配置
 try:
-    from config.config_manager import get_config
+    from config.config_manager import get_config, subscribe_config
 except ImportError:
     # 如果都没有，使用默认配置
     def get_config(key, default=None):
         defaults = {
             "rfid_port": "COM4",
             "rfid_baudrate": 115200,
-            "rfid_timeout": 0.5
+            "rfid_timeout": 0.5,
+            "rfid_read_delay": 0.05
         }
         return defaults.get(key, default)
 
+    def subscribe_config(callback, keys=None):
+        pass
+
+# 尝试导入性能统计，如果失败则不统计
+try:
+    from metrics import inc as inc_metric
+except ImportError:
+    def inc_metric(name, amount=1):
+        pass
+
 class RFIDUtil:
     """UHF超高频RFID读写器通信工具类
     
@@ -49,11 +60,11 @@ class RFIDUtil:
     _instance = None
     _lock = threading.Lock()
     
-    # 默认参数
-    DEFAULT_PORT = get_config("rfid_port")
-    DEFAULT_BAUD = get_config("rfid_baudrate")
-    DEFAULT_TIMEOUT = get_config("rfid_timeout")
-    DEFAULT_DELAY=0.05 #读取延迟
+    # 默认参数（未指定时从配置读取，配置修改后会应用到已有连接）
+    DEFAULT_PORT = "COM4"
+    DEFAULT_BAUD = 115200
+    DEFAULT_TIMEOUT = 0.5
+    DEFAULT_DELAY = 0.05  # 读取延迟
     # 命令码定义
     CMD_READ_FIRMWARE = 0x10    # 读固件版本
     CMD_START_INVENTORY = 0x20  # 启动EPC盘存
@@ -80,28 +91,62 @@ class RFIDUtil:
                 cls._instance._initialized = False
             return cls._instance
     
-    def __init__(self, port=DEFAULT_PORT, baudrate=DEFAULT_BAUD, timeout=DEFAULT_TIMEOUT):
+    def __init__(self, port=None, baudrate=None, timeout=None):
         """初始化RFID读写器连接
         
         Args:
-            port: 串口名称，默认COM4
-            baudrate: 波特率，默认115200
-            timeout: 读取超时时间(秒)，默认0.5
+            port: 串口名称，默认读取配置rfid_port
+            baudrate: 波特率，默认读取配置rfid_baudrate
+            timeout: 读取超时时间(秒)，默认读取配置rfid_timeout
         """
         # 单例模式下，只初始化一次
         if hasattr(self, '_initialized') and self._initialized:
             return
             
-        self.port = port
-        self.baudrate = baudrate
-        self.timeout = timeout
+        self.port = port or get_config("rfid_port", self.DEFAULT_PORT)
+        self.baudrate = baudrate or get_config("rfid_baudrate", self.DEFAULT_BAUD)
+        self.timeout = timeout or get_config("rfid_timeout", self.DEFAULT_TIMEOUT)
+        self.read_delay = get_config("rfid_read_delay", self.DEFAULT_DELAY)
         self.ser = None
         self.connected = False
+        self._settings_changed = False  # 串口参数已修改、尚未应用到打开的串口
         self._initialized = True
+
+        # 波特率、超时和读取延迟修改后立即生效（端口在界面中切换时重新连接）
+        subscribe_config(self._on_config_changed, ("rfid_baudrate", "rfid_timeout", "rfid_read_delay"))
         
         # 延迟连接，不在初始化时立即连接，避免导入时出错
         # 首次调用方法时会自动连接
 
+    def _on_config_changed(self, key, old_value, new_value):
+        """记录修改后的串口参数（在配置检查线程中调用）
+
+        不在这里修改打开的串口，避免在命令收发过程中改变串口设置；
+        由使用串口的线程在下一条命令开始前应用，见_apply_port_settings。
+        """
+        if key == "rfid_read_delay":
+            self.read_delay = new_value
+            return
+        if key == "rfid_baudrate":
+            self.baudrate = new_value
+        elif key == "rfid_timeout":
+            self.timeout = new_value
+        self._settings_changed = True
+
+    def _apply_port_settings(self) -> None:
+        """在两次命令之间把修改后的波特率和超时应用到打开的串口"""
+        if not self._settings_changed:
+            return
+        self._settings_changed = False
+        ser = self.ser
+        if ser is not None and ser.is_open:
+            try:
+                ser.baudrate = self.baudrate
+                ser.timeout = self.timeout
+                print(f"🔄 RFID串口参数已更新: {self.baudrate} 波特, 超时{self.timeout}秒")
+            except Exception as e:
+                print(f"⚠️ RFID串口参数更新失败: {e}")
+
     def connect(self) -> bool:
         """连接到串口设备
 
@@ -114,6 +159,8 @@ class RFIDUtil:
                 
                 return True
 
+            # 新连接直接使用当前参数
+            self._settings_changed = False
             self.ser = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
@@ -171,6 +218,17 @@ class RFIDUtil:
         ck = RFIDUtil.checksum(frame_without_ck)
         return frame_without_ck + bytes([ck])
 
+    @classmethod
+    def _verify_checksum(cls, frame: bytes) -> bool:
+        """检查接收帧的校验和
+
+        帧长为LEN+2（帧头、LEN、LEN-1字节内容、CK），帧不完整时视为校验失败
+        """
+        frame_len = frame[1] + 2
+        if len(frame) < frame_len:
+            return False
+        return cls.checksum(frame[:frame_len - 1]) == frame[frame_len - 1]
+
     def _is_timeout_response(self, data: bytes) -> bool:
         """检测是否为超时响应
         
@@ -216,6 +274,7 @@ class RFIDUtil:
             if not self.connect():
                 print("未连接到设备，无法发送命令")
                 return b''
+        self._apply_port_settings()
         
         # 确保缓冲区干净
         self.ser.reset_input_buffer()
@@ -227,12 +286,13 @@ class RFIDUtil:
         print(f'[SEND] {frame.hex(" ").upper()}')
         
         # 等待并读取响应
-        time.sleep(self.DEFAULT_DELAY)
+        time.sleep(self.read_delay)
         resp = self.ser.read(self.ser.in_waiting or 256)
         
         # 超时检测
         if resp and self._is_timeout_response(resp):
             print(f'[RECV] <检测到超时响应，抛出异常>')
+            inc_metric("rfid.timeouts")
             raise TimeoutDetectedException("RFID通信超时：检测到重复数据帧，可能存在通信问题")
         
         if resp:
@@ -243,20 +303,30 @@ class RFIDUtil:
 
     def _split_frames(self, raw_data: bytes) -> List[bytes]:
         """
-        将原始数据按帧头分割为多个帧
-        
+        将原始数据按帧头和LEN字节分割为多个帧
+
+        帧头处按LEN取出LEN+2字节，校验和正确时作为一帧，数据中（如TID内）的0xD9不会被当作帧头；
+        长度不足或校验和错误时退回到下一个0xD9处分段，继续查找后面的帧。
+
         Args:
             raw_data: 原始字节数据
-            
+
         Returns:
-            帧列表，每个元素为一个完整帧
+            帧列表，每个元素为一个完整帧或帧头开始的一段数据
         """
         result = []
-        segments = raw_data.split(b'\xD9')
-        for segment in segments[1:]:  # 跳过第一个可能为空的段
-            if segment:
-                frame = b'\xD9' + segment
-                result.append(frame)
+        start = raw_data.find(b'\xD9')
+        while start != -1:
+            end = start + raw_data[start + 1] + 2 if start + 1 < len(raw_data) else len(raw_data) + 1
+            if end <= len(raw_data) and self._verify_checksum(raw_data[start:end]):
+                result.append(raw_data[start:end])
+                start = raw_data.find(b'\xD9', end)
+                continue
+            next_start = raw_data.find(b'\xD9', start + 1)
+            segment = raw_data[start:next_start] if next_start != -1 else raw_data[start:]
+            if len(segment) > 1:
+                result.append(segment)
+            start = next_start
         return result
 
     def _process_frames_from_data(self, raw_data: bytes, results_by_antenna: dict,
@@ -406,6 +476,7 @@ class RFIDUtil:
             if not self.connect():
                 print("❌ 未连接到设备，无法读取TID")
                 return None
+        self._apply_port_settings()
 
 
         print(f"🔄 开始读取TID，需要连续读取{required_count}次相同TID")
@@ -505,6 +576,7 @@ class RFIDUtil:
             # 使用与EPC解析相同的帧分割逻辑
             frames = self._split_frames(raw_data)
             print(f"[TID解析] 分割出 {len(frames)} 个帧")
+            inc_metric("rfid.frames_parsed", len(frames))
 
             for i, frame in enumerate(frames, 1):
                 print(f"[TID解析] 处理第{i}个帧: {frame.hex(' ').upper()}")
@@ -521,11 +593,19 @@ class RFIDUtil:
                 cmd = frame[4]
                 print(f"[TID解析] 帧{i}命令码: 0x{cmd:02X}")
 
+                # 只统计校验和错误，不丢弃该帧；长度与LEN不符的是不完整的数据段，不计为校验和错误
+                if len(frame) != frame[1] + 2:
+                    print(f"[TID解析] 帧{i}长度与LEN不符，不检查校验和")
+                elif not self._verify_checksum(frame):
+                    print(f"⚠️ [TID解析] 帧{i}校验和错误")
+                    inc_metric("rfid.checksum_failures")
+
                 # 方法1: 检查是否为读TID命令的直接响应
                 if cmd == self.CMD_READ_TID:
                     tid = self._parse_tid_response_frame(frame)
                     if tid:
                         tids.append(tid)
+                        inc_metric("rfid.tags_read")
                         print(f"[TID解析] 从TID响应帧提取: {tid}")
 
                 # 方法2: 检查是否为盘存响应中的EPC数据
@@ -534,6 +614,7 @@ class RFIDUtil:
                     print(f"💡 [TID解析] 建议执行RFID重置操作：停止存盘->读TID")
 
                     # 抛出特殊异常，通知上层需要重置RFID
+                    inc_metric("rfid.epc_frames")
                     raise EpcFrameDetectedException("检测到EPC帧，需要重置RFID设备到TID模式")
 
                 # 方法3: 尝试解析其他可能包含TID数据的帧
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采样分析模块
+
+在后台线程中按固定间隔用sys._current_frames()采集指定工作线程（自动获取、OCR、摄像头、串口）
+的调用栈，运行指定时长后写入折叠栈文件（每行“线程;外层函数;...;内层函数 次数”），
+可以直接用flamegraph.pl、speedscope、inferno等工具生成火焰图。
+只读取调用栈，不修改被分析的线程，打包后的程序同样可用。
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterable, Optional, Tuple
+
+# 默认采样时长(秒)
+DEFAULT_PROFILE_DURATION = 30.0
+
+# 默认采样间隔(秒)
+DEFAULT_SAMPLE_INTERVAL = 0.01
+
+# 默认采样的线程名前缀
+DEFAULT_PROFILE_THREADS = ("auto-get", "ocr-", "camera-", "rfid-")
+
+# 单个调用栈最多记录的层数（超出部分丢弃最外层）
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame) -> str:
+    """调用栈中一层的名称：函数名 (文件名:函数起始行)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold_stack(thread_name: str, frame) -> str:
+    """把线程的调用栈转换为折叠栈格式（从外到内，以分号分隔）"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame).replace(";", ":"))
+        frame = frame.f_back
+    labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """对名称匹配的线程做定时采样，所有方法都可以在任意线程调用"""
+
+    def __init__(self, thread_prefixes: Iterable[str] = DEFAULT_PROFILE_THREADS,
+                 interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """初始化采样分析
+
+        Args:
+            thread_prefixes: 采样的线程名前缀
+            interval: 采样间隔(秒)
+        """
+        if isinstance(thread_prefixes, str):
+            thread_prefixes = (thread_prefixes,)
+        self.thread_prefixes = tuple(thread_prefixes)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """是否正在采样"""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def start(self, duration: float, output_file: str,
+              on_finished: Optional[Callable[[Optional[str], int], None]] = None) -> bool:
+        """开始采样，达到时长或调用stop后写入结果
+
+        Args:
+            duration: 采样时长(秒)
+            output_file: 折叠栈文件路径
+            on_finished: 写入完成后在采样线程中调用，参数为(文件路径, 采样次数)，写入失败时文件路径为None
+
+        Returns:
+            bool: 是否已开始（正在采样时返回False）
+        """
+        with self._lock:
+            if self.running:
+                return False
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(duration, output_file, on_finished),
+                name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        print(f"🔬 开始采样分析（{duration:g}秒，间隔{self.interval * 1000:g}毫秒）")
+        return True
+
+    def stop(self) -> None:
+        """提前结束采样（仍然写入已采集的结果）"""
+        self._stop_event.set()
+
+    def _matches(self, thread_name: str) -> bool:
+        return thread_name.startswith(self.thread_prefixes)
+
+    def _run(self, duration: float, output_file: str, on_finished) -> None:
+        stacks, samples = self._sample(duration)
+        try:
+            self.write_folded(stacks, output_file)
+            print(f"🔬 采样分析完成，共采样{samples}次，结果已写入: {output_file}")
+        except OSError as e:
+            print(f"❌ 写入采样分析结果失败: {e}")
+            output_file = None
+        if on_finished:
+            on_finished(output_file, samples)
+
+    def _sample(self, duration: float) -> Tuple[Counter, int]:
+        """采集调用栈
+
+        Returns:
+            (折叠栈 -> 次数, 采样次数)
+        """
+        stacks = Counter()
+        samples = 0
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop_event.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                name = names.get(thread_id)
+                if thread_id == own_id or name is None or not self._matches(name):
+                    continue
+                stacks[_fold_stack(name, frame)] += 1
+            # 等待期间不持有其他线程的栈帧
+            frames = frame = None
+            samples += 1
+            self._stop_event.wait(self.interval)
+        return stacks, samples
+
+    @staticmethod
+    def write_folded(stacks: Counter, output_file: str) -> None:
+        """写入折叠栈文件（按次数从多到少）"""
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析模块
+
+用 --profile-startup 启动程序时记录：
+- 每个模块的导入耗时（自身耗时和含子模块的累计耗时），通过sys.meta_path上的查找器统计，
+  打包后的程序同样可用（不依赖 -X importtime）
+- 各子系统初始化（界面、OCR、RFID、摄像头等）的耗时和窗口显示等时间点
+后台线程中的导入和初始化分别按线程统计。报告写入文本文件，未启用时各函数不做任何事。
+"""
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+# 命令行选项，可写成 --profile-startup=报告文件路径
+PROFILE_STARTUP_OPTION = "--profile-startup"
+
+# 默认报告文件名
+DEFAULT_STARTUP_PROFILE_FILE = "startup_profile.txt"
+
+# 报告中列出的模块数
+REPORT_TOP_IMPORTS = 60
+
+
+def parse_option(argv: List[str]) -> Optional[str]:
+    """解析启动分析选项
+
+    Returns:
+        Optional[str]: 未指定选项返回None，未指定文件路径返回空字符串
+    """
+    for arg in argv[1:]:
+        if arg == PROFILE_STARTUP_OPTION:
+            return ""
+        if arg.startswith(PROFILE_STARTUP_OPTION + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """包装原加载器，统计exec_module的耗时"""
+
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        # get_resource_reader、is_package等其他方法交给原加载器
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        self._profiler._enter_import()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit_import(spec.name, start)
+            # 恢复原加载器，导入完成后不再经过包装
+            spec.loader = self._loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """放在sys.meta_path最前面，用其余查找器找到模块后包装其加载器"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "searching", False):
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.searching = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimingLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    """记录模块导入和子系统初始化的耗时，所有方法都可以在任意线程调用"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.output_file = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._finder = None
+        self._imports = []     # (模块名, 自身耗时, 累计耗时, 线程名)
+        self._spans = []       # (名称, 开始时刻, 耗时, 线程名)
+        self._marks = []       # (名称, 时刻)
+
+    def install(self) -> None:
+        """开始统计模块导入"""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        """停止统计模块导入"""
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+
+    def _enter_import(self) -> None:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # 子模块导入的累计耗时
+
+    def _exit_import(self, name: str, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        stack = self._local.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        with self._lock:
+            self._imports.append((name, elapsed - children, elapsed, threading.current_thread().name))
+
+    @contextmanager
+    def span(self, name: str):
+        """统计一段初始化的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._spans.append((name, start - self.start_time, elapsed, threading.current_thread().name))
+
+    def mark(self, name: str) -> None:
+        """记录一个时间点（距分析开始的时间）"""
+        with self._lock:
+            self._marks.append((name, time.perf_counter() - self.start_time))
+
+    def write_report(self, output_file: Optional[str] = None) -> Optional[str]:
+        """写入分析报告
+
+        Args:
+            output_file: 报告文件路径，默认使用output_file属性
+
+        Returns:
+            Optional[str]: 报告文件路径，没有指定路径时为None
+        """
+        output_file = output_file or self.output_file
+        if not output_file:
+            return None
+        with self._lock:
+            imports = sorted(self._imports, key=lambda item: item[2], reverse=True)
+            spans = sorted(self._spans, key=lambda item: item[1])
+            marks = list(self._marks)
+
+        lines = [f"启动耗时分析 ({time.strftime('%Y-%m-%d %H:%M:%S')})", ""]
+        lines.append("== 时间点（距启动） ==")
+        for name, at in marks:
+            lines.append(f"{at * 1000:10.1f} ms  {name}")
+
+        lines += ["", "== 子系统初始化 ==", f"{'开始(ms)':>10} {'耗时(ms)':>10}  {'线程':<16} 名称"]
+        for name, begin, elapsed, thread in spans:
+            lines.append(f"{begin * 1000:10.1f} {elapsed * 1000:10.1f}  {thread:<16} {name}")
+
+        main_imports = sum(item[1] for item in imports if item[3] == "MainThread")
+        lines += ["", f"== 模块导入（共 {len(imports)} 个，主线程自身耗时合计 {main_imports * 1000:.1f} ms，"
+                      f"按累计耗时排序，前 {REPORT_TOP_IMPORTS} 个） ==",
+                  f"{'累计(ms)':>10} {'自身(ms)':>10}  {'线程':<16} 模块"]
+        for name, self_time, cumulative, thread in imports[:REPORT_TOP_IMPORTS]:
+            lines.append(f"{cumulative * 1000:10.1f} {self_time * 1000:10.1f}  {thread:<16} {name}")
+
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return output_file
+
+
+_profiler = None
+
+
+def start() -> StartupProfiler:
+    """启用启动分析并开始统计模块导入（重复调用返回同一个实例）"""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def get_profiler() -> Optional[StartupProfiler]:
+    """获取启动分析器，未启用时为None"""
+    return _profiler
+
+
+@contextmanager
+def span(name: str):
+    """统计一段初始化的耗时，未启用分析时不做任何事"""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.span(name):
+            yield
+
+
+def mark(name: str) -> None:
+    """记录一个时间点，未启用分析时不做任何事"""
+    if _profiler is not None:
+        _profiler.mark(name)
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""测试公共设置：把项目根目录加入导入路径（项目模块都在根目录下）"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
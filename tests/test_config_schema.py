@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""config_schema 的测试：程序读取的配置项都已登记，不合法的值被拒绝"""
+import glob
+import os
+import re
+
+import pytest
+
+from config.config_schema import CONFIG_SCHEMA
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_GET_CONFIG = re.compile(r"get_config\(\s*['\"]([A-Za-z0-9_]+)['\"]")
+
+
+def config_keys_in_source():
+    keys = set()
+    for path in glob.glob(os.path.join(ROOT_DIR, "*.py")) + glob.glob(os.path.join(ROOT_DIR, "config", "*.py")):
+        with open(path, encoding="utf-8") as f:
+            keys.update(_GET_CONFIG.findall(f.read()))
+    return keys
+
+
+def test_every_config_key_is_registered():
+    keys = config_keys_in_source()
+    assert keys
+    assert sorted(keys - set(CONFIG_SCHEMA)) == []
+
+
+@pytest.mark.parametrize("key", sorted(CONFIG_SCHEMA))
+def test_default_is_valid(key):
+    option = CONFIG_SCHEMA[key]
+    assert option.validate(option.default) == (True, option.default)
+
+
+@pytest.mark.parametrize("key, value", [
+    ("preview_cache_size", "x"),
+    ("preview_cache_size", 0),
+    ("image_store_max_mb", "x"),
+    ("image_store_max_mb", True),
+    ("camera_probe_count", 1.5),
+    ("dedup_policy", "unknown"),
+    ("journal_enabled", 1),
+    ("sampling_profile_threads", "auto-get"),
+    ("sampling_profile_threads", ["auto-get", 1]),
+])
+def test_invalid_values_rejected(key, value):
+    assert CONFIG_SCHEMA[key].validate(value) == (False, None)
+
+
+def test_values_are_converted():
+    assert CONFIG_SCHEMA["image_store_max_mb"].validate(100) == (True, 100.0)
+    assert CONFIG_SCHEMA["sampling_profile_threads"].validate(["ocr-"]) == (True, ("ocr-",))
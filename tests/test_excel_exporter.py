@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""excel_exporter 分卷追加的测试：序号接续、写入登记以及中断后只清理未登记的那个分卷"""
+import os
+from datetime import datetime
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+import excel_exporter  # noqa: E402
+from excel_exporter import (ExcelExportJob, get_index_file, get_parts_dir, get_pending_file,  # noqa: E402
+                            part_file_name, read_next_serial, remove_pending_part)
+
+
+def make_records(count, start=0):
+    return [{'manufacturer': "厂家", 'tid': f"E{i:04d}", 'label': str(i), 'image_path': None,
+             'timestamp': "2024-01-02 03:04:05"} for i in range(start, start + count)]
+
+
+@pytest.fixture
+def main_file(tmp_path):
+    path = os.path.join(str(tmp_path), "记录.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(excel_exporter.EXPORT_HEADERS)
+    for serial in (1, 2, 105):
+        ws.append([serial, "厂家", "E", "1", None, "2024-01-01 00:00:00"])
+    ws.cell(row=20, column=2).number_format = "0.00"  # 末尾只有格式的空行
+    wb.save(path)
+    return path
+
+
+def run_parts_job(main_file, records):
+    job = ExcelExportJob(main_file, records, ExcelExportJob.MODE_PARTS)
+    job.start()
+    job.join(30)
+    return job
+
+
+def read_rows(path):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return [row for row in wb.active.iter_rows(min_row=2, values_only=True) if row]
+    finally:
+        wb.close()
+
+
+def test_next_serial_continues_column_a(main_file):
+    assert read_next_serial(main_file) == 106
+
+
+def test_parts_export_registers_part(main_file):
+    job = run_parts_job(main_file, make_records(3))
+    assert job.status == ExcelExportJob.STATUS_DONE, job.error
+    part_name = os.path.basename(job.output_file)
+    assert [row[0] for row in read_rows(job.output_file)] == [106, 107, 108]
+    assert [row[:4] for row in read_rows(get_index_file(main_file))] == [(part_name, 106, 108, 3)]
+    assert not os.path.exists(get_pending_file(main_file))
+
+    job = run_parts_job(main_file, make_records(2, 3))
+    assert job.status == ExcelExportJob.STATUS_DONE, job.error
+    assert [row[0] for row in read_rows(job.output_file)] == [109, 110]
+
+
+def test_failed_registration_removes_part(main_file, monkeypatch):
+    def fail(*args):
+        raise OSError("index locked")
+    monkeypatch.setattr(ExcelExportJob, "_register_part", fail)
+    job = run_parts_job(main_file, make_records(2))
+    assert job.status == ExcelExportJob.STATUS_FAILED
+    assert not os.path.exists(job.output_file)
+    assert not os.path.exists(get_pending_file(main_file))
+
+
+def test_remove_pending_part_only_deletes_recorded_file(main_file):
+    parts_dir = get_parts_dir(main_file)
+    os.makedirs(parts_dir)
+    pending = part_file_name(main_file, datetime(2024, 1, 2, 3, 4, 5))
+    kept = ["记录_备份.xlsx", part_file_name(main_file, datetime(2024, 1, 1, 0, 0, 0)), "记录_20240101_000000_2.xlsx"]
+    for name in kept + [pending]:
+        with open(os.path.join(parts_dir, name), "wb") as f:
+            f.write(b"x")
+    with open(get_pending_file(main_file), "w", encoding="utf-8") as f:
+        f.write(pending)
+
+    assert remove_pending_part(main_file) == os.path.join(parts_dir, pending)
+    assert sorted(os.listdir(parts_dir)) == sorted(kept)
+    assert remove_pending_part(main_file) is None
+
+
+def test_remove_pending_part_ignores_unexpected_names(main_file):
+    parts_dir = get_parts_dir(main_file)
+    os.makedirs(parts_dir)
+    with open(os.path.join(parts_dir, "记录_备份.xlsx"), "wb") as f:
+        f.write(b"x")
+    with open(get_pending_file(main_file), "w", encoding="utf-8") as f:
+        f.write("记录_备份.xlsx")
+    assert remove_pending_part(main_file) is None
+    assert os.listdir(parts_dir) == ["记录_备份.xlsx"]
+
+
+def test_part_file_names():
+    time = datetime(2024, 1, 2, 3, 4, 5)
+    assert part_file_name("/a/记录.xlsx", time) == "记录_20240102_030405.xlsx"
+    assert part_file_name("/a/记录.xlsx", time, 3) == "记录_20240102_030405_3.xlsx"
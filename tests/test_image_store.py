@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""image_store 的测试：按内容去重、引用计数、丢弃未引用的图片和按最近使用时间淘汰"""
+import itertools
+import os
+
+import pytest
+
+import image_store
+from image_store import ImageStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """让每次time.time()递增，保证最近使用时间的先后顺序确定"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(image_store.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def root_dir(tmp_path):
+    return os.path.join(str(tmp_path), "images")
+
+
+def test_put_dedups_by_content(root_dir):
+    store = ImageStore(root_dir)
+    try:
+        first = store.put(b"image-a")
+        assert store.put(b"image-a") == first
+        second = store.put(b"image-b", ".PNG")
+        assert second != first and second.endswith(".png")
+        assert store.is_managed(first)
+        assert not store.is_managed(os.path.join(os.path.dirname(root_dir), "other.jpg"))
+        with open(first, "rb") as f:
+            assert f.read() == b"image-a"
+        assert store.total_size() == len(b"image-a") + len(b"image-b")
+    finally:
+        store.close()
+
+
+def test_release_deletes_unreferenced_images(root_dir):
+    store = ImageStore(root_dir)
+    try:
+        path = store.put(b"image-a")
+        store.acquire(path)
+        store.acquire_many([path, None])
+        store.release([path])
+        assert os.path.exists(path)
+        store.release([path])
+        assert not os.path.exists(path)
+        assert store.total_size() == 0
+    finally:
+        store.close()
+
+
+def test_discard_only_unreferenced_unexported(root_dir):
+    store = ImageStore(root_dir)
+    try:
+        referenced = store.put(b"referenced")
+        store.acquire(referenced)
+        exported = store.put(b"exported")
+        store.mark_exported([exported])
+        unused = store.put(b"unused")
+        for path in (referenced, exported, unused):
+            store.discard(path)
+        assert os.path.exists(referenced)
+        assert os.path.exists(exported)
+        assert not os.path.exists(unused)
+        # 不在存储中的文件不受影响
+        outside = os.path.join(os.path.dirname(root_dir), "outside.jpg")
+        with open(outside, "wb") as f:
+            f.write(b"x")
+        store.discard(outside)
+        assert os.path.exists(outside)
+    finally:
+        store.close()
+
+
+def test_evict_exported_in_lru_order(root_dir, clock):
+    store = ImageStore(root_dir)
+    try:
+        paths = [store.put(bytes([i]) * 100) for i in range(4)]
+        store.acquire(paths[3])
+        store.mark_exported([paths[3]])  # 仍被引用，不淘汰
+        store.mark_exported([paths[1]])
+        store.mark_exported([paths[0]])
+        store.mark_exported([paths[2]])
+        assert store.total_size() == 400
+
+        store.max_size_bytes = 250
+        assert store.evict() == 2
+        # 最早使用的paths[1]、paths[0]被淘汰，剩余200字节不超过上限
+        assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+        assert store.total_size() == 200
+        assert store.evict() == 0
+    finally:
+        store.close()
+
+
+def test_mark_exported_evicts_over_limit(root_dir, clock):
+    store = ImageStore(root_dir, max_size_mb=150 / (1024 * 1024))
+    try:
+        old = store.put(b"a" * 100)
+        store.mark_exported([old])
+        assert os.path.exists(old)
+        new = store.put(b"b" * 100)
+        store.mark_exported([new])
+        assert not os.path.exists(old)
+        assert os.path.exists(new)
+    finally:
+        store.close()
+
+
+def test_evict_unlimited(root_dir):
+    store = ImageStore(root_dir, max_size_mb=0)
+    try:
+        path = store.put(b"x" * 1000)
+        store.mark_exported([path])
+        assert store.evict() == 0
+        assert os.path.exists(path)
+    finally:
+        store.close()
+
+
+def test_reopen_resets_ref_count(root_dir):
+    store = ImageStore(root_dir)
+    path = store.put(b"image-a")
+    store.acquire(path)
+    store.acquire(path)
+    store.close()
+
+    store = ImageStore(root_dir)
+    try:
+        assert os.path.exists(path)
+        store.sweep()
+        assert not os.path.exists(path)
+    finally:
+        store.close()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""record_journal 的测试：写入、重新打开后恢复，以及导出快照和导出任务登记"""
+import os
+
+import pytest
+
+from record_journal import EXPORT_CANCELLED, EXPORT_DONE, RecordJournal
+from record_store import Record
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return os.path.join(str(tmp_path), "journal.db")
+
+
+def open_journal(db_file):
+    return RecordJournal(db_file, flush_interval=0.01)
+
+
+def make_record(tid, label):
+    return {'manufacturer': "厂家", 'tid': tid, 'label': label, 'image_path': None,
+            'timestamp': "2024-01-02 03:04:05", 'auto_captured': False}
+
+
+def snapshot(journal, export_id, count):
+    return [(row['tid'], row['label'])
+            for chunk in journal.record_source(export_id, count).iter_chunks(chunk_size=2)
+            for row in chunk]
+
+
+def test_put_flush_and_reopen(db_file):
+    journal = open_journal(db_file)
+    first, second, third = make_record("E1", "1"), make_record("E2", "2"), make_record("E3", "3")
+    for record in (first, second, third):
+        journal.put(record)
+    assert first['journal_id'] < second['journal_id'] < third['journal_id']
+    second['label'] = "22"
+    journal.put(second)
+    journal.delete([third['journal_id']])
+    assert journal.flush(timeout=5)
+    session_id = journal.session_id
+    journal.close(timeout=5)
+
+    journal = open_journal(db_file)
+    try:
+        loaded = journal.load()
+        assert [(row['journal_id'], row['tid'], row['label']) for row in loaded] == [
+            (first['journal_id'], "E1", "1"), (second['journal_id'], "E2", "22")]
+        assert all(row['session_id'] == session_id for row in loaded)
+        assert journal.session_id == session_id + 1
+        # 新分配的ID不与保留的记录重复
+        fourth = make_record("E4", "4")
+        journal.put(fourth)
+        assert fourth['journal_id'] > second['journal_id']
+    finally:
+        journal.close(timeout=5)
+
+
+def test_close_writes_queued_operations(db_file):
+    journal = open_journal(db_file)
+    journal.put(make_record("E1", "1"))
+    journal.close(timeout=5)
+
+    journal = open_journal(db_file)
+    try:
+        assert [row['tid'] for row in journal.load()] == ["E1"]
+        sessions = journal.list_sessions()
+        assert sessions[1]['ended_at'] is not None
+    finally:
+        journal.close(timeout=5)
+
+
+def test_put_accepts_record_objects(db_file):
+    journal = open_journal(db_file)
+    try:
+        record = Record("厂家", "E2801160600002096A3B1C2D", "100", timestamp="2024-01-02 03:04:05")
+        journal.put(record)
+        assert record.journal_id is not None
+        assert journal.flush(timeout=5)
+        loaded = journal.load()
+        assert loaded[0]['tid'] == "E2801160600002096A3B1C2D"
+        assert loaded[0]['timestamp'] == "2024-01-02 03:04:05"
+    finally:
+        journal.close(timeout=5)
+
+
+def test_export_snapshot_isolated_from_later_edits(db_file):
+    journal = open_journal(db_file)
+    try:
+        records = [make_record(f"E{i}", str(i)) for i in range(3)]
+        for record in records:
+            journal.put(record)
+        ids = [record['journal_id'] for record in records]
+        export_id = journal.start_export("out.xlsx", "new", ids)
+
+        records[0]['label'] = "edited"
+        journal.put(records[0])
+        journal.delete([ids[1]])
+        journal.put(make_record("E9", "9"))
+        assert journal.flush(timeout=5)
+
+        assert snapshot(journal, export_id, len(ids)) == [("E0", "0"), ("E1", "1"), ("E2", "2")]
+        # 导出期间删除的记录先只移出列表
+        assert [row['journal_id'] for row in journal.load()] == [ids[0], ids[2], ids[2] + 1]
+        pending = journal.pending_export()
+        assert pending['export_id'] == export_id
+        assert pending['excel_file'] == "out.xlsx"
+        assert pending['journal_ids'] == [ids[0], ids[2]]
+
+        journal.finish_export(export_id, EXPORT_DONE, "out.xlsx")
+        assert journal.flush(timeout=5)
+        assert journal.pending_export() is None
+        assert snapshot(journal, export_id, len(ids)) == []
+        exported = {row['journal_id']: row for row in journal.query_records()}
+        assert all(exported[journal_id]['exported_at'] for journal_id in ids)
+        assert exported[ids[1]]['in_list'] == 0
+        assert exported[ids[0]]['export_file'] == "out.xlsx"
+    finally:
+        journal.close(timeout=5)
+
+
+def test_cancelled_export_drops_deleted_records(db_file):
+    journal = open_journal(db_file)
+    try:
+        records = [make_record(f"E{i}", str(i)) for i in range(2)]
+        for record in records:
+            journal.put(record)
+        ids = [record['journal_id'] for record in records]
+        export_id = journal.start_export("out.xlsx", "new", ids)
+        journal.delete([ids[0]])
+        journal.finish_export(export_id, EXPORT_CANCELLED)
+        assert journal.flush(timeout=5)
+
+        rows = {row['journal_id']: row for row in journal.query_records()}
+        assert ids[0] not in rows
+        assert rows[ids[1]]['exported_at'] is None
+        assert journal.pending_export() is None
+    finally:
+        journal.close(timeout=5)
+
+
+def test_pending_export_survives_reopen_and_restart(db_file):
+    journal = open_journal(db_file)
+    records = [make_record(f"E{i}", str(i)) for i in range(2)]
+    for record in records:
+        journal.put(record)
+    ids = [record['journal_id'] for record in records]
+    export_id = journal.start_export("out.xlsx", "parts", ids)
+    journal.close(timeout=5)
+
+    journal = open_journal(db_file)
+    try:
+        pending = journal.pending_export()
+        assert (pending['export_id'], pending['mode'], pending['journal_ids']) == (export_id, "parts", ids)
+        records[1]['label'] = "new"
+        records[1]['session_id'] = journal.load()[1]['session_id']
+        journal.put(records[1])
+        journal.restart_export(export_id, ids)
+        assert journal.flush(timeout=5)
+        assert snapshot(journal, export_id, len(ids)) == [("E0", "0"), ("E1", "new")]
+    finally:
+        journal.close(timeout=5)
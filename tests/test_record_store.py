@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""record_store 的测试：规范化、各去重规则以及增删改时的索引维护"""
+import pytest
+
+from record_store import DedupIndex, Record, RecordStore, normalize_value
+
+TID_A = "E2801160600002096A3B1C2D"
+TID_B = "E2801160600002096A3B1C2E"
+
+
+def make_store(policy=DedupIndex.POLICY_PAIR, rows=()):
+    store = RecordStore(policy)
+    ids = [store.add(Record("厂家", tid, label)) for tid, label in rows]
+    return store, ids
+
+
+@pytest.mark.parametrize("value", [None, "", "   ", "N/A", " N/A "])
+def test_normalize_missing_values(value):
+    assert normalize_value(value) is None
+
+
+def test_normalize_strips_and_keeps_value():
+    assert normalize_value("  123 ") == "123"
+    assert normalize_value(42) == "42"
+    assert normalize_value("n/a") == "n/a"  # 只有大写N/A表示无值
+
+
+def test_pair_policy_matches_only_same_combination():
+    store, (first, _) = make_store(rows=[(TID_A, "100"), (TID_B, "200")])
+    assert store.find_duplicate(TID_A, "100").id == first
+    assert store.find_duplicate(TID_A, "200") is None
+    assert store.find_duplicate(TID_B, "100") is None
+
+
+def test_pair_policy_treats_missing_values_alike():
+    store, (first,) = make_store(rows=[(TID_A, "N/A")])
+    assert store.find_duplicate(TID_A, "").id == first
+    assert store.find_duplicate(TID_A, None).id == first
+    assert store.find_duplicate(TID_A, "1") is None
+
+
+def test_tid_policy():
+    store, (first,) = make_store(DedupIndex.POLICY_TID, [(TID_A, "100")])
+    assert store.find_duplicate(TID_A, "999").id == first
+    assert store.find_duplicate(TID_B, "100") is None
+    # 没有TID的记录不参与去重
+    store.add(Record("厂家", "N/A", "300"))
+    assert store.find_duplicate(None, "300") is None
+    assert store.find_duplicate("N/A", "300") is None
+
+
+def test_label_policy():
+    store, (first,) = make_store(DedupIndex.POLICY_LABEL, [(TID_A, "100")])
+    assert store.find_duplicate(TID_B, "100").id == first
+    assert store.find_duplicate(TID_A, "200") is None
+    store.add(Record("厂家", TID_B, ""))
+    assert store.find_duplicate(TID_B, None) is None
+
+
+def test_each_policy():
+    store, (first,) = make_store(DedupIndex.POLICY_EACH, [(TID_A, "100")])
+    assert store.find_duplicate(TID_A, "200").id == first
+    assert store.find_duplicate(TID_B, "100").id == first
+    assert store.find_duplicate(TID_B, "200") is None
+    assert store.find_duplicate(None, None) is None
+
+
+def test_unknown_policy_falls_back_to_pair():
+    assert DedupIndex("bogus").policy == DedupIndex.POLICY_PAIR
+
+
+def test_exclude_id_skips_own_record():
+    store, (first,) = make_store(DedupIndex.POLICY_EACH, [(TID_A, "100")])
+    assert store.find_duplicate(TID_A, "100", exclude_id=first) is None
+
+
+def test_set_dedup_policy_rebuilds_index():
+    store, (first, _) = make_store(rows=[(TID_A, "100"), (TID_B, "200")])
+    assert store.find_duplicate(TID_A, "200") is None
+    store.set_dedup_policy(DedupIndex.POLICY_TID)
+    assert store.find_duplicate(TID_A, "200").id == first
+
+
+def test_remove_clears_all_indexes():
+    store, (first, second) = make_store(DedupIndex.POLICY_EACH, [(TID_A, "100"), (TID_B, "200")])
+    removed = store.remove(first)
+    assert removed.id == first
+    assert first not in store
+    assert store.find_by_tid(TID_A) == []
+    assert store.find_by_label("100") == []
+    assert store.find_duplicate(TID_A, None) is None
+    assert store.find_duplicate(None, "100") is None
+    assert [r.id for r in store.find_by_tid(TID_B)] == [second]
+    assert store.remove(first) is None
+
+
+def test_remove_keeps_shared_index_entries():
+    store, (first, second) = make_store(DedupIndex.POLICY_TID, [(TID_A, "100"), (TID_A, "200")])
+    store.remove(first)
+    assert [r.id for r in store.find_by_tid(TID_A)] == [second]
+    assert store.find_duplicate(TID_A, None).id == second
+
+
+def test_update_moves_index_entries():
+    store, (first,) = make_store(DedupIndex.POLICY_EACH, [(TID_A, "100")])
+    store.update(first, tid=TID_B, label="N/A")
+    assert store.find_by_tid(TID_A) == []
+    assert store.find_by_label("100") == []
+    assert [r.id for r in store.find_by_tid(TID_B)] == [first]
+    assert store.find_duplicate(TID_A, "100") is None
+    assert store.find_duplicate(TID_B, None).id == first
+    assert store.update(999, tid=TID_A) is None
+
+
+def test_remove_many_and_clear():
+    store, ids = make_store(rows=[(TID_A, "1"), (TID_B, "2"), (TID_A, "3")])
+    removed = store.remove_many([ids[0], 999, ids[2]])
+    assert [r.id for r in removed] == [ids[0], ids[2]]
+    assert store.ids() == [ids[1]]
+    store.clear()
+    assert len(store) == 0
+    assert store.find_by_tid(TID_B) == []
+    assert store.find_duplicate(TID_B, "2") is None
+    # 清空后序号从1开始，ID继续增长
+    new_id = store.add(Record("厂家", TID_A, "1"))
+    assert new_id > ids[2]
+    assert store.get(new_id).seq == 1
+
+
+def test_record_round_trips_compact_fields():
+    record = Record("厂家", TID_A.lower(), "007", "/tmp/images/a.jpg", "2024-01-02 03:04:05", True)
+    assert record.tid == TID_A.lower()  # 小写TID不压缩，原样保存
+    assert Record("厂家", TID_A, "1").tid == TID_A
+    assert record.label == "007"
+    assert Record("厂家", TID_A, "123")["label"] == "123"
+    assert record["image_path"] == "/tmp/images/a.jpg"
+    assert record.timestamp == "2024-01-02 03:04:05"
+    assert record.get("journal_id", "none") == "none"
+    with pytest.raises(KeyError):
+        record["unknown"]
+
+
+@pytest.mark.parametrize("value", [
+    None, "", "N/A", "E2801160600002096A3B1C2D", "e2801160600002096a3b1c2d", "E2801160600002096a3b1c2d",
+    "ABC", "0", "007", "123", "99999999999999999999999", "标签-1", " 12 ",
+])
+def test_record_text_fields_round_trip(value):
+    record = Record("厂家", value, value)
+    assert record.tid == value
+    assert record.label == value
+
+
+@pytest.mark.parametrize("path", [
+    None, "a.jpg", "/tmp/images/ab/" + "ab" * 32 + ".jpg", "/tmp/images/AB12.PNG",
+    "C:\\图片\\拍照_1.jpg", "/tmp/noext", "/tmp/.hidden",
+])
+def test_record_image_path_round_trip(path):
+    assert Record("厂家", None, None, path).image_path == path
+
+
+def test_record_fields_are_independent():
+    record = Record("厂家", TID_A, "100", "/tmp/a.jpg", 1700000000.0, True, journal_id=0, session_id=3)
+    assert (record.id, record.seq, record.journal_id, record.session_id) == (None, None, 0, 3)
+    record.seq = 70000
+    record.journal_id = None
+    record.tid = TID_B
+    record.label = "标签"
+    record.auto_captured = False
+    record.manufacturer = "另一个厂家"
+    record.timestamp = "2024-01-02 03:04:05"
+    assert (record.seq, record.journal_id, record.session_id) == (70000, None, 3)
+    assert (record.manufacturer, record.tid, record.label, record.image_path) == ("另一个厂家", TID_B, "标签", "/tmp/a.jpg")
+    assert record.auto_captured is False
+    assert record.timestamp == "2024-01-02 03:04:05"
+    record.image_path = None
+    assert (record.tid, record.label, record.image_path) == (TID_B, "标签", None)
+    assert 'journal_id' not in record
+    assert 'session_id' in record
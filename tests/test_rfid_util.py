@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""rfid_util 帧解析的测试：按LEN分帧、数据中的0xD9和校验和错误的统计"""
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("serial")
+
+import rfid_util  # noqa: E402
+from rfid_util import RFIDUtil  # noqa: E402
+
+TID_PLAIN = bytes.fromhex("E2801160600002096A3B1C2D")
+TID_WITH_D9 = bytes.fromhex("E28011D9600002096AD91C2D")
+
+
+def tid_frame(tid: bytes) -> bytes:
+    """读TID响应帧：Flags Freq Ant PC(2) TID(12) CRC(2) RSSI(2)"""
+    return RFIDUtil.build_frame(RFIDUtil.CMD_READ_TID, b'\x00\x01\x01\x30\x00' + tid + b'\x12\x34\xff\xc0')
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    counts = Counter()
+    monkeypatch.setattr(rfid_util, "inc_metric", lambda name, amount=1: counts.update({name: amount}))
+    return counts
+
+
+@pytest.fixture
+def rfid():
+    return RFIDUtil()
+
+
+def test_split_frames_uses_length_byte(rfid):
+    frames = [RFIDUtil.READ_TID_SUCCESS_RESPONSE, tid_frame(TID_WITH_D9), tid_frame(TID_PLAIN)]
+    assert rfid._split_frames(b'\x00\x11' + b''.join(frames)) == frames
+
+
+def test_split_frames_resyncs_after_bad_data(rfid):
+    good = tid_frame(TID_PLAIN)
+    truncated = tid_frame(TID_PLAIN)[:10]
+    assert rfid._split_frames(truncated + good) == [truncated, good]
+    assert rfid._split_frames(good + b'\xD9') == [good]
+
+
+def test_tid_containing_d9_is_not_a_checksum_failure(rfid, counters):
+    raw = tid_frame(TID_WITH_D9) + tid_frame(TID_PLAIN)
+    assert rfid._parse_tid_data(raw) == [TID_WITH_D9.hex().upper(), TID_PLAIN.hex().upper()]
+    assert counters["rfid.checksum_failures"] == 0
+    assert counters["rfid.tags_read"] == 2
+
+
+def test_corrupted_frame_counts_one_failure(rfid, counters):
+    corrupted = bytearray(tid_frame(TID_PLAIN))
+    corrupted[-1] ^= 0xFF
+    rfid._parse_tid_data(bytes(corrupted) + tid_frame(TID_PLAIN))
+    assert counters["rfid.checksum_failures"] == 1
+
+
+def test_incomplete_segment_is_not_counted(rfid, counters):
+    rfid._parse_tid_data(tid_frame(TID_PLAIN)[:20])
+    assert counters["rfid.checksum_failures"] == 0
+
+
+def test_epc_frame_is_counted(rfid, counters):
+    frame = RFIDUtil.build_frame(RFIDUtil.CMD_START_INVENTORY, b'\x00' * 10)
+    # 解析出错时记录日志并返回已解析的TID
+    assert rfid._parse_tid_data(frame) == []
+    assert counters["rfid.epc_frames"] == 1
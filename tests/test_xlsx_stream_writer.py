@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""xlsx_stream_writer 的测试：用openpyxl重新打开写出的文件，检查单元格、图片和压缩包结构"""
+import io
+import os
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+
+from xlsx_stream_writer import StreamingXlsxWriter, column_index, column_letter
+
+openpyxl = pytest.importorskip("openpyxl")
+PILImage = pytest.importorskip("PIL.Image")
+
+
+def image_bytes(image_format, size=(40, 30)):
+    buffer = io.BytesIO()
+    PILImage.new("RGB", size, (200, 10, 10)).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def xlsx_file(tmp_path):
+    return os.path.join(str(tmp_path), "out.xlsx")
+
+
+def write_sample(path):
+    with StreamingXlsxWriter(path, "数据记录", {'B': 30, 'A': 8}) as writer:
+        writer.append_row(["序号", "TID", "标签号", "时间", "图片"])
+        row = writer.append_row([1, "E280<&>\"'", "007", "2024-01-02 03:04:05", None], height=60)
+        writer.add_image(row, 5, image_bytes("PNG"))
+        writer.append_row([2.5, "控制\x01字符", True, None, None])
+        row = writer.append_row([3, "E3", "3", None, None])
+        writer.add_image(row, 5, image_bytes("TIFF", (10, 20)))  # 非原生格式转换为PNG
+
+
+def test_cells_round_trip(xlsx_file):
+    write_sample(xlsx_file)
+    ws = openpyxl.load_workbook(xlsx_file).active
+    assert ws.title == "数据记录"
+    rows = [[cell.value for cell in row] for row in ws.iter_rows(min_row=1, max_col=5)]
+    assert rows == [
+        ["序号", "TID", "标签号", "时间", "图片"],
+        [1, "E280<&>\"'", "007", "2024-01-02 03:04:05", None],
+        [2.5, "控制字符", True, None, None],
+        [3, "E3", "3", None, None],
+    ]
+    assert ws.max_row == 4
+    assert ws.column_dimensions['A'].width == 8
+    assert ws.column_dimensions['B'].width == 30
+    assert ws.row_dimensions[2].height == 60
+
+
+def test_images_are_anchored(xlsx_file):
+    write_sample(xlsx_file)
+    ws = openpyxl.load_workbook(xlsx_file).active
+    anchors = sorted((image.anchor._from.row, image.anchor._from.col, image.width, image.height)
+                     for image in ws._images)
+    assert anchors == [(1, 4, 40, 30), (3, 4, 10, 20)]
+
+
+def test_package_is_valid_zip(xlsx_file):
+    write_sample(xlsx_file)
+    with zipfile.ZipFile(xlsx_file) as archive:
+        assert archive.testzip() is None
+        names = set(archive.namelist())
+        assert {"[Content_Types].xml", "_rels/.rels", "xl/workbook.xml", "xl/styles.xml",
+                "xl/worksheets/sheet1.xml", "xl/drawings/drawing1.xml",
+                "xl/media/image1.png", "xl/media/image2.png"} <= names
+        for name in names:
+            if name.endswith((".xml", ".rels")):
+                ElementTree.fromstring(archive.read(name))
+
+
+def test_without_images(xlsx_file):
+    with StreamingXlsxWriter(xlsx_file) as writer:
+        writer.append_row(["a", 1])
+    with zipfile.ZipFile(xlsx_file) as archive:
+        assert not any(name.startswith("xl/drawings/") for name in archive.namelist())
+    ws = openpyxl.load_workbook(xlsx_file).active
+    assert [[cell.value for cell in row] for row in ws.iter_rows()] == [["a", 1]]
+
+
+def test_abort_on_exception(xlsx_file):
+    with pytest.raises(RuntimeError):
+        with StreamingXlsxWriter(xlsx_file) as writer:
+            writer.append_row(["a"])
+            raise RuntimeError("stop")
+    with zipfile.ZipFile(xlsx_file) as archive:
+        assert "xl/workbook.xml" not in archive.namelist()
+
+
+@pytest.mark.parametrize("index, letters", [(1, "A"), (26, "Z"), (27, "AA"), (703, "AAA")])
+def test_column_letters(index, letters):
+    assert column_letter(index) == letters
+    assert column_index(letters) == index
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式xlsx写入模块
+
+逐行写入单工作表的xlsx文件：行数据先写入磁盘临时文件，图片在产生时直接写入压缩包，
+内存占用与行数无关。只实现导出所需的功能（文本/数字单元格、列宽、行高、单元格图片）
+"""
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Iterable, Optional
+from xml.sax.saxutils import escape
+
+from lazy_import import LazyModule
+
+Image = LazyModule("PIL.Image")
+
+# 像素到EMU的换算（Excel绘图单位）
+EMU_PER_PIXEL = 9525
+
+# 图片格式 -> (扩展名, Content-Type)
+IMAGE_TYPES = {
+    'PNG': ('png', 'image/png'),
+    'JPEG': ('jpeg', 'image/jpeg'),
+    'GIF': ('gif', 'image/gif'),
+    'BMP': ('bmp', 'image/bmp'),
+}
+
+# XML 1.0 不允许的控制字符
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_STYLES_XML = (
+    _XML_HEADER +
+    f'<styleSheet xmlns="{_NS_MAIN}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index: int) -> str:
+    """列序号(从1开始)转换为列字母"""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_index(letters: str) -> int:
+    """列字母转换为列序号(从1开始)"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - 64)
+    return index
+
+
+class StreamingXlsxWriter:
+    """流式xlsx写入器
+
+    用法：
+        with StreamingXlsxWriter(path, "数据记录", {'A': 8}) as writer:
+            row = writer.append_row(["序号", "名称"])
+            writer.add_image(row, 5, image_bytes)
+
+    正常退出with块时生成完整文件；发生异常时不会写出有效文件。
+    """
+
+    def __init__(self, file_path: str, sheet_title: str = "Sheet1",
+                 column_widths: Optional[Dict[str, float]] = None):
+        """初始化写入器
+
+        Args:
+            file_path: 输出文件路径
+            sheet_title: 工作表名称
+            column_widths: 列宽设置，列字母 -> 宽度
+        """
+        self.file_path = file_path
+        self.sheet_title = sheet_title
+        self.column_widths = column_widths or {}
+        self.row_count = 0
+        self.max_column = 0
+
+        self._zip = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED)
+        self._rows_file = tempfile.TemporaryFile()
+        self._anchors_file = tempfile.TemporaryFile()
+        self._image_rels_file = tempfile.TemporaryFile()
+        self._image_count = 0
+        self._image_extensions = set()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def append_row(self, values: Iterable, height: Optional[float] = None) -> int:
+        """追加一行数据
+
+        Args:
+            values: 单元格值列表，None表示空单元格
+            height: 行高(磅)，None表示默认行高
+
+        Returns:
+            int: 写入的行号(从1开始)
+        """
+        self.row_count += 1
+        row = self.row_count
+
+        parts = [f'<row r="{row}"']
+        if height is not None:
+            parts.append(f' ht="{height}" customHeight="1"')
+        parts.append('>')
+
+        for col, value in enumerate(values, 1):
+            if value is None:
+                continue
+            ref = f"{column_letter(col)}{row}"
+            if isinstance(value, bool):
+                parts.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                parts.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+                parts.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+            self.max_column = max(self.max_column, col)
+
+        parts.append('</row>')
+        self._rows_file.write(''.join(parts).encode('utf-8'))
+        return row
+
+    def add_image(self, row: int, col: int, image_data: bytes) -> None:
+        """把图片锚定到指定单元格左上角，图片数据立即写入压缩包
+
+        Args:
+            row: 行号(从1开始)
+            col: 列号(从1开始)
+            image_data: 图片编码数据(PNG/JPEG/GIF/BMP，其他格式转换为PNG)
+        """
+        with Image.open(io.BytesIO(image_data)) as img:
+            width, height = img.size
+            img_format = img.format
+            if img_format not in IMAGE_TYPES:
+                buffer = io.BytesIO()
+                img.save(buffer, format='PNG')
+                image_data = buffer.getvalue()
+                img_format = 'PNG'
+
+        extension = IMAGE_TYPES[img_format][0]
+        self._image_count += 1
+        index = self._image_count
+        media_name = f"image{index}.{extension}"
+        self._image_extensions.add(img_format)
+
+        # 图片本身已压缩，直接存储
+        self._zip.writestr(f"xl/media/{media_name}", image_data, compress_type=zipfile.ZIP_STORED)
+        self._image_rels_file.write(
+            f'<Relationship Id="rId{index}" Type="{_NS_REL}/image" Target="../media/{media_name}"/>'.encode('utf-8')
+        )
+
+        cx, cy = width * EMU_PER_PIXEL, height * EMU_PER_PIXEL
+        anchor = (
+            '<xdr:oneCellAnchor>'
+            f'<xdr:from><xdr:col>{col - 1}</xdr:col><xdr:colOff>0</xdr:colOff>'
+            f'<xdr:row>{row - 1}</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>'
+            f'<xdr:ext cx="{cx}" cy="{cy}"/>'
+            '<xdr:pic>'
+            f'<xdr:nvPicPr><xdr:cNvPr id="{index + 1}" name="Image {index}"/>'
+            '<xdr:cNvPicPr><a:picLocks noChangeAspect="1"/></xdr:cNvPicPr></xdr:nvPicPr>'
+            f'<xdr:blipFill><a:blip r:embed="rId{index}"/><a:stretch><a:fillRect/></a:stretch></xdr:blipFill>'
+            f'<xdr:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr>'
+            '</xdr:pic><xdr:clientData/></xdr:oneCellAnchor>'
+        )
+        self._anchors_file.write(anchor.encode('utf-8'))
+
+    def close(self) -> None:
+        """写入工作表、绘图和包结构，生成完整文件"""
+        if self._closed:
+            return
+        try:
+            has_images = self._image_count > 0
+            self._write_sheet(has_images)
+            if has_images:
+                self._write_drawing()
+            self._write_package_parts(has_images)
+        finally:
+            self._release()
+
+    def abort(self) -> None:
+        """放弃写入，释放临时文件（输出文件内容不完整，由调用方删除）"""
+        if not self._closed:
+            self._release()
+
+    def _release(self) -> None:
+        self._closed = True
+        self._zip.close()
+        self._rows_file.close()
+        self._anchors_file.close()
+        self._image_rels_file.close()
+
+    def _copy_to_zip(self, name: str, head: str, source, tail: str) -> None:
+        """把 head + 临时文件内容 + tail 流式写入压缩包"""
+        size = source.tell()
+        source.seek(0)
+        force_zip64 = size > zipfile.ZIP64_LIMIT // 2
+        with self._zip.open(name, 'w', force_zip64=force_zip64) as dst:
+            dst.write(head.encode('utf-8'))
+            shutil.copyfileobj(source, dst)
+            dst.write(tail.encode('utf-8'))
+
+    def _write_sheet(self, has_images: bool) -> None:
+        last_ref = f"{column_letter(max(self.max_column, 1))}{max(self.row_count, 1)}"
+        head = [_XML_HEADER, f'<worksheet xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">',
+                f'<dimension ref="A1:{last_ref}"/>']
+        if self.column_widths:
+            head.append('<cols>')
+            for letters, width in sorted(self.column_widths.items(), key=lambda item: column_index(item[0])):
+                idx = column_index(letters)
+                head.append(f'<col min="{idx}" max="{idx}" width="{width}" customWidth="1"/>')
+            head.append('</cols>')
+        head.append('<sheetData>')
+
+        tail = '</sheetData>'
+        if has_images:
+            tail += '<drawing r:id="rId1"/>'
+        tail += '</worksheet>'
+
+        self._copy_to_zip("xl/worksheets/sheet1.xml", ''.join(head), self._rows_file, tail)
+
+    def _write_drawing(self) -> None:
+        head = (_XML_HEADER +
+                '<xdr:wsDr xmlns:xdr="http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing" '
+                'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+                f'xmlns:r="{_NS_REL}">')
+        self._copy_to_zip("xl/drawings/drawing1.xml", head, self._anchors_file, '</xdr:wsDr>')
+
+        self._copy_to_zip("xl/drawings/_rels/drawing1.xml.rels",
+                          _XML_HEADER + f'<Relationships xmlns="{_NS_PKG_REL}">',
+                          self._image_rels_file, '</Relationships>')
+
+        self._zip.writestr(
+            "xl/worksheets/_rels/sheet1.xml.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/drawing" Target="../drawings/drawing1.xml"/>'
+            '</Relationships>'
+        )
+
+    def _write_package_parts(self, has_images: bool) -> None:
+        content_types = [_XML_HEADER,
+                         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+                         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>',
+                         '<Default Extension="xml" ContentType="application/xml"/>']
+        for img_format in sorted(self._image_extensions):
+            extension, content_type = IMAGE_TYPES[img_format]
+            content_types.append(f'<Default Extension="{extension}" ContentType="{content_type}"/>')
+        content_types.append('<Override PartName="/xl/workbook.xml" '
+                             'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>')
+        content_types.append('<Override PartName="/xl/worksheets/sheet1.xml" '
+                             'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+        content_types.append('<Override PartName="/xl/styles.xml" '
+                             'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>')
+        if has_images:
+            content_types.append('<Override PartName="/xl/drawings/drawing1.xml" '
+                                 'ContentType="application/vnd.openxmlformats-officedocument.drawing+xml"/>')
+        content_types.append('</Types>')
+        self._zip.writestr("[Content_Types].xml", ''.join(content_types))
+
+        self._zip.writestr(
+            "_rels/.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        )
+        self._zip.writestr(
+            "xl/workbook.xml",
+            _XML_HEADER + f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+            f'<sheets><sheet name="{escape(self.sheet_title, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        )
+        self._zip.writestr(
+            "xl/_rels/workbook.xml.rels",
+            _XML_HEADER + f'<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+            f'<Relationship Id="rId2" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        )
+        self._zip.writestr("xl/styles.xml", _STYLES_XML)